@@ -1,69 +1,66 @@
 #!/usr/bin/env python3
 import sys
 import os
+import json
+import queue
 import subprocess
+import threading
 import argparse
-import uuid
 import time
-from typing import List, Dict, Generator, Set
+import uuid
+from collections.abc import Sized
+from itertools import chain
+from typing import List, Dict, Generator, Iterable, Iterator, Set
 from datetime import datetime
-from opensearchpy import OpenSearch
-from tqdm import tqdm
 from colorama import Fore, Style, init
+from parsers.httpx import http_document
+from tools.batching import AdaptiveBatcher, BatchTimeout, run_adaptive
+from tools.checkpoint import RunCheckpoint
+from tools import metrics
+from tools.pool import POOL_SIZE, get_pool
+from conn.bulk import BulkWriter
+from conn.database import get_opensearch_client
+from conn.query import WILDCARD, iter_unique_values, keyword_field
+from conn.scan_state import DEFAULT_FRESHNESS, ScanState
+from conn.templates import install_templates
 
 # Inicializar colorama (necessário para Windows)
 init()
 
-
-def get_opensearch_client():
-    """Retorna um cliente configurado para o OpenSearch"""
-    client = OpenSearch(
-        hosts=[{"host": "localhost", "port": 9200}],
-        http_compress=True,
-        use_ssl=False,
-        verify_certs=False,
-        ssl_assert_hostname=False,
-        ssl_show_warn=False,
-    )
-    return client
+# Configurações
+HTTPX_TIMEOUT = 180  # 3 minutos por lote
+HTTPX_BATCH_SECONDS = 60  # Duração desejada de cada lote
+HTTPX_MAX_BATCH = 500
+CHECKPOINT_EVERY = 200  # Domínios indexados entre registros no diário da execução
 
 
-def get_unique_domains(index: str) -> List[str]:
+def get_unique_domains(index: str) -> Iterator[str]:
     """
-    Recupera domínios únicos do índice OpenSearch
+    Recupera domínios únicos do índice OpenSearch, página a página
 
     Args:
         index: Nome do índice a consultar
 
-    Returns:
-        List[str]: Lista de domínios únicos
+    Yields:
+        str: Cada domínio único, assim que sua página é lida
     """
     print(
         f"{Fore.CYAN}[*] Consultando domínios únicos no índice {index}...{Style.RESET_ALL}"
     )
     client = get_opensearch_client()
-    query = {
-        "size": 0,
-        "aggs": {
-            "unique_domains": {
-                "terms": {"field": "server.domain.keyword", "size": 10000}
-            }
-        },
-    }
 
+    total = 0
     try:
-        response = client.search(index=index, body=query)
-        domains = [
-            bucket["key"]
-            for bucket in response["aggregations"]["unique_domains"]["buckets"]
-        ]
+        field = keyword_field(client, index, "server.domain")
+        query = {"bool": {"must_not": [WILDCARD]}}  # Nomes de DNS curinga
+        for domain in iter_unique_values(client, index, field, query):
+            total += 1
+            yield domain
         print(
-            f"{Fore.CYAN}[*] Encontrados {len(domains)} domínios únicos para verificação{Style.RESET_ALL}"
+            f"{Fore.CYAN}[*] Encontrados {total} domínios únicos para verificação{Style.RESET_ALL}"
         )
-        return domains
     except Exception as e:
         print(f"{Fore.RED}[!] Falha ao buscar domínios: {str(e)}{Style.RESET_ALL}")
-        return []
 
 
 def criar_diretorios(target: str) -> str:
@@ -85,141 +82,154 @@ def criar_diretorios(target: str) -> str:
         sys.exit(1)
 
 
+def httpx_details(entry: Dict) -> str:
+    """Resumo no mesmo formato da saída texto: [status] [título] [tecnologias]"""
+    fields = [
+        str(entry.get("status_code", "")),
+        entry.get("title", ""),
+        ",".join(entry.get("tech") or []),
+    ]
+    return " ".join(f"[{field}]" for field in fields if field)
+
+
+def probe_batch(pool, batch: List[str], emit, batch_id: str = None) -> None:
+    """Executa o httpx em um lote e repassa cada resultado assim que sai.
+
+    ``emit(registro)`` recebe um registro available (com o documento
+    estruturado) por resposta JSON e, ao final, um unavailable ou error
+    para cada domínio sem resposta. Num timeout, os domínios ainda sem
+    resposta voltam à fila via BatchTimeout para serem refeitos em lotes
+    menores (mesmo que reste um só); só um lote de um domínio que estoure
+    o tempo vira error.
+    """
+    batch_id = batch_id or str(uuid.uuid1())[:8]
+    batch_file = f"{pool.host_dir}/httpx-batch-{batch_id}.txt"
+    with open(batch_file, "w") as f:
+        f.write("\n".join(batch) + "\n")
+
+    cmd = (
+        f"httpx -silent -json -status-code -title -tech-detect "
+        f"-l {pool.data_dir}/httpx-batch-{batch_id}.txt"
+    )
+
+    pending = set(batch)
+    failure = None
+    try:
+        for line in pool.stream(cmd, timeout=HTTPX_TIMEOUT, resource="discovery"):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            domain = entry.get("input") or entry.get("host", "")
+            if domain not in pending:
+                continue
+            pending.discard(domain)
+            emit(
+                {
+                    "domain": domain,
+                    "full_url": entry.get("url", ""),
+                    "status": "available",
+                    "details": httpx_details(entry),
+                    "document": http_document(entry),
+                    "raw": line,
+                }
+            )
+    except subprocess.TimeoutExpired:
+        failure = "Timeout"
+        if len(batch) > 1 and pending:
+            raise BatchTimeout([domain for domain in batch if domain in pending])
+    except Exception as e:
+        failure = str(e)
+    finally:
+        os.remove(batch_file)
+
+    for domain in batch:
+        if domain not in pending:
+            continue
+        if failure:
+            emit({"domain": domain, "status": "error", "details": failure})
+        else:
+            emit({"domain": domain, "status": "unavailable", "details": ""})
+
+
 def check_domains_availability_in_batches(
-    target: str, domains: List[str], batch_size: int = 20
+    target: str,
+    domains: Iterable[str],
+    batch_size: int = 20,
+    concurrency: int = POOL_SIZE,
+    checkpoint: RunCheckpoint = None,
 ) -> Generator[Dict, None, None]:
     """
-    Verifica quais domínios estão disponíveis usando httpx, processando em lotes
-    e retornando resultados progressivamente
+    Verifica quais domínios estão disponíveis usando httpx, com vários lotes
+    em paralelo e retornando resultados à medida que chegam
 
     Args:
         target: Nome do alvo/cliente
-        domains: Lista de domínios a verificar
-        batch_size: Tamanho de cada lote para processamento
+        domains: Domínios a verificar (lista ou iterador paginado)
+        batch_size: Tamanho inicial dos lotes, ajustado pela vazão observada
+        concurrency: Lotes em execução simultânea (um worker do pool cada)
+        checkpoint: Diário da execução, que registra o início de cada lote
 
     Yields:
         Dict: Informações sobre cada domínio processado
     """
-    if not domains:
-        return
+    from tqdm import tqdm  # Só quem verifica domínios paga a importação
 
     temp_dir = criar_diretorios(target)
-    total_domains = len(domains)
+    pool = get_pool(target, concurrency)
+    total_domains = len(domains) if isinstance(domains, Sized) else None
 
-    # Preparar arquivo para salvar resultados
+    # Preparar arquivo para salvar resultados (JSON do httpx)
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     results_file = f"{temp_dir}/httpx-results-{timestamp}.txt"
 
-    # Dividir domínios em lotes para processamento
-    batches = [domains[i : i + batch_size] for i in range(0, len(domains), batch_size)]
-
-    with tqdm(total=total_domains, desc="Verificando domínios") as pbar:
-        for batch_idx, batch in enumerate(batches):
-            batch_str = "\n".join(batch)
-            scan_id = str(uuid.uuid4())[:8]
-            container_name = f"{target}-httpx-{scan_id}"
-
-            # Criar arquivo temporário para este lote
-            batch_file = f"{temp_dir}/httpx-batch-{batch_idx}.txt"
-            with open(batch_file, "w") as f:
-                f.write(batch_str)
-
-            # Comando para verificar domínios com httpx
-            cmd = (
-                f"docker run --rm --name {container_name} "
-                f"-v {temp_dir}:/data kali-tools:2.1 "
-                f"bash -c 'cat /data/httpx-batch-{batch_idx}.txt | "
-                f"httpx --silent --status-code --title --tech-detect'"
-            )
-
-            try:
-                result = subprocess.run(
-                    cmd,
-                    shell=True,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=180,  # 3 minutos por lote
-                )
-
-                # Limpar o arquivo de lote
-                os.remove(batch_file)
-
-                # Processar resultados deste lote
-                output_lines = result.stdout.strip().split("\n")
-                available_domains = set()
-
-                for line in output_lines:
-                    if line.strip():
-                        # httpx output pode incluir status code, título e tecnologias
-                        # Formato típico: http://example.com [200] [Example Title] [tech1,tech2]
-                        parts = line.split()
-                        if parts:
-                            domain = parts[0]
-                            status_info = " ".join(parts[1:]) if len(parts) > 1 else ""
-
-                            # Extrair apenas o nome do domínio da URL
-                            domain_clean = domain.replace("http://", "").replace(
-                                "https://", ""
-                            )
-                            domain_clean = domain_clean.split("/")[0]  # Remover path
-
-                            available_domains.add(domain_clean)
-
-                            # Adicionar ao arquivo de resultados
-                            with open(results_file, "a") as f:
-                                f.write(f"{line}\n")
-
-                            # Retornar este resultado imediatamente
-                            yield {
-                                "domain": domain_clean,
-                                "full_url": domain,
-                                "status": "available",
-                                "details": status_info,
-                            }
-
-                # Processar domínios indisponíveis neste lote
-                for domain in batch:
-                    domain_clean = domain.split("/")[
-                        0
-                    ]  # Garantir que estamos comparando apenas o nome do domínio
-                    if domain_clean not in available_domains:
-                        yield {
-                            "domain": domain_clean,
-                            "status": "unavailable",
-                            "details": "",
-                        }
-
-                # Atualizar barra de progresso
-                pbar.update(len(batch))
-
-            except subprocess.TimeoutExpired:
-                print(
-                    f"{Fore.YELLOW}[!] Timeout ao processar lote {batch_idx + 1}/{len(batches)}{Style.RESET_ALL}"
-                )
-                # Marcar todos os domínios do lote como indisponíveis
-                for domain in batch:
-                    yield {"domain": domain, "status": "error", "details": "Timeout"}
-                pbar.update(len(batch))
-
-            except Exception as e:
-                print(
-                    f"{Fore.RED}[!] Erro ao processar lote {batch_idx + 1}/{len(batches)}: {str(e)}{Style.RESET_ALL}"
-                )
-                # Marcar todos os domínios do lote como erro
-                for domain in batch:
-                    yield {"domain": domain, "status": "error", "details": str(e)}
-                pbar.update(len(batch))
-
-            # Pequena pausa entre lotes para não sobrecarregar o Docker
-            time.sleep(1)
-
+    # Lotes montados sob demanda, com tamanho ajustado pela vazão
+    batcher = AdaptiveBatcher(
+        initial=batch_size, maximum=HTTPX_MAX_BATCH, target_seconds=HTTPX_BATCH_SECONDS
+    )
+    records = queue.Queue()
+    end = object()
+
+    def probe(batch: List[str]) -> None:
+        if checkpoint is None:
+            return probe_batch(pool, batch, records.put)
+        checkpoint.track(batch, lambda job: probe_batch(pool, batch, records.put, job))
+
+    def dispatch() -> None:
+        try:
+            for _ in run_adaptive(
+                domains,
+                probe,
+                concurrency,
+                batcher,
+            ):
+                pass
+        finally:
+            records.put(end)
+
+    dispatcher = threading.Thread(target=dispatch, daemon=True)
+    dispatcher.start()
+
+    with (
+        tqdm(total=total_domains, desc="Verificando domínios") as pbar,
+        open(results_file, "a") as results,
+    ):
+        while (record := records.get()) is not end:
+            raw = record.pop("raw", None)
+            if raw:
+                results.write(f"{raw}\n")
+            pbar.update(1)
+            yield record
+
+    dispatcher.join()
     print(
-        f"{Fore.CYAN}[*] Resultados detalhados salvos em: {results_file}{Style.RESET_ALL}"
+        f"{Fore.CYAN}[*] Lote final: {batcher.size} domínios; "
+        f"resultados detalhados salvos em: {results_file}{Style.RESET_ALL}"
     )
 
 
-def main():
+def main(argv: List[str] = None) -> None:
     parser = argparse.ArgumentParser(
         description="Verificador de disponibilidade web de domínios"
     )
@@ -228,7 +238,13 @@ def main():
         "--batch-size",
         type=int,
         default=20,
-        help="Número de domínios a processar por lote (default: 20)",
+        help="Tamanho inicial dos lotes, ajustado pela vazão (default: 20)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=POOL_SIZE,
+        help=f"Lotes do httpx em paralelo (default: {POOL_SIZE})",
     )
     parser.add_argument(
         "--only-available",
@@ -240,7 +256,23 @@ def main():
         action="store_true",
         help="Exibir apenas domínios indisponíveis",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Pula domínios verificados recentemente e exibe só as mudanças",
+    )
+    parser.add_argument(
+        "--fresh-hours",
+        type=float,
+        default=DEFAULT_FRESHNESS / 3600,
+        help="Janela de validade do modo incremental em horas (default: 24)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Retoma uma execução interrompida, pulando os domínios já indexados",
+    )
+    args = parser.parse_args(argv)
 
     start_time = time.time()
     print(
@@ -248,52 +280,101 @@ def main():
     )
 
     try:
-        # Buscar domínios únicos
-        domains = get_unique_domains(args.target)
+        checkpoint = RunCheckpoint(args.target, "httpx", args.resume)
+        print(
+            f"{Fore.CYAN}[*] Execução {checkpoint.run_id} (retome com --resume {checkpoint.run_id}){Style.RESET_ALL}"
+        )
+
+        # Buscar domínios únicos (paginado: a verificação começa na 1ª página)
+        domains = checkpoint.pending(get_unique_domains(args.target))
+        first = next(domains, None)
 
-        if not domains:
+        if first is None:
             print(
                 f"{Fore.YELLOW}[!] Nenhum domínio encontrado no índice {args.target}{Style.RESET_ALL}"
             )
             sys.exit(0)
+        domains = chain([first], domains)
+
+        client = get_opensearch_client()
+        install_templates(client, args.target)
+        metrics.start(args.target, "httpx", client, checkpoint.run_id)
+        state = None
+        if args.incremental:
+            state = ScanState(
+                client, args.target, "httpx", int(args.fresh_hours * 3600)
+            )
+            state.load()
+            domains = state.pending(domains)
 
         # Para armazenar os domínios classificados
         available_domains: Set[str] = set()
         unavailable_domains: Set[str] = set()
         error_domains: Set[str] = set()
+        unchanged_domains: Set[str] = set()
 
         # Informações detalhadas por domínio
         domain_details = {}
 
         # Verificar disponibilidade com feedback progressivo
         print(
-            f"\n{Fore.CYAN}[*] Iniciando verificação de {len(domains)} domínios...{Style.RESET_ALL}\n"
+            f"\n{Fore.CYAN}[*] Iniciando verificação dos domínios...{Style.RESET_ALL}\n"
         )
 
-        for result in check_domains_availability_in_batches(
-            args.target, domains, args.batch_size
-        ):
-            domain = result["domain"]
-            status = result["status"]
-            domain_details[domain] = result.get("details", "")
-
-            if status == "available":
-                available_domains.add(domain)
-                if not args.only_unavailable:
-                    details = (
-                        f" - {domain_details[domain]}" if domain_details[domain] else ""
-                    )
-                    print(f"{Fore.GREEN}[+] {domain}{details}{Style.RESET_ALL}")
-            elif status == "unavailable":
-                unavailable_domains.add(domain)
-                if not args.only_available:
-                    print(f"{Fore.RED}[-] {domain}{Style.RESET_ALL}")
-            else:  # error
-                error_domains.add(domain)
-                if not args.only_available:
-                    print(
-                        f"{Fore.YELLOW}[!] {domain} - {domain_details[domain]}{Style.RESET_ALL}"
-                    )
+        # Respostas estruturadas do httpx vão para <alvo>-http
+        http_index = f"{args.target}-http"
+        finished: List[str] = []  # Indexados desde o último registro no diário
+        with BulkWriter(client) as writer:
+            for result in check_domains_availability_in_batches(
+                args.target, domains, args.batch_size, args.concurrency, checkpoint
+            ):
+                domain = result["domain"]
+                status = result["status"]
+                domain_details[domain] = result.get("details", "")
+
+                # Registra os anteriores só depois do flush; erros ficam pendentes
+                if len(finished) >= CHECKPOINT_EVERY:
+                    writer.flush()
+                    checkpoint.done(finished)
+                    finished = []
+                if status != "error":
+                    finished.append(domain)
+
+                # Modo incremental: registra o estado e omite o que não mudou
+                if state is not None and status != "error":
+                    signatures = [f"{domain}|{status}|{domain_details[domain]}"]
+                    unchanged = state.unchanged(domain, signatures)
+                    state.record(writer, domain, signatures)
+                    if unchanged:
+                        unchanged_domains.add(domain)
+                        continue
+
+                if status == "available":
+                    available_domains.add(domain)
+                    writer.add(http_index, result["document"])
+                    if not args.only_unavailable:
+                        details = (
+                            f" - {domain_details[domain]}"
+                            if domain_details[domain]
+                            else ""
+                        )
+                        print(f"{Fore.GREEN}[+] {domain}{details}{Style.RESET_ALL}")
+                elif status == "unavailable":
+                    unavailable_domains.add(domain)
+                    if not args.only_available:
+                        print(f"{Fore.RED}[-] {domain}{Style.RESET_ALL}")
+                else:  # error
+                    error_domains.add(domain)
+                    if not args.only_available:
+                        print(
+                            f"{Fore.YELLOW}[!] {domain} - {domain_details[domain]}{Style.RESET_ALL}"
+                        )
+
+        checkpoint.done(finished)
+        checkpoint.close()
+        print(
+            f"{Fore.CYAN}[*] {len(available_domains)} respostas indexadas em {http_index}{Style.RESET_ALL}"
+        )
 
         # Resumo final
         elapsed_time = time.time() - start_time
@@ -309,6 +390,10 @@ def main():
             print(
                 f"{Fore.YELLOW}[!] Domínios com erro: {len(error_domains)}{Style.RESET_ALL}"
             )
+        if unchanged_domains:
+            print(
+                f"{Fore.CYAN}[=] Domínios sem alteração: {len(unchanged_domains)}{Style.RESET_ALL}"
+            )
         print(
             f"{Fore.CYAN}[*] Tempo total: {elapsed_time:.2f} segundos{Style.RESET_ALL}"
         )
@@ -1,37 +1,50 @@
 #!/usr/bin/env python3
 import sys
 import os
+import argparse
 import subprocess
 import uuid
 from pathlib import Path
-from time import strftime
-import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Set
 from conn.database import get_opensearch_client
+from conn.bulk import BulkWriter
+from conn.query import WILDCARD, iter_unique_values, keyword_field
+from conn.templates import install_templates
+from conn.scan_state import (
+    DEFAULT_FRESHNESS,
+    ScanState,
+    port_signature,
+    signature_key,
+)
+from parsers import nmap as nmap_parser
+from parsers.masscan import parse_sweep_line
+from parsers.nmap import host_document
+from tools.batching import AdaptiveBatcher, run_adaptive, run_each
+from tools.checkpoint import RunCheckpoint
+from tools import metrics
+from tools.pool import get_pool
+from tools.scheduler import LIMITS
 
 # Configurações
-client = get_opensearch_client()
-MAX_WORKERS = min(10, (os.cpu_count() or 1) * 2)  # Limita a 10 threads no máximo
+MAX_WORKERS = LIMITS["scan"]  # Threads além das vagas do agendador só esperariam
 TIMEOUT_NMAP = 1800  # 30 minutos em segundos
+TIMEOUT_SWEEP = 4 * 3600  # Varredura rápida de todo o conjunto de IPs
+SWEEP_TOOL = os.environ.get("RECON_SWEEP_TOOL", "masscan")  # masscan | nmap
+SWEEP_PORTS = os.environ.get("RECON_SWEEP_PORTS", "1-65535")
+SWEEP_RATE = int(os.environ.get("RECON_SWEEP_RATE", 1000))  # Pacotes por segundo
 SCANNER = "nmap"
 
 
-def get_unique_ips(index: str) -> list:
-    """Busca IPs únicos válidos no OpenSearch, excluindo 0.0.0.0"""
-    query = {
-        "size": 0,
-        "query": {"bool": {"must_not": {"term": {"server.ip.keyword": "0.0.0.0"}}}},
-        "aggs": {
-            "unique_ips": {"terms": {"field": "server.ip.keyword", "size": 10000}}
-        },
-    }
+def get_unique_ips(index: str) -> Iterator[str]:
+    """Busca IPs únicos válidos no OpenSearch, excluindo 0.0.0.0 (paginado)
 
+    IPs que só aparecem em nomes de DNS curinga não são varridos.
+    """
+    client = get_opensearch_client()
     try:
-        response = client.search(index=index, body=query)
-        return [
-            bucket["key"]
-            for bucket in response["aggregations"]["unique_ips"]["buckets"]
-        ]
+        field = keyword_field(client, index, "server.ip")
+        query = {"bool": {"must_not": [{"term": {field: "0.0.0.0"}}, WILDCARD]}}
+        yield from iter_unique_values(client, index, field, query)
     except Exception as e:
         print(f"Erro ao buscar IPs: {e}")
         sys.exit(1)
@@ -42,20 +55,16 @@ def criar_diretorios(target: str) -> None:
     Path(f"/docker/recon/data/{target}/temp").mkdir(parents=True, exist_ok=True)
 
 
-def run_nmap(target: str, ip: str) -> str:
-    """Executa o nmap em um container Docker"""
-    scan_id = str(uuid.uuid1())[:8]
-    output_file = f"/docker/recon/data/{target}/temp/nmap-{scan_id}.xml"
+def run_nmap(target: str, ip: str, scan_id: str = None) -> str:
+    """Executa o nmap no pool de containers kali-tools"""
+    scan_id = scan_id or str(uuid.uuid1())[:8]
+    pool = get_pool(target, MAX_WORKERS)
+    output_file = f"{pool.host_dir}/nmap-{scan_id}.xml"
 
-    cmd = (
-        f"docker run --rm --name {target}-{scan_id}-nmap "
-        f"-v /docker/recon/data/{target}/temp:/data "
-        f"kali-tools:2.1 nmap -sSV -Pn {ip} "
-        f"-oX /data/nmap-{scan_id}.xml --stylesheet=none"
-    )
+    cmd = f"nmap -sSV -Pn {ip} -oX {pool.data_dir}/nmap-{scan_id}.xml --stylesheet=none"
 
     try:
-        subprocess.run(cmd, shell=True, check=True, timeout=TIMEOUT_NMAP)
+        pool.run(cmd, timeout=TIMEOUT_NMAP, check=True, resource="scan")
         return output_file
     except subprocess.TimeoutExpired:
         print(f"[!] Timeout no scan de {ip}")
@@ -65,93 +74,330 @@ def run_nmap(target: str, ip: str) -> str:
         return ""
 
 
-def parse_nmap_results(xml_path: str, target: str) -> list:
-    """Processa o XML do nmap e retorna documentos para o OpenSearch"""
+def run_nmap_batch(target: str, ips: List[str], scan_id: str = None) -> str:
+    """Executa um único nmap para um lote de IPs (lista via -iL).
+
+    Lança TimeoutExpired no timeout para que o lote seja refeito menor.
+    """
+    scan_id = scan_id or str(uuid.uuid1())[:8]
+    pool = get_pool(target, MAX_WORKERS)
+    list_file = f"{pool.host_dir}/nmap-{scan_id}.lst"
+    output_file = f"{pool.host_dir}/nmap-{scan_id}.xml"
+
+    with open(list_file, "w") as f:
+        f.write("\n".join(ips) + "\n")
+
+    cmd = (
+        f"nmap -sSV -Pn -iL {pool.data_dir}/nmap-{scan_id}.lst "
+        f"-oX {pool.data_dir}/nmap-{scan_id}.xml --stylesheet=none"
+    )
+
     try:
-        tree = ET.parse(xml_path)
-        docs = []
+        pool.run(cmd, timeout=TIMEOUT_NMAP, check=True, resource="scan")
+        return output_file
+    except subprocess.TimeoutExpired:
+        print(f"[!] Timeout no scan do lote de {len(ips)} IPs")
+        Path(output_file).unlink(missing_ok=True)  # XML parcial do lote morto
+        raise
+    except Exception as e:
+        print(f"[!] Falha no scan do lote de {len(ips)} IPs: {str(e)[:100]}")
+        return ""
+    finally:
+        os.remove(list_file)
 
-        for host in tree.findall("host"):
-            ip_element = host.find("address[@addrtype='ipv4']")
-            if ip_element is None:
-                continue
 
-            ip = ip_element.get("addr", "")
-            doc = {
-                "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
-                "server.ip": ip,
-                "source_index": target,
-                "scanner": SCANNER,
-                "ports": [],
-            }
-
-            for port in host.findall("ports/port"):
-                port_data = {
-                    "port": port.get("portid", ""),
-                    "protocol": port.get("protocol", ""),
-                    "state": port.find("state").get("state", "")
-                    if port.find("state") is not None
-                    else "",
-                }
-
-                service = port.find("service")
-                if service is not None:
-                    port_data.update(
-                        {
-                            "service": service.get("name", ""),
-                            "product": service.get("product", ""),
-                            "version": service.get("version", ""),
-                        }
-                    )
-                else:  # Garante campos mesmo sem serviço
-                    port_data.update({"service": "", "product": "", "version": ""})
-
-                doc["ports"].append(port_data)
-
-            docs.append(doc)
-
-        return docs
+def sweep_ports(target: str, ips: Iterator[str]) -> Dict[str, Set[str]]:
+    """Primeira fase: varredura SYN rápida e com taxa controlada.
+
+    Um único masscan (ou nmap -sS sem detecção de versão) percorre todos os
+    IPs; retorna {ip: {portas abertas}} incluindo IPs sem nenhuma porta.
+    """
+    scan_id = str(uuid.uuid1())[:8]
+    pool = get_pool(target, MAX_WORKERS)
+    list_file = f"{pool.host_dir}/sweep-{scan_id}.lst"
+
+    open_ports = {}
+    with open(list_file, "w") as f:
+        for ip in ips:
+            open_ports[ip] = set()
+            f.write(f"{ip}\n")
+
+    if not open_ports:
+        os.remove(list_file)
+        return open_ports
+
+    targets = f"-iL {pool.data_dir}/sweep-{scan_id}.lst"
+    if SWEEP_TOOL == "nmap":
+        cmd = (
+            f"nmap -sS -Pn -n --open --max-retries 1 --min-rate {SWEEP_RATE} "
+            f"-p {SWEEP_PORTS} {targets} -oG -"
+        )
+    else:
+        cmd = f"masscan {targets} -p{SWEEP_PORTS} --rate {SWEEP_RATE} --wait 5"
+
+    print(f"[*] Varredura rápida de {len(open_ports)} IPs ({SWEEP_TOOL})...")
+    try:
+        raw = pool.raw_output(f"sweep-{scan_id}.txt")
+        for line in pool.stream(cmd, raw, TIMEOUT_SWEEP, "discovery"):
+            for ip, port, protocol in parse_sweep_line(line):
+                if protocol == "tcp":
+                    open_ports.setdefault(ip, set()).add(port)
+    except Exception as e:
+        print(f"[!] Falha na varredura rápida: {str(e)[:100]}")
+    finally:
+        os.remove(list_file)
+
+    total = sum(len(ports) for ports in open_ports.values())
+    print(f"[+] {total} portas abertas em {len(open_ports)} IPs")
+    return open_ports
+
+
+def run_service_scan(target: str, ip: str, ports: Set[str], scan_id: str = None) -> str:
+    """Segunda fase: detecção de versão só nas portas confirmadas abertas"""
+    scan_id = scan_id or str(uuid.uuid1())[:8]
+    pool = get_pool(target, MAX_WORKERS)
+    output_file = f"{pool.host_dir}/nmap-{scan_id}.xml"
+    port_list = ",".join(sorted(ports, key=int))
+
+    cmd = (
+        f"nmap -sSV -Pn -p {port_list} {ip} "
+        f"-oX {pool.data_dir}/nmap-{scan_id}.xml --stylesheet=none"
+    )
+
+    try:
+        pool.run(cmd, timeout=TIMEOUT_NMAP, check=True, resource="scan")
+        return output_file
+    except subprocess.TimeoutExpired:
+        print(f"[!] Timeout na detecção de serviços de {ip}")
+        return ""
+    except Exception as e:
+        print(f"[!] Falha na detecção de serviços de {ip}: {str(e)[:100]}")
+        return ""
+
+
+def parse_nmap_results(xml_path: str, target: str) -> Iterator[dict]:
+    """Entrega os documentos do XML do nmap host a host (iterparse)"""
+    try:
+        yield from nmap_parser.parse(xml_path, target)
     except Exception as e:
         print(f"[!] Erro ao processar {xml_path}: {e}")
-        return []
 
 
-def main(target_index: str) -> None:
-    """Execução principal com paralelismo"""
+def delta_document(state: ScanState, writer: BulkWriter, doc: dict) -> dict:
+    """Reduz o documento às portas novas ou alteradas (None se nada mudou)"""
+    ip = doc["server.ip"]
+    signatures = [port_signature(port) for port in doc["ports"]]
+    unchanged = state.unchanged(ip, signatures)
+    delta = state.compare(ip, signatures)
+    state.record(writer, ip, signatures)
+
+    if unchanged:
+        return None
+
+    keys = set(delta["opened"]) | set(delta["changed"])
+    doc["ports"] = [
+        port for port in doc["ports"] if signature_key(port_signature(port)) in keys
+    ]
+    doc["scan.delta"] = delta
+    return doc
+
+
+def index_documents(
+    docs: Iterable[dict],
+    chunk: List[str],
+    state: ScanState,
+    writer: BulkWriter,
+    output_index: str,
+) -> None:
+    """Enfileira os documentos de um lote (só as diferenças no incremental)
+
+    Os documentos são consumidos conforme o parser os entrega.
+    """
+    answered = set()
+    for doc in docs:
+        ip = doc["server.ip"]
+        answered.add(ip)
+        if state is not None:
+            doc = delta_document(state, writer, doc)
+            if doc is None:
+                print(f"[=] {ip} sem alterações desde o último scan")
+                continue
+        writer.add(output_index, doc)
+        print(f"\n[+] Dados enfileirados para {ip}")
+
+    if state is not None:
+        for ip in chunk:
+            if ip not in answered:
+                state.record(writer, ip, [])  # Host sem resposta
+
+
+def main(
+    target_index: str,
+    incremental: bool = False,
+    freshness: int = DEFAULT_FRESHNESS,
+    batch: bool = False,
+    two_phase: bool = False,
+    resume: str = None,
+) -> None:
+    """Execução principal com paralelismo.
+
+    No modo incremental, IPs varridos dentro da janela ``freshness`` são
+    pulados e só as diferenças (portas abertas, fechadas ou com serviço
+    alterado) são gravadas no índice de portscan.
+
+    Com ``batch``, cada nmap recebe um lote de IPs (-iL) cujo tamanho se
+    ajusta ao tempo observado por host; o XML combinado é dividido de volta
+    em um documento por host.
+
+    Com ``two_phase``, uma varredura SYN rápida (masscan) encontra as portas
+    abertas de todos os IPs e só elas passam pela detecção de versão.
+
+    O progresso fica em um diário (tools.checkpoint); com ``resume`` a
+    execução indicada continua de onde parou: IPs já indexados são pulados
+    e XMLs completos que não chegaram a ser indexados são ingeridos.
+    """
     output_index = f"{target_index}-portscan"
-    ips = get_unique_ips(target_index)
+    client = get_opensearch_client()
+    install_templates(client, target_index)
+    try:
+        checkpoint = RunCheckpoint(target_index, SCANNER, resume)
+    except FileNotFoundError as e:
+        print(f"[!] {e}")
+        sys.exit(1)
+    print(f"[*] Execução {checkpoint.run_id} (retome com --resume {checkpoint.run_id})")
+    metrics.start(target_index, SCANNER, client, checkpoint.run_id)
 
-    if not ips:
-        print("[!] Nenhum IP válido encontrado para scan")
-        return
+    # IPs chegam página a página; os scans começam já com a primeira
+    ips = checkpoint.pending(get_unique_ips(target_index))
 
-    print(f"[*] Iniciando scan de {len(ips)} IPs com {MAX_WORKERS} threads...")
+    state = None
+    if incremental:
+        state = ScanState(client, target_index, SCANNER, freshness)
+        state.load()
+        ips = state.pending(ips)
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {}
+    print(f"[*] Iniciando scan com {MAX_WORKERS} threads...")
 
-        for ip in ips:
-            future = executor.submit(lambda ip: (ip, run_nmap(target_index, ip)), ip)
-            futures[future] = ip
+    silent = []
+    if two_phase:
+        open_ports = checkpoint.sweep
+        if open_ports is None:
+            open_ports = sweep_ports(target_index, ips)
+            checkpoint.swept(open_ports)
+        pending = set(checkpoint.pending(open_ports))
+        open_ports = {ip: ports for ip, ports in open_ports.items() if ip in pending}
+        silent = [ip for ip, ports in open_ports.items() if not ports]
+        results = run_each(
+            [ip for ip, ports in open_ports.items() if ports],
+            lambda ip: checkpoint.track(
+                [ip],
+                lambda job: run_service_scan(target_index, ip, open_ports[ip], job),
+            ),
+            MAX_WORKERS,
+        )
+    elif batch:
+        batcher = AdaptiveBatcher()
+        results = run_adaptive(
+            ips,
+            lambda chunk: checkpoint.track(
+                chunk, lambda job: run_nmap_batch(target_index, chunk, job)
+            ),
+            MAX_WORKERS,
+            batcher,
+        )
+    else:
+        results = run_each(
+            ips,
+            lambda ip: checkpoint.track(
+                [ip], lambda job: run_nmap(target_index, ip, job)
+            ),
+            MAX_WORKERS,
+        )
 
-        for future in as_completed(futures):
-            ip = futures[future]
+    scanned = len(silent)
+    with BulkWriter(client) as writer:
+        # XMLs completos da execução retomada: ingeridos, não varridos de novo
+        for chunk, xml_path in checkpoint.leftovers():
+            scanned += len(chunk)
+            docs = parse_nmap_results(xml_path, target_index)
+            index_documents(docs, chunk, state, writer, output_index)
+            writer.flush()
+            checkpoint.done(chunk, xml_path)
+
+        # Sem porta aberta na varredura: mesmo documento vazio do nmap -Pn
+        for ip in silent:
+            index_documents(
+                [host_document(ip, target_index)], [ip], state, writer, output_index
+            )
+        writer.flush()
+        checkpoint.done(silent)
+
+        for chunk, xml_path in results:
+            scanned += len(chunk)
             try:
-                _, xml_path = future.result()
                 if not xml_path:
-                    continue
+                    continue  # Fica pendente para o --resume
 
-                for doc in parse_nmap_results(xml_path, target_index):
-                    client.index(index=output_index, body=doc)
-                    print(f"\n[+] Dados indexados para {ip}")
+                docs = parse_nmap_results(xml_path, target_index)
+                index_documents(docs, chunk, state, writer, output_index)
+                writer.flush()
+                checkpoint.done(chunk, xml_path)
 
             except Exception as e:
-                print(f"[!] Erro crítico no IP {ip}: {e}")
+                print(f"[!] Erro crítico no lote {', '.join(chunk[:3])}: {e}")
 
+    checkpoint.close()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print(f"Uso: {sys.argv[0]} <indice_origem>")
-        sys.exit(1)
+    if not scanned:
+        print("[!] Nenhum IP válido encontrado para scan")
+        return
+
+    print(f"[*] {scanned} IPs varridos")
+    if batch and not two_phase:
+        print(f"[*] Tamanho final do lote: {batcher.size} IPs")
+
+
+def cli(argv: List[str] = None) -> None:
+    """Interface de linha de comando (também usada por ``recon portscan``)"""
+    parser = argparse.ArgumentParser(description="Port scan dos IPs de um alvo")
+    parser.add_argument("indice_origem", help="Índice com os IPs a varrer")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Pula IPs varridos recentemente e grava só as diferenças",
+    )
+    parser.add_argument(
+        "--fresh-hours",
+        type=float,
+        default=DEFAULT_FRESHNESS / 3600,
+        help="Janela de validade do modo incremental em horas (default: 24)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Agrupa vários IPs por nmap (-iL) com lote de tamanho adaptativo",
+    )
+    parser.add_argument(
+        "--two-phase",
+        action="store_true",
+        help="Varredura SYN rápida (masscan) e detecção de versão só nas abertas",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Retoma uma execução interrompida a partir do seu diário",
+    )
+    args = parser.parse_args(argv)
 
-    main(sys.argv[1])
+    main(
+        args.indice_origem,
+        args.incremental,
+        int(args.fresh_hours * 3600),
+        args.batch,
+        args.two_phase,
+        args.resume,
+    )
+
+
+if __name__ == "__main__":
+    cli()
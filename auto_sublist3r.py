@@ -1,28 +1,20 @@
 #!/usr/bin/env python3
 
 import sys
-import socket
-import requests
-import subprocess
 import uuid
-import json
 from pathlib import Path
 from time import strftime
 from conn.database import get_opensearch_client
+from conn.bulk import BulkWriter, document_id
+from conn.templates import install_templates
+from enrich.resolver import dns_cache, resolve_stream
+from tools import metrics
+from tools.pool import get_pool
+from enrich.rdap import IPBlockCache, rdap_domain, rdap_ip, zone_cache
+from enrich.wildcard import WildcardDetector, skip, wildcard_detector
 
-host = "localhost"
-port = 9200
-
-client = get_opensearch_client()
-
-target = sys.argv[1]
-domain = sys.argv[2]
 dic_sublist3r = {}
-hora = strftime("%Y-%m-%dT%H:%M:%S%Z")
 scanner = "sublist3r"
-x = str(uuid.uuid1()).split("-")[0]
-container_name = target + "-" + x + "-sublist3r"
-saida = "sublist3r-" + x + ".txt"
 
 
 def criar_diretorios(target: str) -> None:
@@ -36,103 +28,89 @@ def criar_diretorios(target: str) -> None:
     dir_temp.mkdir(parents=True, exist_ok=True)
 
 
-def rdap_ip(ip):
-    try:
-        consulta1 = subprocess.check_output(
-            "docker run --rm --name "
-            + container_name
-            + " -v /docker/recon/data/"
-            + target
-            + ":/data kali-tools:2.0 rdap "
-            + ip
-            + " --json || true",
-            shell=True,
-        )
-        json_rdap_ip = json.loads(consulta1)
-        blocoip = json_rdap_ip["handle"]
-        return blocoip
-    except:
-        return ""
-
-
-def rdap_domain(domain):
-    nameserver = ""
-    try:
-        consulta2 = requests.get("https://rdap.registro.br/domain/" + domain)
-        json_rdap = json.loads(consulta2.text)
-        for ns in json_rdap["nameservers"]:
-            nameserver = nameserver + ns["ldhName"] + ","
-        return nameserver[:-1]
-    except:
-        return ""
-
-
-def executa():
+def executa(target: str, domain: str):
     criar_diretorios(target)
 
+    pool = get_pool(target)
+    saida = f"sublist3r-{str(uuid.uuid1()).split('-')[0]}.txt"
+    # O sublist3r só grava a lista no final (-o); o arquivo já é a cópia bruta
     comando = (
-        "docker run --rm --name "
-        + container_name
-        + " -v /docker/recon/data/"
-        + target
-        + "/temp:/data"
-        + " kali-tools:2.1 /scripts/Sublist3r/sublist3r.py"
-        + " -d "
-        + domain
-        + " -o /data/"
-        + saida
-        + " || true"
+        f"/scripts/Sublist3r/sublist3r.py -n -d {domain} "
+        f"-o {pool.data_dir}/{saida} > /dev/null; cat {pool.data_dir}/{saida}"
     )
 
     print(f"Executando comando:\n{comando}")
-    subprocess.check_output(comando, shell=True)
+    return pool.stream(comando, resource="discovery")
 
 
-def parse():
+def parse(
+    lines, target: str, ip_cache: IPBlockCache, wildcards: WildcardDetector = None
+) -> None:
     index_name = target
-    with open("/docker/recon/data/" + target + "/temp/" + saida) as file:
-        for line in file:
+    hora = strftime("%Y-%m-%dT%H:%M:%S%Z")
+    client = get_opensearch_client()
+    install_templates(client, target)
+    metrics.start(target, scanner, client)
+    with BulkWriter(client) as writer:
+        for resolved in resolve_stream(lines, wildcards=wildcards):
+            if skip(resolved):
+                continue  # Curinga com RECON_WILDCARD=drop
             dic_sublist3r["timestamp"] = hora
-            dic_sublist3r["server.address"] = line.rstrip("\n")
-            dic_sublist3r["server.domain"] = line.rstrip("\n")
-            try:
-                dic_sublist3r["server.ip"] = socket.gethostbyname(line.rstrip("\n"))
-            except:
-                dic_sublist3r["server.ip"] = "0.0.0.0"
-            dic_sublist3r["vulnerability.scanner.vendor"] = scanner
-            dic_sublist3r["server.ipblock"] = rdap_ip(dic_sublist3r["server.ip"])
-            dic_sublist3r["server.nameserver"] = rdap_domain(
-                dic_sublist3r["server.domain"]
-            )
+            dic_sublist3r["server.address"] = resolved["host"]
+            dic_sublist3r["server.domain"] = resolved["host"]
+            dic_sublist3r["server.ip"] = (resolved["ipv4"] or ["0.0.0.0"])[0]
+            dic_sublist3r["network.ipv4"] = resolved["ipv4"]
+            dic_sublist3r["network.ipv6"] = resolved["ipv6"]
+            dic_sublist3r["vulnerability.scanner.vendor"] = [scanner]
+            dic_sublist3r["server.wildcard"] = resolved.get("wildcard", False)
+            dic_sublist3r["server.ipblock"] = ""
+            dic_sublist3r["server.nameserver"] = ""
+            # Nome de DNS curinga não passa pelo RDAP
+            if not dic_sublist3r["server.wildcard"]:
+                dic_sublist3r["server.ipblock"] = rdap_ip(
+                    dic_sublist3r["server.ip"], target, ip_cache
+                )
+                dic_sublist3r["server.nameserver"] = rdap_domain(
+                    dic_sublist3r["server.domain"]
+                )
 
             document = {
                 "@timestamp": dic_sublist3r["timestamp"],
                 "server.address": dic_sublist3r["server.address"],
                 "server.domain": dic_sublist3r["server.domain"],
                 "server.ip": dic_sublist3r["server.ip"],
+                "network.ipv4": dic_sublist3r["network.ipv4"],
+                "network.ipv6": dic_sublist3r["network.ipv6"],
                 "server.ipblock": dic_sublist3r["server.ipblock"],
                 "server.nameserver": dic_sublist3r["server.nameserver"],
+                "server.wildcard": dic_sublist3r["server.wildcard"],
                 "vulnerability.scanner.vendor": dic_sublist3r[
                     "vulnerability.scanner.vendor"
                 ],
             }
 
-            response = client.index(
-                index=index_name,
-                body=document,
+            # Mesmo alvo + hostname + IP = mesmo documento; fontes são unidas
+            doc_id = document_id(
+                target, dic_sublist3r["server.domain"], dic_sublist3r["server.ip"]
             )
-            saida_completa = response.copy()
-            saida_completa["document"] = document
+            writer.upsert(index_name, document, doc_id)
+            print(document)  # Imprime os dados do cliente
 
-            print(saida_completa)  # Imprime os dados do cliente e os dados do banco
-            # print(document) # Imprime os dados do cliente
-            # print(response) # Imprime somente os dados do OpenSearch
 
-
-def main():
-    executa()
-    parse()
+def main(target: str, domain: str) -> None:
+    ip_cache = IPBlockCache()
+    wildcards = wildcard_detector(domain)
+    parse(executa(target, domain), target, ip_cache, wildcards)
+    ip_cache.report()
+    zone_cache.report()
+    dns_cache.report()
+    if wildcards is not None:
+        wildcards.report()
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) != 3:
+        print(f"Uso: {sys.argv[0]} <target> <domain>")
+        sys.exit(1)
+
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark dos parsers de XML do nmap: ET.parse x iterparse (pico de RSS)"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import nmap as nmap_parser  # noqa: E402
+
+HOST = (
+    '<host starttime="1700000000" endtime="1700000010">'
+    '<status state="up" reason="user-set" reason_ttl="0"/>'
+    '<address addr="{ip}" addrtype="ipv4"/>'
+    "<hostnames/><ports>"
+    '<extraports state="filtered" count="997"/>'
+    "{ports}"
+    '</ports><times srtt="1000" rttvar="500" to="100000"/></host>\n'
+)
+PORT = (
+    '<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack"/>'
+    '<service name="{name}" product="Produto {name}" version="1.{port}" '
+    'method="probed" conf="10"/></port>'
+)
+SERVICES = [(22, "ssh"), (80, "http"), (443, "https")]
+
+
+def generate(path: str, hosts: int) -> None:
+    """Gera um XML sintético no formato do nmap -oX com ``hosts`` hosts"""
+    ports = "".join(PORT.format(port=port, name=name) for port, name in SERVICES)
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0"?>\n<nmaprun scanner="nmap" args="nmap -sSV">\n')
+        for i in range(hosts):
+            ip = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+            f.write(HOST.format(ip=ip, ports=ports))
+        f.write('<runstats><finished time="1700000100"/></runstats></nmaprun>\n')
+
+
+def parse_tree(path: str):
+    """Estratégia anterior: carrega a árvore inteira antes de gerar documentos"""
+    tree = ET.parse(path)
+    return list(nmap_parser.host_documents(tree.findall("host"), "bench"))
+
+
+def parse_stream(path: str):
+    """iterparse: cada documento segue para o indexador assim que sai"""
+    return nmap_parser.parse(path, "bench")
+
+
+def measure(mode: str, path: str) -> None:
+    """Executado em processo filho para isolar o pico de memória"""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    parse = parse_tree if mode == "tree" else parse_stream
+    for _ in parse(path):  # Consumidor nulo no lugar do BulkWriter
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "docs": count,
+                "seconds": elapsed,
+                "first_doc": first,
+                "peak_rss_mb": rss_kb / 1024,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos parsers do nmap")
+    parser.add_argument("--hosts", type=int, default=100000)
+    parser.add_argument("--xml", help="Usa um XML existente em vez do sintético")
+    parser.add_argument("--measure", choices=["tree", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.xml)
+        return
+
+    path = args.xml
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), f"nmap-{args.hosts}.xml")
+        generate(path, args.hosts)
+    size = os.path.getsize(path) / 2**20
+    print(f"[*] XML com {size:,.1f} MB em {path}")
+
+    for mode in ["tree", "stream"]:
+        result = subprocess.run(
+            [sys.executable, __file__, "--measure", mode, "--xml", path],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(
+            f"[*] {mode:<6} docs={stats['docs']:<7} "
+            f"tempo={stats['seconds']:.2f}s "
+            f"primeiro_doc={stats['first_doc']:.3f}s "
+            f"pico_rss={stats['peak_rss_mb']:.1f} MB"
+        )
+
+    if not args.xml:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""Benchmark ponta a ponta dos estágios do pipeline sem Docker, DNS ou OpenSearch.
+
+Cada cenário (estágio x número de hosts) roda em um processo filho com
+RECON_EXEC_MODE=local e ferramentas falsas no PATH (subfinder, rdap, nmap e
+httpx com latência configurável), o FakeResolver no lugar do DNS, o servidor
+RDAP local e um OpenSearch em memória. As funções do pipeline são as reais:
+
+    discover  discover.run com o subfinder (descoberta, DNS, RDAP, upsert)
+    nmap      auto_nmap.main em lotes adaptativos (nmap -iL, parse, bulk)
+    httpx     auto_httpx.main (lotes concorrentes, JSON, bulk no <alvo>-http)
+
+Relata docs/s, p50/p99 por etapa e pico de RSS do processo, e compara com
+a linha de base em bench/baseline_pipeline.json (gravada com --save).
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "bench", "baseline_pipeline.json")
+STAGES = ["discover", "nmap", "httpx"]
+DOMAIN = "exemplo.com.br"  # Conhecido pelo servidor RDAP local
+TARGET = "bench"
+
+# Ferramentas falsas: mesmos argumentos e formato de saída das reais
+# ("#!python" vira o interpretador atual)
+FAKE_TOOLS = {
+    "subfinder": """#!python
+import json, os, sys, time
+domain = sys.argv[sys.argv.index("-d") + 1]
+delay = float(os.environ["BENCH_TOOL_LATENCY"])
+for i in range(int(os.environ["BENCH_HOSTS"])):
+    time.sleep(delay)
+    print(json.dumps({"host": f"h{i}.{domain}", "input": domain, "source": "bench"}), flush=True)
+""",
+    # sh em vez de Python: o rdap real (Go) não paga a partida do interpretador
+    "rdap": """#!/bin/sh
+a=${1%%.*}; rest=${1#*.}; b=${rest%%.*}
+printf '{"handle":"NET-%s-%s","startAddress":"%s.0.0","endAddress":"%s.255.255"}\\n' \\
+    "$a" "$b" "$a.$b" "$a.$b"
+""",
+    "nmap": """#!python
+import os, sys, time
+args = sys.argv[1:]
+output = args[args.index("-oX") + 1]
+if "-iL" in args:
+    ips = open(args[args.index("-iL") + 1]).read().split()
+else:
+    ips = [args[args.index("-oX") - 1]]
+time.sleep(float(os.environ["BENCH_TOOL_LATENCY"]) * len(ips))
+port = (
+    '<port protocol="tcp" portid="{0}"><state state="open" reason="syn-ack"/>'
+    '<service name="{1}" product="Produto {1}" version="1.{0}"/></port>'
+)
+ports = "".join(port.format(*p) for p in [(22, "ssh"), (80, "http"), (443, "https")])
+with open(output, "w") as f:
+    f.write('<?xml version="1.0"?><nmaprun scanner="nmap">')
+    for ip in ips:
+        f.write(
+            f'<host><status state="up"/><address addr="{ip}" addrtype="ipv4"/>'
+            f"<ports>{ports}</ports></host>"
+        )
+    f.write('<runstats><finished time="0"/></runstats></nmaprun>')
+""",
+    "httpx": """#!python
+import json, os, sys, time, zlib
+domains = open(sys.argv[sys.argv.index("-l") + 1]).read().split()
+delay = float(os.environ["BENCH_TOOL_LATENCY"])
+for i, domain in enumerate(domains):
+    time.sleep(delay)
+    if zlib.crc32(domain.encode()) % 10 == 0:
+        continue  # Parte dos domínios sem resposta HTTP
+    print(json.dumps({
+        "input": domain, "host": domain, "url": f"https://{domain}",
+        "scheme": "https", "port": "443", "a": ["10.0.0.1"], "status_code": 200,
+        "title": "Bench", "webserver": "nginx", "tech": ["Nginx"],
+        "content_length": 1234, "time": "12.5ms",
+    }), flush=True)
+""",
+}
+
+
+class MemoryOpenSearch:
+    """OpenSearch em memória com o subconjunto da API usado pelo pipeline.
+
+    Decodifica cada linha do _bulk como o servidor faria, mas guarda só os
+    _id e os valores dos campos agregados (server.ip, server.domain), para
+    que o pico de memória medido seja o do pipeline e não o do índice.
+    """
+
+    FIELDS = ("server.ip", "server.domain")
+
+    def __init__(self) -> None:
+        self.docs = 0
+        self.ids: Dict[str, set] = {}
+        self.values: Dict[str, Dict[str, set]] = {}
+        self.indices = self
+        self._lock = threading.Lock()
+
+    def seed(self, index: str, field: str, values: List[str]) -> None:
+        self.values.setdefault(index, {}).setdefault(field, set()).update(values)
+
+    def bulk(self, body: str) -> Dict:
+        lines = body.splitlines()
+        items = []
+        with self._lock:
+            for action_line, source_line in zip(lines[::2], lines[1::2]):
+                kind, action = next(iter(json.loads(action_line).items()))
+                source = json.loads(source_line)
+                source = source.get("upsert", source) if kind == "update" else source
+                index = action["_index"]
+                self.ids.setdefault(index, set()).add(action.get("_id", self.docs))
+                for field in self.FIELDS:
+                    if source.get(field):
+                        self.seed(index, field, [source[field]])
+                self.docs += 1
+                items.append({kind: {"status": 201}})
+        return {"errors": False, "items": items}
+
+    def search(self, index: str, body: Dict) -> Dict:
+        """Agregação composite de um campo, como em conn.query"""
+        composite = body["aggs"]["unique"]["composite"]
+        field = composite["sources"][0]["value"]["terms"]["field"]
+        after = composite.get("after", {}).get("value")
+        values = sorted(self.values.get(index, {}).get(field, set()))
+        if after is not None:
+            values = [value for value in values if value > after]
+        page = values[: composite["size"]]
+        result = {"buckets": [{"key": {"value": value}} for value in page]}
+        if page:
+            result["after_key"] = {"value": page[-1]}
+        return {"aggregations": {"unique": result}}
+
+    def index(self, index: str, body: Dict, id: str = None) -> Dict:
+        return self.bulk(f'{{"index": {{"_index": "{index}"}}}}\n{json.dumps(body)}\n')
+
+    # indices.*
+    def refresh(self, index: str) -> None:
+        pass
+
+    def exists(self, index: str) -> bool:
+        return index in self.ids
+
+    def put_index_template(self, name: str, body: Dict) -> None:
+        pass
+
+    def get_field_mapping(self, index: str, fields: str) -> Dict:
+        return {}
+
+
+class StageTimer:
+    """Coleta a duração de cada chamada das funções instrumentadas"""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, owner, name: str, stage: str) -> None:
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def summary(self) -> Dict[str, Dict]:
+        summary = {}
+        for stage, samples in self.samples.items():
+            samples = sorted(samples)
+            summary[stage] = {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+            }
+        return summary
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+
+def run_discover(store: MemoryOpenSearch, timer: StageTimer, args) -> None:
+    import asyncio
+    import discover
+    import enrich.rdap as rdap
+    import enrich.resolver as resolver
+    from bench.rdap_stub import start_stub_server
+
+    server, url = start_stub_server()
+    rdap.RDAP_DOMAIN_URL = url
+
+    class TimedResolver(resolver.FakeResolver):
+        async def query(self, host: str, record: str) -> List[str]:
+            start = time.perf_counter()
+            try:
+                return await super().query(host, record)
+            finally:
+                timer.record("dns", time.perf_counter() - start)
+
+    def bench_resolver(concurrency: int = resolver.DEFAULT_CONCURRENCY):
+        fake = TimedResolver(latency=args.dns_latency, jitter=args.dns_latency / 2)
+        if resolver.CACHE_ENABLED:
+            return resolver.CachedResolver(fake, resolver.dns_cache)
+        return fake
+
+    resolver.default_resolver = bench_resolver
+    timer.wrap(discover, "rdap_ip", "rdap_ip")
+    timer.wrap(discover, "rdap_domain", "rdap_domain")
+    timer.wrap(discover, "build_document", "enrich")
+    asyncio.run(discover.run(TARGET, DOMAIN, ["subfinder"]))
+    server.shutdown()
+
+
+def run_nmap(store: MemoryOpenSearch, timer: StageTimer, args) -> None:
+    import auto_nmap
+
+    store.seed(TARGET, "server.ip", [ip_address(i) for i in range(args.hosts)])
+    timer.wrap(auto_nmap, "run_nmap_batch", "nmap")
+    timer.wrap(auto_nmap, "index_documents", "parse_index")
+    auto_nmap.main(TARGET, batch=True)
+
+
+def run_httpx(store: MemoryOpenSearch, timer: StageTimer, args) -> None:
+    import auto_httpx
+
+    domains = [f"h{i}.{DOMAIN}" for i in range(args.hosts)]
+    store.seed(TARGET, "server.domain", domains)
+    timer.wrap(auto_httpx, "probe_batch", "httpx")
+    sys.argv = [auto_httpx.__file__, TARGET]
+    auto_httpx.main()
+
+
+RUNNERS = {"discover": run_discover, "nmap": run_nmap, "httpx": run_httpx}
+
+
+def ip_address(i: int) -> str:
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def measure(args) -> None:
+    """Executado em processo filho, com o ambiente já isolado pelo pai"""
+    import conn.database
+
+    store = MemoryOpenSearch()
+    conn.database.get_opensearch_client = lambda: store
+
+    from conn.bulk import BulkWriter
+
+    timer = StageTimer()
+    timer.wrap(BulkWriter, "_send", "bulk")
+
+    # A saída do pipeline (um print por documento) não entra na medida
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    start = time.perf_counter()
+    try:
+        RUNNERS[args.measure](store, timer, args)
+    finally:
+        elapsed = time.perf_counter() - start
+        sys.stdout = stdout
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {
+        "stage": args.measure,
+        "hosts": args.hosts,
+        "docs": store.docs,
+        "seconds": elapsed,
+        "docs_per_sec": store.docs / elapsed if elapsed else 0.0,
+        "peak_rss_mb": rss_kb / 1024,
+        "latency": timer.summary(),
+    }
+    print(json.dumps(result))
+
+
+def run_scenario(stage: str, hosts: int, args) -> Dict:
+    """Prepara diretório, ferramentas falsas e ambiente e roda o filho"""
+    with tempfile.TemporaryDirectory(prefix="recon-bench-") as workdir:
+        bin_dir = Path(workdir, "bin")
+        bin_dir.mkdir()
+        for name, code in FAKE_TOOLS.items():
+            tool = bin_dir / name
+            tool.write_text(code.replace("#!python", f"#!{sys.executable}", 1))
+            tool.chmod(0o755)
+
+        env = {
+            **os.environ,
+            "PATH": f"{bin_dir}:{os.environ.get('PATH', '')}",
+            "PYTHONPATH": ROOT,
+            "RECON_EXEC_MODE": "local",
+            "RECON_DATA_ROOT": f"{workdir}/data",
+            "RECON_CACHE_DIR": f"{workdir}/cache",
+            "RECON_SCHEDULER_DIR": f"{workdir}/scheduler",
+            "RECON_KEEP_RAW": "0",
+            "RECON_METRICS_DIR": f"{workdir}/metrics",
+            "BENCH_HOSTS": str(hosts),
+            "BENCH_TOOL_LATENCY": str(args.tool_latency),
+        }
+        command = [
+            sys.executable,
+            __file__,
+            "--measure",
+            stage,
+            "--hosts",
+            str(hosts),
+            "--dns-latency",
+            str(args.dns_latency),
+        ]
+        result = subprocess.run(
+            command, env=env, capture_output=True, text=True, check=True
+        )
+        # O resumo de métricas é exibido depois, ao sair do processo
+        lines = result.stdout.splitlines()
+        return json.loads(next(line for line in lines if line.startswith("{")))
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressões de vazão e memória além da tolerância"""
+    regressions = []
+    if result["docs_per_sec"] < baseline["docs_per_sec"] * (1 - tolerance):
+        regressions.append("docs/s")
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append("memória")
+    return regressions
+
+
+def delta(current: float, base: float) -> str:
+    return f"{(current / base - 1) * 100:+.0f}%" if base else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de recon")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--tool-latency",
+        type=float,
+        default=0.0005,
+        help="Segundos por host nas ferramentas falsas (default: 0.0005)",
+    )
+    parser.add_argument(
+        "--dns-latency",
+        type=float,
+        default=0.02,
+        help="Latência de cada consulta do FakeResolver (default: 0.02)",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Grava os resultados como linha de base"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Sai com código 1 se houver regressão em relação à linha de base",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--measure", choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        args.hosts = args.hosts[0]
+        measure(args)
+        return
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+
+    results = dict(baseline) if args.save else {}
+    regressions = 0
+    for stage in args.stages:
+        for hosts in args.hosts:
+            result = run_scenario(stage, hosts, args)
+            key = f"{stage}-{hosts}"
+            results[key] = result
+
+            stages = " ".join(
+                f"{name}={info['p50_ms']:.1f}/{info['p99_ms']:.1f}ms"
+                for name, info in sorted(result["latency"].items())
+            )
+            print(
+                f"[*] {stage:<8} hosts={hosts:<7} docs={result['docs']:<7} "
+                f"{result['docs_per_sec']:,.0f} docs/s "
+                f"pico_rss={result['peak_rss_mb']:.1f} MB"
+            )
+            print(f"    p50/p99: {stages}")
+
+            if key in baseline and not args.save:
+                base = baseline[key]
+                found = compare(result, base, args.tolerance)
+                regressions += bool(found)
+                print(
+                    f"    linha de base: docs/s "
+                    f"{delta(result['docs_per_sec'], base['docs_per_sec'])}, "
+                    f"memória {delta(result['peak_rss_mb'], base['peak_rss_mb'])}"
+                    + (f"  [!] regressão em {', '.join(found)}" if found else "")
+                )
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[+] Linha de base gravada em {BASELINE}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
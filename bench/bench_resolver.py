@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Benchmark offline do motor de resolução DNS usando o FakeResolver"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrich.resolver import FakeResolver, resolve_stream  # noqa: E402
+
+
+def run(total: int, concurrency: int, latency: float) -> float:
+    """Resolve ``total`` nomes sintéticos e retorna nomes por segundo"""
+    hosts = (f"host{i}.exemplo.gov.br" for i in range(total))
+    resolver = FakeResolver(latency=latency)
+
+    start = time.perf_counter()
+    resolved = sum(1 for _ in resolve_stream(hosts, resolver, concurrency))
+    elapsed = time.perf_counter() - start
+
+    assert resolved == total
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do resolvedor DNS")
+    parser.add_argument("--hosts", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 50, 200, 500])
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        # Com concorrência 1 o total é limitado para não demorar demais
+        total = min(args.hosts, 200) if concurrency == 1 else args.hosts
+        rate = run(total, concurrency, args.latency)
+        print(f"[*] concorrência={concurrency:<5} hosts={total:<7} {rate:,.0f} hosts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Custo de inicialização do recon.py e de cada estágio (python -X importtime).
+
+Cada cenário roda RUNS vezes em um interpretador novo, depois de uma
+execução de aquecimento (bytecode já em __pycache__):
+
+    recon     recon.py --help (o que todo subcomando paga antes do estágio)
+    <estágio> importação do módulo que o subcomando carrega
+
+Relata o tempo total do processo e o de importações (descontado o que o
+próprio interpretador importa em ``python -c pass``), os pacotes
+mais pesados e a comparação com bench/baseline_startup.json
+(gravada com --save, junto com o ambiente: versão do Python e dos pacotes
+que pesam na importação; o aiohttp, se instalado, é importado pelo
+opensearchpy).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from importlib import metadata
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "bench", "baseline_startup.json")
+SCENARIOS = {
+    "recon": [os.path.join(ROOT, "recon.py"), "--help"],
+    "discover": ["-c", "import discover"],
+    "resolve": ["-c", "import enrich.resolver"],
+    "portscan": ["-c", "import auto_nmap"],
+    "http": ["-c", "import auto_httpx"],
+    "query": ["-c", "import consulta_subdomain"],
+}
+ENVIRONMENT = "_environment"  # Chave do ambiente na linha de base
+PACKAGES = ["opensearch-py", "aiohttp", "requests", "urllib3", "tqdm"]
+
+
+def environment() -> Dict[str, str]:
+    """Python, plataforma e versões dos pacotes que pesam na importação"""
+    env = {"python": platform.python_version(), "platform": platform.platform()}
+    for package in PACKAGES:
+        try:
+            env[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            env[package] = "ausente"
+    return env
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """Soma das importações de primeiro nível (ms) e o custo de cada pacote
+
+    O custo de um pacote é o acumulado da sua importação mais externa,
+    em qualquer profundidade (opensearchpy dentro de conn.database conta).
+    """
+    total = 0.0
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Cabeçalho
+        ms = int(cumulative) / 1000
+        if not name.startswith("  "):
+            total += ms
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), ms)
+    return total, packages
+
+
+def run_once(args: List[str]) -> Tuple[float, float, Dict[str, float]]:
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = (time.perf_counter() - start) * 1000
+    imports, top = parse_importtime(result.stderr)
+    return wall, imports, top
+
+
+def measure(args: List[str], runs: int, interpreter: Tuple[float, set]) -> Dict:
+    run_once(args)  # Aquecimento: compila e grava o bytecode
+    walls, imports = [], []
+    for _ in range(runs):
+        wall, total, top = run_once(args)
+        walls.append(wall)
+        imports.append(max(0.0, total - interpreter[0]))  # Ruído pode dar negativo
+
+    own = args[-1].split()[-1].split(".")[0]  # O próprio módulo do cenário
+    heaviest = sorted(
+        (
+            (name, ms)
+            for name, ms in top.items()
+            if name not in interpreter[1] and name != own
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "wall_ms": statistics.median(walls),
+        "import_ms": statistics.median(imports),
+        "heaviest": {name: round(ms, 1) for name, ms in heaviest[:5]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--save", action="store_true", help="Grava os resultados como linha de base"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Sai com código 1 se houver regressão em relação à linha de base",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+
+    # O que o interpretador importa sozinho (site, encodings...) não conta
+    run_once(["-c", "pass"])
+    samples = [run_once(["-c", "pass"]) for _ in range(args.runs)]
+    interpreter = (
+        statistics.median(imports for _, imports, _ in samples),
+        set(samples[-1][2]),
+    )
+    print(f"[*] python -c pass: {statistics.median(w for w, _, _ in samples):.0f} ms")
+
+    env = environment()
+    base_env = baseline.get(ENVIRONMENT, {})
+    if baseline and not args.save and base_env != env:
+        changed = [
+            f"{key}={base_env.get(key, '?')}->{value}"
+            for key, value in env.items()
+            if base_env.get(key) != value
+        ]
+        print(f"[!] Ambiente diferente da linha de base: {' '.join(changed)}")
+
+    results = dict(baseline) if args.save else {}
+    results[ENVIRONMENT] = env
+    regressions = 0
+    for name in args.scenarios:
+        result = measure(SCENARIOS[name], args.runs, interpreter)
+        results[name] = result
+        heaviest = " ".join(f"{mod}={ms:.0f}" for mod, ms in result["heaviest"].items())
+        print(
+            f"[*] {name:<9} processo={result['wall_ms']:6.0f} ms "
+            f"importações={result['import_ms']:6.0f} ms"
+        )
+        if heaviest:
+            print(f"    mais pesadas (ms): {heaviest}")
+
+        if name in baseline and not args.save:
+            base = baseline[name]["import_ms"]
+            change = (result["import_ms"] / base - 1) if base else 0.0
+            # Abaixo de 5 ms a variação é ruído de medida
+            regressed = change > args.tolerance and result["import_ms"] - base > 5
+            regressions += regressed
+            print(
+                f"    linha de base: importações {change * 100:+.0f}%"
+                + ("  [!] regressão" if regressed else "")
+            )
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[+] Linha de base gravada em {BASELINE}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
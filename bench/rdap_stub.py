@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Servidor RDAP local para testes, benchmarks e desenvolvimento sem rede.
+
+Responde /domain/<nome> no mesmo formato do rdap.registro.br para os domínios
+conhecidos e 404 para os demais. Para apontar os coletores para ele:
+
+    python bench/rdap_stub.py 8053
+    RECON_RDAP_DOMAIN_URL=http://127.0.0.1:8053/domain/
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+DEFAULT_DOMAINS = {
+    "pm.ro.gov.br": ["ns1.pm.ro.gov.br", "ns2.pm.ro.gov.br"],
+    "exemplo.com.br": ["a.dns.br", "b.dns.br"],
+}
+
+
+class StubRdapServer(ThreadingHTTPServer):
+    """Servidor HTTP que conta as requisições recebidas por domínio"""
+
+    daemon_threads = True
+
+    def __init__(self, address, domains: Dict[str, List[str]]) -> None:
+        super().__init__(address, _Handler)
+        self.domains = domains
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = self.path.rstrip("/").rsplit("/", 1)[-1].lower()
+        self.server.count(name)
+
+        if not self.path.startswith("/domain/") or name not in self.server.domains:
+            self._reply(404, {"errorCode": 404, "title": "Not Found"})
+            return
+
+        self._reply(
+            200,
+            {
+                "objectClassName": "domain",
+                "handle": name,
+                "ldhName": name,
+                "nameservers": [
+                    {"objectClassName": "nameserver", "ldhName": ns}
+                    for ns in self.server.domains[name]
+                ],
+            },
+        )
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/rdap+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(
+    domains: Dict[str, List[str]] = None, port: int = 0
+) -> Tuple[StubRdapServer, str]:
+    """Sobe o servidor em uma thread e retorna (servidor, URL base /domain/)"""
+    server = StubRdapServer(("127.0.0.1", port), domains or DEFAULT_DOMAINS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/domain/"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8053
+    server, url = start_stub_server(port=port)
+    print(f"[*] Stub RDAP em {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,225 @@
+# bulk.py
+import hashlib
+import json
+import threading
+import time
+from conn.database import get_opensearch_client
+from tools import metrics
+
+# Configurações
+MAX_DOCS = 500  # Documentos por lote
+MAX_BYTES = 5 * 1024 * 1024  # 5 MB por requisição _bulk
+MAX_RETRIES = 3
+RETRY_STATUS = {429, 502, 503, 504}  # Falhas transitórias que valem nova tentativa
+BACKOFF_BASE = 0.5  # Segundos
+MERGE_FIELDS = ("vulnerability.scanner.vendor",)  # Listas unidas no upsert
+
+# Sobrescreve os campos do documento existente e une as listas de ``merge``
+MERGE_SCRIPT = """
+Map merged = new HashMap();
+for (entry in params.merge.entrySet()) {
+  List values = new ArrayList();
+  def current = ctx._source[entry.getKey()];
+  if (current instanceof List) { values.addAll(current); }
+  else if (current != null) { values.add(current); }
+  for (value in entry.getValue()) {
+    if (!values.contains(value)) { values.add(value); }
+  }
+  Collections.sort(values);
+  merged[entry.getKey()] = values;
+}
+ctx._source.putAll(params.doc);
+ctx._source.putAll(merged);
+"""
+
+
+def document_id(*parts: str) -> str:
+    """_id determinístico a partir das partes (ex.: alvo, hostname, IP)"""
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+class BulkWriter:
+    """Acumula documentos e envia ao OpenSearch em lotes via API _bulk.
+
+    O lote é enviado quando atinge ``max_docs`` documentos ou ``max_bytes``
+    bytes. Itens rejeitados com erro transitório (429/5xx) são reenviados com
+    backoff exponencial. Ao fechar, os índices usados recebem um único refresh.
+
+    Seguro entre threads: o lock só protege o buffer. O envio e as esperas
+    do backoff acontecem fora dele, na thread que completou o lote, e as
+    demais seguem enfileirando documentos.
+
+    Uso:
+        with BulkWriter() as writer:
+            writer.add("alvo", documento)
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_docs: int = MAX_DOCS,
+        max_bytes: int = MAX_BYTES,
+        max_retries: int = MAX_RETRIES,
+        refresh: bool = True,
+    ) -> None:
+        self.client = client or get_opensearch_client()
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.refresh = refresh
+        self.indexed = 0
+        self.failed = 0
+        self._buffer = []  # Pares (linha de ação, linha do documento)
+        self._bytes = 0
+        self._indices = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._sending = 0  # Lotes retirados do buffer e ainda em envio
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, index: str, document: dict, doc_id: str = None) -> None:
+        """Adiciona um documento ao buffer, enviando o lote se estiver cheio"""
+        action = {"index": {"_index": index}}
+        if doc_id is not None:
+            action["index"]["_id"] = doc_id
+
+        self._enqueue(index, action, document)
+
+    def upsert(
+        self,
+        index: str,
+        document: dict,
+        doc_id: str,
+        merge: tuple = MERGE_FIELDS,
+    ) -> None:
+        """Cria ou atualiza o documento ``doc_id`` sem duplicar o ativo.
+
+        Os campos do documento substituem os existentes, exceto os de
+        ``merge``, cujos valores são unidos aos já gravados (ex.: a lista
+        de ferramentas que encontraram o hostname).
+        """
+        lists = {}
+        for field in merge:
+            value = document.get(field, [])
+            lists[field] = sorted(value if isinstance(value, list) else [value])
+
+        action = {"update": {"_index": index, "_id": doc_id, "retry_on_conflict": 3}}
+        body = {
+            "script": {
+                "source": MERGE_SCRIPT,
+                "lang": "painless",
+                "params": {"doc": document, "merge": lists},
+            },
+            "upsert": {**document, **lists},
+        }
+        self._enqueue(index, action, body)
+
+    def _enqueue(self, index: str, action: dict, source: dict) -> None:
+        item = (json.dumps(action), json.dumps(source, default=str))
+        size = len(item[0]) + len(item[1]) + 2
+
+        batches = []
+        with self._lock:
+            if self._buffer and self._bytes + size > self.max_bytes:
+                batches.append(self._take_locked())
+            self._buffer.append(item)
+            self._bytes += size
+            self._indices.add(index)
+            if len(self._buffer) >= self.max_docs:
+                batches.append(self._take_locked())
+        for batch in batches:
+            self._deliver(batch)
+
+    def flush(self) -> None:
+        """Envia o buffer e espera os lotes que outras threads estão enviando"""
+        with self._lock:
+            batch = self._take_locked()
+        self._deliver(batch)
+        with self._idle:
+            self._idle.wait_for(lambda: self._sending == 0)
+
+    def close(self) -> None:
+        """Envia o restante do buffer e faz um único refresh nos índices"""
+        self.flush()
+        with self._lock:
+            indices = sorted(self._indices)
+        if self.refresh and indices:
+            try:
+                self.client.indices.refresh(index=",".join(indices))
+            except Exception as e:
+                print(f"[!] Falha no refresh dos índices: {e}")
+        if self.failed:
+            print(f"[!] {self.failed} documentos não puderam ser indexados")
+
+    def _take_locked(self) -> list:
+        """Retira o lote do buffer (com o lock) e o marca como em envio"""
+        batch = self._buffer
+        self._buffer = []
+        self._bytes = 0
+        self._sending += 1
+        return batch
+
+    def _deliver(self, pending: list) -> None:
+        """Envia um lote retirado do buffer, com retentativas, fora do lock"""
+        try:
+            attempt = 0
+            while pending:
+                pending = self._send(pending)
+                if not pending:
+                    break
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    with self._lock:
+                        self.failed += len(pending)
+                    print(
+                        f"[!] Desistindo de {len(pending)} documentos após retentativas"
+                    )
+                    break
+                time.sleep(BACKOFF_BASE * (2 ** (attempt - 1)))
+        finally:
+            with self._idle:
+                self._sending -= 1
+                self._idle.notify_all()
+
+    def _send(self, items: list) -> list:
+        """Envia um lote e retorna os itens que devem ser reenviados"""
+        payload = "".join(f"{action}\n{source}\n" for action, source in items)
+
+        try:
+            with metrics.timer("index", "bulk"):
+                response = self.client.bulk(body=payload)
+        except Exception as e:
+            print(f"[!] Erro na requisição _bulk: {str(e)[:100]}")
+            return items
+
+        if not response.get("errors"):
+            with self._lock:
+                self.indexed += len(items)
+            metrics.count("documents", len(items), stage="index", result="indexed")
+            return []
+
+        retry = []
+        indexed = failed = 0
+        for item, result in zip(items, response["items"]):
+            info = next(iter(result.values()), {})  # index ou update
+            if "error" not in info:
+                indexed += 1
+                metrics.count("documents", stage="index", result="indexed")
+            elif info.get("status") in RETRY_STATUS:
+                retry.append(item)
+                metrics.count("documents", stage="index", result="retried")
+            else:
+                failed += 1
+                metrics.count("documents", stage="index", result="failed")
+                print(f"[!] Documento rejeitado: {str(info['error'])[:100]}")
+
+        with self._lock:
+            self.indexed += indexed
+            self.failed += failed
+        return retry
@@ -1,19 +1,148 @@
 # database.py
-from opensearchpy import OpenSearch
+import asyncio
+import os
+import random
+import threading
+import time
+from tools import metrics
+
+# Configurações
+OPENSEARCH_HOST = os.environ.get("RECON_OPENSEARCH_HOST", "localhost")
+OPENSEARCH_PORT = int(os.environ.get("RECON_OPENSEARCH_PORT", 9200))
+OPENSEARCH_USER = os.environ.get("RECON_OPENSEARCH_USER", "")
+OPENSEARCH_PASSWORD = os.environ.get("RECON_OPENSEARCH_PASSWORD", "")
+OPENSEARCH_SSL = os.environ.get("RECON_OPENSEARCH_SSL", "0") != "0"
+# Conexões mantidas abertas: cobre as threads de varredura e o BulkWriter
+POOL_MAXSIZE = int(os.environ.get("RECON_OPENSEARCH_POOL", 25))
+TIMEOUT = int(os.environ.get("RECON_OPENSEARCH_TIMEOUT", 60))  # Segundos
+# Tentativas extras por requisição: 429, rede/timeout e 502/503/504
+MAX_RETRIES = int(os.environ.get("RECON_OPENSEARCH_RETRIES", 5))
+BACKOFF_BASE = 0.5  # Segundos, dobrando a cada tentativa
+BACKOFF_MAX = 30
+
+_client = None
+_transport = None
+_lock = threading.Lock()
+
+
+def _backoff(attempt: int) -> float:
+    """Espera exponencial com jitter, para os processos não voltarem juntos"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _retryable(transport, error) -> bool:
+    """Se o erro merece nova tentativa (mesmos critérios do Transport + 429)"""
+    from opensearchpy.exceptions import ConnectionError, ConnectionTimeout
+
+    if isinstance(error, ConnectionTimeout):
+        return transport.retry_on_timeout
+    if isinstance(error, ConnectionError):
+        return True
+    return error.status_code == 429 or error.status_code in transport.retry_on_status
+
+
+def throttled_transport() -> type:
+    """Classe ThrottledTransport, criada no primeiro uso.
+
+    opensearchpy (e o aiohttp que ele importa, se instalado) só é carregado
+    quando um cliente é criado: importar os estágios e o ``--help`` dos
+    subcomandos não pagam por ele.
+    """
+    global _transport
+    if _transport is not None:
+        return _transport
+    from opensearchpy import Transport, TransportError
+
+    class ThrottledTransport(Transport):
+        """Transport que, além dos erros de rede, repete respostas 429.
+
+        O Transport padrão não repete o 429 (fora de ``retry_on_status``): a
+        fila cheia do OpenSearch viraria falha na hora. Aqui todas as novas
+        tentativas ficam neste laço, com backoff exponencial, e o Transport
+        interno roda com max_retries=0, para que as duas contagens não se
+        multipliquem: são no máximo MAX_RETRIES + 1 tentativas por requisição.
+        """
+
+        def perform_request(self, method, url, *args, **kwargs):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    return super().perform_request(method, url, *args, **kwargs)
+                except TransportError as e:
+                    if not _retryable(self, e) or attempt == MAX_RETRIES:
+                        raise
+                    if e.status_code == 429:
+                        metrics.count("opensearch_throttled")
+                    time.sleep(_backoff(attempt))
+
+    _transport = ThrottledTransport
+    return _transport
+
+
+def client_options() -> dict:
+    """Parâmetros comuns aos clientes síncrono e assíncrono"""
+    options = {
+        "hosts": [{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
+        "http_compress": True,  # gzip no corpo das requisições
+        "use_ssl": OPENSEARCH_SSL,
+        "verify_certs": False,
+        "ssl_assert_hostname": False,
+        "ssl_show_warn": False,
+        "pool_maxsize": POOL_MAXSIZE,
+        "timeout": TIMEOUT,
+        "max_retries": 0,  # Novas tentativas no laço do ThrottledTransport
+        "retry_on_timeout": True,
+    }
+    if OPENSEARCH_USER:
+        options["http_auth"] = (OPENSEARCH_USER, OPENSEARCH_PASSWORD)
+    return options
 
 
 def get_opensearch_client():
-    """Retorna o cliente OpenSearch configurado."""
-    host = "localhost"
-    port = 9200
-
-    client = OpenSearch(
-        hosts=[{"host": host, "port": port}],
-        http_compress=True,
-        use_ssl=False,
-        verify_certs=False,
-        ssl_assert_hostname=False,
-        ssl_show_warn=False,
-    )
-
-    return client
+    """Retorna o cliente OpenSearch configurado.
+
+    O cliente é criado uma vez por processo e compartilhado: ele é seguro
+    entre threads e o pool de conexões (RECON_OPENSEARCH_POOL) atende os
+    workers de varredura sem abrir uma conexão por requisição.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            from opensearchpy import OpenSearch
+
+            _client = OpenSearch(
+                transport_class=throttled_transport(), **client_options()
+            )
+    return _client
+
+
+def get_async_opensearch_client():
+    """Retorna um AsyncOpenSearch com as mesmas configurações.
+
+    Requer aiohttp (pip install opensearch-py[async]). Um cliente por event
+    loop: quem cria deve chamar ``await client.close()`` ao terminar.
+    """
+    try:
+        from opensearchpy import AsyncOpenSearch, TransportError
+        from opensearchpy._async.transport import AsyncTransport
+    except ImportError:
+        raise ImportError(
+            "Cliente assíncrono requer aiohttp: pip install opensearch-py[async]"
+        )
+
+    class AsyncThrottledTransport(AsyncTransport):
+        async def perform_request(self, method, url, *args, **kwargs):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    return await super().perform_request(method, url, *args, **kwargs)
+                except TransportError as e:
+                    if not _retryable(self, e) or attempt == MAX_RETRIES:
+                        raise
+                    if e.status_code == 429:
+                        metrics.count("opensearch_throttled")
+                    await asyncio.sleep(_backoff(attempt))
+
+    # AIOHttpConnection dimensiona o pool por "maxsize", não "pool_maxsize"
+    options = client_options()
+    options["maxsize"] = options.pop("pool_maxsize")
+    return AsyncOpenSearch(transport_class=AsyncThrottledTransport, **options)
@@ -0,0 +1,77 @@
+# query.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator
+
+# Configurações
+PAGE_SIZE = 1000  # Buckets por página da agregação composite
+# Nomes de DNS curinga (enrich.wildcard): fora do port scan e do httpx
+WILDCARD = {"term": {"server.wildcard": True}}
+
+_keyword_fields = {}
+
+
+def keyword_field(client, index: str, field: str) -> str:
+    """Nome do campo agregável: ``field`` ou ``field.keyword`` (índice antigo).
+
+    Índices criados pelos templates (conn.templates) já têm o campo como
+    keyword/ip; os criados por mapeamento dinâmico só agregam pelo
+    subcampo .keyword.
+    """
+    key = (index, field)
+    if key not in _keyword_fields:
+        try:
+            mapping = client.indices.get_field_mapping(
+                index=index, fields=f"{field}.keyword"
+            )
+            legacy = any(item.get("mappings") for item in mapping.values())
+        except Exception:
+            legacy = False
+        _keyword_fields[key] = f"{field}.keyword" if legacy else field
+    return _keyword_fields[key]
+
+
+def iter_unique_values(
+    client, index: str, field: str, query: Dict = None, page_size: int = PAGE_SIZE
+) -> Iterator[str]:
+    """Percorre os valores únicos de um campo sem o limite de 10k do terms.
+
+    Pagina com agregação ``composite`` (ordem crescente da chave) e entrega
+    os valores sob demanda. A próxima página já é buscada em segundo plano
+    enquanto a atual é consumida, então quem consome começa a trabalhar
+    logo na primeira página.
+    """
+    body = {
+        "size": 0,
+        "aggs": {
+            "unique": {
+                "composite": {
+                    "size": page_size,
+                    "sources": [{"value": {"terms": {"field": field}}}],
+                }
+            }
+        },
+    }
+    if query:
+        body["query"] = query
+
+    def fetch(after: Dict = None) -> Dict:
+        page = {**body["aggs"]["unique"]["composite"]}
+        if after:
+            page["after"] = after
+        request = {**body, "aggs": {"unique": {"composite": page}}}
+        return client.search(index=index, body=request)["aggregations"]["unique"]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch)
+        while future is not None:
+            result = future.result()
+            buckets = result["buckets"]
+            after = result.get("after_key")
+
+            # Dispara a próxima página antes de entregar a atual
+            future = None
+            if after and len(buckets) == page_size:
+                future = executor.submit(fetch, after)
+
+            for bucket in buckets:
+                yield bucket["key"]["value"]
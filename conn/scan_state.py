@@ -0,0 +1,114 @@
+# scan_state.py
+import hashlib
+import time
+from typing import Dict, Iterable, Iterator, List
+from conn.query import keyword_field
+
+# Configurações
+DEFAULT_FRESHNESS = 24 * 3600  # Hosts varridos nas últimas 24h são pulados
+
+
+def fingerprint(signatures: Iterable[str]) -> str:
+    """Impressão digital estável de um conjunto de resultados"""
+    return hashlib.sha1("\n".join(sorted(signatures)).encode()).hexdigest()
+
+
+def port_signature(port: Dict) -> str:
+    """Assinatura de uma porta do nmap: chave porta/protocolo + estado e serviço"""
+    return "|".join(
+        [
+            f"{port.get('port', '')}/{port.get('protocol', '')}",
+            port.get("state", ""),
+            port.get("service", ""),
+            port.get("product", ""),
+            port.get("version", ""),
+        ]
+    )
+
+
+def signature_key(signature: str) -> str:
+    return signature.split("|", 1)[0]
+
+
+class ScanState:
+    """Estado por host do último scan, guardado no índice <alvo>-scanstate.
+
+    Cada documento guarda o horário do último scan, a impressão digital do
+    resultado e as assinaturas que a compõem, permitindo pular hosts
+    varridos dentro da janela de validade e gravar só as diferenças.
+    """
+
+    def __init__(
+        self, client, target: str, scanner: str, freshness: int = DEFAULT_FRESHNESS
+    ) -> None:
+        self.client = client
+        self.index = f"{target}-scanstate"
+        self.scanner = scanner
+        self.freshness = freshness
+        self._state: Dict[str, Dict] = {}
+
+    def load(self) -> None:
+        """Carrega o estado de todos os hosts deste scanner"""
+        from opensearchpy import helpers  # Importado só com o cliente em uso
+
+        if not self.client.indices.exists(index=self.index):
+            return
+
+        field = keyword_field(self.client, self.index, "scanner")
+        query = {"query": {"term": {field: self.scanner}}}
+        for hit in helpers.scan(self.client, index=self.index, query=query):
+            source = hit["_source"]
+            self._state[source["host"]] = source
+
+    def is_fresh(self, host: str) -> bool:
+        state = self._state.get(host)
+        return bool(state) and time.time() - state["last_scan"] < self.freshness
+
+    def pending(self, hosts: Iterable[str]) -> Iterator[str]:
+        """Filtra, sob demanda, os hosts que precisam ser varridos novamente"""
+        skipped = 0
+        for host in hosts:
+            if self.is_fresh(host):
+                skipped += 1
+                continue
+            yield host
+
+        if skipped:
+            print(
+                f"[*] {skipped} hosts pulados (varridos há menos de {self.freshness}s)"
+            )
+
+    def compare(self, host: str, signatures: List[str]) -> Dict[str, List[str]]:
+        """Diferenças em relação ao último scan, agrupadas por chave"""
+        previous = {
+            signature_key(sig): sig
+            for sig in self._state.get(host, {}).get("items", [])
+        }
+        current = {signature_key(sig): sig for sig in signatures}
+
+        return {
+            "opened": sorted(current.keys() - previous.keys()),
+            "closed": sorted(previous.keys() - current.keys()),
+            "changed": sorted(
+                key
+                for key in current.keys() & previous.keys()
+                if current[key] != previous[key]
+            ),
+        }
+
+    def unchanged(self, host: str, signatures: List[str]) -> bool:
+        state = self._state.get(host)
+        return bool(state) and state["fingerprint"] == fingerprint(signatures)
+
+    def record(self, writer, host: str, signatures: List[str]) -> None:
+        """Registra o scan atual do host pelo BulkWriter (sobrescreve o anterior)"""
+        state = {
+            "@timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%Z"),
+            "host": host,
+            "scanner": self.scanner,
+            "last_scan": time.time(),
+            "fingerprint": fingerprint(signatures),
+            "items": sorted(signatures),
+        }
+        self._state[host] = state
+        writer.add(self.index, state, f"{self.scanner}:{host}")
@@ -0,0 +1,187 @@
+# templates.py
+import os
+import sys
+from typing import Dict
+from conn.database import get_opensearch_client
+
+# Configurações
+SHARDS = int(os.environ.get("RECON_INDEX_SHARDS", 1))
+REPLICAS = int(os.environ.get("RECON_INDEX_REPLICAS", 0))  # Nó único
+REFRESH_INTERVAL = os.environ.get(
+    "RECON_REFRESH_INTERVAL", "30s"
+)  # BulkWriter faz refresh ao fechar
+PRIORITY = 200
+
+# strftime("%Y-%m-%dT%H:%M:%S%Z") gera "...UTC" ou "...-03" conforme o fuso
+DATE = {
+    "type": "date",
+    "format": (
+        "strict_date_optional_time||yyyy-MM-dd'T'HH:mm:ssz"
+        "||yyyy-MM-dd'T'HH:mm:ssX||yyyy-MM-dd'T'HH:mm:ss"
+    ),
+    "ignore_malformed": True,
+}
+KEYWORD = {"type": "keyword", "ignore_above": 1024}
+IP = {"type": "ip", "ignore_malformed": True}  # "" e "0.0.0.0" aparecem nos coletores
+TEXT = {"type": "text", "fields": {"keyword": KEYWORD}}
+
+PORT = {
+    "port": {"type": "integer", "ignore_malformed": True},
+    "protocol": KEYWORD,
+    "state": KEYWORD,
+    "service": KEYWORD,
+    "product": KEYWORD,
+    "version": KEYWORD,
+    "cpe": KEYWORD,
+}
+
+# Campos por tipo de índice, com nomes pontuados como nos documentos
+FIELDS = {
+    "assets": {
+        "@timestamp": DATE,
+        "server.address": KEYWORD,
+        "server.domain": KEYWORD,
+        "server.ip": IP,
+        "server.ipblock": KEYWORD,
+        "server.nameserver": KEYWORD,
+        "server.wildcard": {"type": "boolean"},
+        "network.ipv4": IP,
+        "network.ipv6": IP,
+        "vulnerability.scanner.vendor": KEYWORD,
+    },
+    "portscan": {
+        "@timestamp": DATE,
+        "server.ip": IP,
+        "source_index": KEYWORD,
+        "scanner": KEYWORD,
+        "network.ipv4": IP,
+        "network.ipv6": IP,
+        "network.mac": KEYWORD,
+        "ports": {"type": "nested", "properties": PORT},
+        "scan.delta.opened": KEYWORD,
+        "scan.delta.closed": KEYWORD,
+        "scan.delta.changed": KEYWORD,
+    },
+    "http": {
+        "@timestamp": DATE,
+        "server.domain": KEYWORD,
+        "server.ip": IP,
+        "url.full": KEYWORD,
+        "url.scheme": KEYWORD,
+        "url.domain": KEYWORD,
+        "url.port": {"type": "integer"},
+        "url.path": KEYWORD,
+        "http.response.status_code": {"type": "short"},
+        "http.response.body.bytes": {"type": "long"},
+        "http.response.time_ms": {"type": "float"},
+        "http.title": TEXT,
+        "http.webserver": KEYWORD,
+        "http.technologies": KEYWORD,
+        "vulnerability.scanner.vendor": KEYWORD,
+    },
+    "scanstate": {
+        "@timestamp": DATE,
+        "host": KEYWORD,
+        "scanner": KEYWORD,
+        "last_scan": {"type": "double"},
+        "fingerprint": KEYWORD,
+        "items": {"type": "keyword", "index": False},
+    },
+    "runs": {
+        "@timestamp": DATE,
+        "run.id": KEYWORD,
+        "run.scanner": KEYWORD,
+        "run.target": KEYWORD,
+        "run.duration_seconds": {"type": "double"},
+        "stages": {
+            "type": "nested",
+            "properties": {
+                "stage": KEYWORD,
+                "tool": KEYWORD,
+                "count": {"type": "long"},
+                "errors": {"type": "long"},
+                "seconds": {"type": "double"},
+                "p50_seconds": {"type": "double"},
+                "p99_seconds": {"type": "double"},
+            },
+        },
+        "counters": {
+            "type": "nested",
+            "properties": {"name": KEYWORD, "value": {"type": "double"}},
+        },
+    },
+}
+
+# Sufixo do índice -> tipo (o índice principal do alvo não tem sufixo)
+INDICES = {
+    "": "assets",
+    "-subdomain": "assets",
+    "-portscan": "portscan",
+    "-http": "http",
+    "-scanstate": "scanstate",
+    "-runs": "runs",
+}
+
+_installed = set()
+
+
+def properties(fields: Dict[str, Dict]) -> Dict:
+    """Converte nomes pontuados ("server.ip") na árvore de properties"""
+    tree = {}
+    for name, mapping in fields.items():
+        node = tree
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            node = node.setdefault(parent, {"properties": {}})["properties"]
+        node[leaf] = mapping
+    return tree
+
+
+def template_body(pattern: str, kind: str) -> Dict:
+    return {
+        "index_patterns": [pattern],
+        "priority": PRIORITY,
+        "template": {
+            "settings": {
+                "number_of_shards": SHARDS,
+                "number_of_replicas": REPLICAS,
+                "refresh_interval": REFRESH_INTERVAL,
+            },
+            "mappings": {
+                # Strings novas viram keyword (doc values), sem text + .keyword
+                "dynamic_templates": [
+                    {"strings": {"match_mapping_type": "string", "mapping": KEYWORD}}
+                ],
+                "properties": properties(FIELDS[kind]),
+            },
+        },
+    }
+
+
+def install_templates(client, target: str) -> None:
+    """Instala (ou atualiza) os templates dos índices de um alvo.
+
+    Só vale para índices criados depois; índices já existentes mantêm o
+    mapeamento dinâmico antigo (com .keyword) até serem recriados.
+    """
+    if target in _installed:
+        return
+
+    try:
+        for suffix, kind in INDICES.items():
+            client.indices.put_index_template(
+                name=f"recon-{target}{suffix}",
+                body=template_body(f"{target}{suffix}", kind),
+            )
+        _installed.add(target)
+    except Exception as e:
+        print(f"[!] Falha ao instalar templates de {target}: {str(e)[:100]}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"Uso: {sys.argv[0]} <target>")
+        sys.exit(1)
+
+    install_templates(get_opensearch_client(), sys.argv[1])
+    print(f"[+] Templates instalados para {sys.argv[1]}")
@@ -1,38 +1,24 @@
 #!/usr/bin/env python3
 import sys
 from conn.database import get_opensearch_client
+from conn.query import iter_unique_values, keyword_field
 
 
 def consultar_indice_sem_duplicados(index_name):
     client = get_opensearch_client()
 
-    query = {
-        "size": 0,
-        "aggs": {
-            "dominios_unicos": {
-                "terms": {
-                    "field": "server.domain.keyword",
-                    "size": 10000,
-                    "order": {"_key": "asc"},  # Ordenação alfabética
-                }
-            }
-        },
-    }
-
     try:
-        response = client.search(index=index_name, body=query)
-        buckets = response["aggregations"]["dominios_unicos"]["buckets"]
+        # Valores únicos paginados (composite), já em ordem alfabética
+        total = 0
+        field = keyword_field(client, index_name, "server.domain")
+        for domain in iter_unique_values(client, index_name, field):
+            print(domain)
+            total += 1
 
-        if not buckets:
+        if not total:
             print("Nenhum resultado encontrado.")
             return
 
-        # Imprime os resultados ordenados
-        total = 0
-        for item in buckets:
-            print(item["key"])
-            total += 1
-
         print(f"\nTotal de registros únicos: {total}")
 
     except Exception as e:
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import uuid
+import asyncio
+from time import strftime
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Set
+from conn.database import get_opensearch_client
+from conn.bulk import BulkWriter, document_id
+from conn.templates import install_templates
+from enrich.resolver import dns_cache, resolve_all
+from enrich.rdap import IPBlockCache, rdap_domain, rdap_ip, zone_cache
+from enrich.wildcard import skip, wildcard_detector
+from tools import metrics
+from tools.pool import get_pool
+
+# Configurações
+ENRICH_WORKERS = 8  # Consultas RDAP simultâneas
+TIMEOUT_TOOL = 1800  # 30 minutos por ferramenta
+
+
+def parse_line(line: str) -> List[str]:
+    """Uma entrada por linha (assetfinder, sublist3r)"""
+    # O sublist3r às vezes junta vários nomes na mesma linha com <BR>
+    return line.split("<BR>")
+
+
+def parse_subfinder(line: str) -> List[str]:
+    """Saída JSON por linha do subfinder (-oJ)"""
+    try:
+        return [json.loads(line)["host"]]
+    except (ValueError, KeyError, TypeError):
+        return []
+
+
+TOOLS = {
+    "assetfinder": {
+        "command": "assetfinder -subs-only {domain}",
+        "parse": parse_line,
+        "tee": True,
+    },
+    "subfinder": {
+        "command": "subfinder -d {domain} -oJ -silent",
+        "parse": parse_subfinder,
+        "tee": True,
+    },
+    "sublist3r": {
+        # Só grava a lista no final (-o); o próprio arquivo é a cópia bruta
+        "command": (
+            "/scripts/Sublist3r/sublist3r.py -n -d {domain} -o {data_dir}/{output} "
+            "> /dev/null; cat {data_dir}/{output}"
+        ),
+        "parse": parse_line,
+        "tee": False,
+    },
+}
+
+_END = object()
+
+
+def normalize(host: str, domain: str) -> str:
+    """Normaliza o nome e descarta o que estiver fora do domínio alvo"""
+    host = host.strip().rstrip(".").lower()
+    if host == domain or host.endswith("." + domain):
+        return host
+    return ""
+
+
+def stream_tool(target: str, tool: str, domain: str, emit) -> int:
+    """Executa uma ferramenta no pool e repassa cada nome assim que sai.
+
+    Roda em thread própria; ``emit(tool, host)`` é chamado por nome.
+    Retorna quantos nomes a ferramenta produziu.
+    """
+    pool = get_pool(target)
+    spec = TOOLS[tool]
+    output = f"{tool}-{str(uuid.uuid1())[:8]}.txt"
+    cmd = spec["command"].format(domain=domain, data_dir=pool.data_dir, output=output)
+    tee = pool.raw_output(output) if spec["tee"] else None
+
+    count = 0
+    try:
+        for line in pool.stream(cmd, tee, TIMEOUT_TOOL, "discovery"):
+            for host in spec["parse"](line):
+                emit(tool, host)
+                count += 1
+    except Exception as e:
+        print(f"[!] Falha no {tool}: {str(e)[:100]}")
+
+    print(f"[+] {tool}: {count} nomes")
+    return count
+
+
+async def discover(
+    target: str, domain: str, tools: List[str], found: Dict[str, Set[str]]
+) -> AsyncIterator[str]:
+    """Roda as ferramentas em paralelo e entrega cada nome novo uma única vez.
+
+    ``found`` é preenchido com {hostname: {ferramentas que o encontraram}};
+    nomes repetidos só acrescentam a ferramenta ao conjunto.
+    """
+    domain = domain.lower()
+    loop = asyncio.get_running_loop()
+    names = asyncio.Queue()
+
+    def emit(tool: str, host: str) -> None:
+        loop.call_soon_threadsafe(names.put_nowait, (tool, host))
+
+    executor = ThreadPoolExecutor(max_workers=len(tools), thread_name_prefix="tool")
+    runners = asyncio.gather(
+        *(
+            loop.run_in_executor(executor, stream_tool, target, tool, domain, emit)
+            for tool in tools
+        )
+    )
+    runners.add_done_callback(lambda _: names.put_nowait(_END))
+
+    try:
+        while True:
+            item = await names.get()
+            if item is _END:
+                break
+            tool, host = item
+            host = normalize(host, domain)
+            if not host:
+                continue
+            if host in found:
+                found[host].add(tool)
+                continue
+            found[host] = {tool}
+            yield host
+    finally:
+        executor.shutdown(wait=False)
+
+
+def build_document(
+    target: str, resolved: Dict, sources: Set[str], ip_cache: IPBlockCache
+) -> Dict:
+    """Monta o documento enriquecido (RDAP) de um hostname já resolvido
+
+    Nomes marcados como DNS curinga não passam pelo RDAP.
+    """
+    ip = (resolved["ipv4"] or ["0.0.0.0"])[0]
+    wildcard = resolved.get("wildcard", False)
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.address": resolved["host"],
+        "server.domain": resolved["host"],
+        "server.ip": ip,
+        "network.ipv4": resolved["ipv4"],
+        "network.ipv6": resolved["ipv6"],
+        "server.ipblock": "" if wildcard else rdap_ip(ip, target, ip_cache),
+        "server.nameserver": "" if wildcard else rdap_domain(resolved["host"]),
+        "server.wildcard": wildcard,
+        "vulnerability.scanner.vendor": sorted(sources),
+    }
+
+
+async def enrich_and_index(
+    target: str, domain: str, tools: List[str], writer: BulkWriter
+) -> Dict[str, Set[str]]:
+    """Resolve e enriquece cada nome uma única vez, já durante a descoberta.
+
+    O documento é gravado assim que fica pronto, com _id derivado de alvo,
+    hostname e IP; se outra ferramenta achar o mesmo nome depois, a lista de
+    fontes é unida à já gravada (upsert), então reexecuções não duplicam.
+    Nomes que só apontam para um DNS curinga são marcados (server.wildcard)
+    ou descartados, conforme RECON_WILDCARD.
+    """
+    ip_cache = IPBlockCache()
+    wildcards = wildcard_detector(domain)
+    semaphore = asyncio.Semaphore(ENRICH_WORKERS)
+    found: Dict[str, Set[str]] = {}
+    indexed: Dict[str, tuple] = {}  # host -> (_id, documento)
+
+    async def enrich(resolved: Dict) -> None:
+        host = resolved["host"]
+        try:
+            async with semaphore:
+                document = await asyncio.to_thread(
+                    build_document, target, resolved, set(found[host]), ip_cache
+                )
+            doc_id = document_id(target, host, document["server.ip"])
+            indexed[host] = (doc_id, document)
+            writer.upsert(target, document, doc_id)
+            print(document)
+        except Exception as e:
+            print(f"[!] Erro ao enriquecer {host}: {e}")
+
+    tasks = set()
+    names = discover(target, domain, tools, found)
+    async for resolved in resolve_all(names, wildcards=wildcards):
+        if skip(resolved):
+            continue
+        task = asyncio.create_task(enrich(resolved))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    while tasks:
+        await asyncio.gather(*list(tasks))
+
+    # Fontes que chegaram depois da indexação do nome
+    for host, (doc_id, document) in indexed.items():
+        sources = sorted(found[host])
+        if sources != document["vulnerability.scanner.vendor"]:
+            document["vulnerability.scanner.vendor"] = sources
+            writer.upsert(target, document, doc_id)
+
+    ip_cache.report()
+    zone_cache.report()
+    dns_cache.report()
+    if wildcards is not None:
+        wildcards.report()
+    return found
+
+
+async def run(target: str, domain: str, tools: List[str] = None) -> None:
+    tools = tools or list(TOOLS)
+    print(f"[*] Descobrindo subdomínios de {domain} com {', '.join(tools)}")
+
+    client = get_opensearch_client()
+    install_templates(client, target)
+    metrics.start(target, "discover", client)
+    with BulkWriter(client) as writer:
+        found = await enrich_and_index(target, domain, tools, writer)
+    print(f"[*] {len(found)} nomes únicos")
+    print(f"[+] {writer.indexed} documentos indexados em {target}")
+
+
+def main(target: str, domain: str, tools: List[str] = None) -> None:
+    asyncio.run(run(target, domain, tools))
+
+
+def cli(argv: List[str] = None) -> None:
+    """Interface de linha de comando (também usada por ``recon discover``)"""
+    parser = argparse.ArgumentParser(
+        description="Descobre, resolve e enriquece os subdomínios de um domínio"
+    )
+    parser.add_argument("target", help="Nome do índice/alvo no OpenSearch")
+    parser.add_argument("domain", help="Domínio a enumerar")
+    parser.add_argument(
+        "--tools",
+        nargs="+",
+        choices=list(TOOLS),
+        help="Ferramentas a executar (default: todas)",
+    )
+    args = parser.parse_args(argv)
+
+    main(args.target, args.domain, args.tools)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,154 @@
+# cache.py
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from tools import metrics
+
+# Configurações
+CACHE_DIR = os.environ.get("RECON_CACHE_DIR", "/docker/recon/data/cache")
+CACHE_ENABLED = os.environ.get("RECON_ENRICH_CACHE", "1") != "0"
+NEGATIVE_TTL = int(os.environ.get("RECON_NEGATIVE_TTL", 3600))  # 1 hora
+CACHE_BATCH = int(os.environ.get("RECON_CACHE_BATCH", 100))  # Registros por commit
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Conexão SQLite para uso simultâneo por vários processos coletores.
+
+    WAL permite leituras concorrentes com uma escrita; o busy timeout faz
+    quem encontrar o banco travado esperar em vez de falhar.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class SharedCache:
+    """Cache de enriquecimento compartilhado entre alvos e processos.
+
+    Os registros ficam em {CACHE_DIR}/enrich.sqlite separados por
+    ``namespace``, cada um com a própria expiração. Valores vazios ("" ou
+    []) são resultados negativos e expiram em ``negative_ttl``, para que um
+    NXDOMAIN ou um RDAP sem resposta não seja consultado de novo a cada
+    execução, mas também não fique preso por dias. Mesma interface do
+    TTLCache (get/set/report); a conexão só é aberta no primeiro uso.
+
+    As escritas são acumuladas e gravadas em um commit a cada ``batch``
+    registros, em ``flush()`` ou na saída do processo; enquanto isso o
+    ``get`` deste processo já as enxerga.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        namespace: str,
+        ttl: int,
+        negative_ttl: int = NEGATIVE_TTL,
+        path: str = None,
+        batch: int = CACHE_BATCH,
+    ) -> None:
+        self.name = name
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path or f"{CACHE_DIR}/enrich.sqlite"
+        self.batch = max(1, batch)
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._db = None
+        self._pending = {}  # key -> (valor JSON, expiração) ainda não gravados
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = connect(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT, key TEXT, value TEXT, expires REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, key: str):
+        """Retorna o valor ou None se ausente/expirado"""
+        with self._lock:
+            row = self._pending.get(key)
+            if row is None or row[1] <= time.time():
+                row = (
+                    self._connection()
+                    .execute(
+                        "SELECT value FROM entries"
+                        " WHERE namespace = ? AND key = ? AND expires > ?",
+                        (self.namespace, key, time.time()),
+                    )
+                    .fetchone()
+                )
+            if row is None:
+                self.misses += 1
+                metrics.count("cache_requests", cache=self.namespace, result="miss")
+                return None
+
+            value = json.loads(row[0])
+            self.hits += 1
+            if not value:
+                self.negative_hits += 1
+            result = "hit" if value else "negative"
+            metrics.count("cache_requests", cache=self.namespace, result=result)
+            return value
+
+    def set(self, key: str, value, ttl: int = None) -> None:
+        if ttl is None:
+            ttl = self.ttl if value else self.negative_ttl
+        with self._lock:
+            self._pending[key] = (json.dumps(value), time.time() + ttl)
+            if len(self._pending) >= self.batch:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        db = self._connection()
+        db.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (
+                (self.namespace, key, value, expires)
+                for key, (value, expires) in self._pending.items()
+            ),
+        )
+        db.commit()
+        self._pending.clear()
+
+    def flush(self) -> None:
+        """Grava as escritas pendentes em um único commit"""
+        with self._lock:
+            self._flush()
+
+    def purge(self) -> int:
+        """Remove os registros expirados deste namespace"""
+        with self._lock:
+            self._flush()
+            db = self._connection()
+            deleted = db.execute(
+                "DELETE FROM entries WHERE namespace = ? AND expires <= ?",
+                (self.namespace, time.time()),
+            ).rowcount
+            db.commit()
+            return deleted
+
+    def report(self) -> None:
+        """Exibe a taxa de acerto do cache na execução atual"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        print(
+            f"[*] Cache {self.name}: {self.hits} acertos "
+            f"({self.negative_hits} negativos), {self.misses} falhas "
+            f"({rate:.1f}% de acerto)"
+        )
@@ -0,0 +1,343 @@
+# rdap.py
+import atexit
+import ipaddress
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from enrich.cache import (
+    CACHE_BATCH,
+    CACHE_DIR,
+    CACHE_ENABLED,
+    NEGATIVE_TTL,
+    SharedCache,
+    connect,
+)
+from tools import metrics
+from tools.pool import get_pool
+from tools.scheduler import slot
+
+# Configurações
+RDAP_IP_TTL = int(os.environ.get("RECON_RDAP_IP_TTL", 7 * 24 * 3600))  # 7 dias
+RDAP_DOMAIN_URL = os.environ.get(
+    "RECON_RDAP_DOMAIN_URL", "https://rdap.registro.br/domain/"
+)
+RDAP_DOMAIN_TTL = int(os.environ.get("RECON_RDAP_DOMAIN_TTL", 24 * 3600))  # 1 dia
+RDAP_DOMAIN_RATE = float(os.environ.get("RECON_RDAP_DOMAIN_RATE", 5))  # req/s
+TIMEOUT_RDAP = 60
+TIMEOUT_RDAP_DOMAIN = 15
+
+# Sufixos sob os quais o registro.br delega domínios (ex.: pm.ro.gov.br)
+BR_CATEGORIES = (
+    "adm adv agr am app arq art ato b bio blog bmd cim cng cnt com coop cri def "
+    "des det dev ecn eco edu emp enf eng esp etc eti far flog fnd fot fst g12 geo "
+    "ggf gov gru imb ind inf jor jus leg lel log mat med mil mp mus net nom not "
+    "ntr odo ong org ppg pro psc psi qsl rec rep slg srv tc tec teo tmp trd tur "
+    "tv vet vlog wiki zlg"
+).split()
+BR_STATES = (
+    "ac al am ap ba ce df es go ma mg ms mt pa pb pe pi pr rj rn ro rr rs sc se sp to"
+).split()
+PUBLIC_SUFFIXES = (
+    {f"{category}.br" for category in BR_CATEGORIES}
+    | {f"{state}.gov.br" for state in BR_STATES}
+    | {f"{state}.leg.br" for state in BR_STATES}
+)
+GENERIC_SLDS = {"ac", "co", "com", "edu", "gov", "net", "org"}  # co.uk, com.ar...
+
+
+def _ip_key(address) -> str:
+    """Representa o IP como hexadecimal de largura fixa (ordenável como texto)"""
+    return f"{int(address):032x}"
+
+
+class IPBlockCache:
+    """Cache persistente de blocos RDAP indexado pela faixa start/endAddress.
+
+    Qualquer IP dentro de uma faixa já consultada é respondido por busca de
+    intervalo no SQLite, sem container e sem rede. Em faixas aninhadas vence
+    a mais específica (maior startAddress que ainda contém o IP). O arquivo
+    é compartilhado por todos os alvos e pelos coletores em paralelo.
+
+    Como no SharedCache, as faixas novas são gravadas em um commit a cada
+    ``batch`` registros, em ``flush()`` ou na saída do processo.
+    """
+
+    def __init__(
+        self, path: str = None, ttl: int = RDAP_IP_TTL, batch: int = CACHE_BATCH
+    ) -> None:
+        path = path or f"{CACHE_DIR}/rdap-ip.sqlite"
+        self.ttl = ttl
+        self.batch = max(1, batch)
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}  # (version, start, end) -> (handle, expiração)
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ip_blocks ("
+            " version INTEGER, start TEXT, end TEXT, handle TEXT, expires REAL,"
+            " PRIMARY KEY (version, start, end))"
+        )
+        self._db.commit()
+        atexit.register(self.flush)
+
+    def get(self, ip: str) -> Optional[str]:
+        """Retorna o handle do bloco que contém o IP ou None se não houver"""
+        address = ipaddress.ip_address(ip)
+        key = _ip_key(address)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT start, handle FROM ip_blocks"
+                " WHERE version = ? AND start <= ? AND end >= ? AND expires > ?"
+                " ORDER BY start DESC LIMIT 1",
+                (address.version, key, key, now),
+            ).fetchone()
+            # Faixas ainda não gravadas também valem (e são mais novas que as
+            # gravadas); vence a mais específica
+            for (version, start, end), (handle, expires) in self._pending.items():
+                if version == address.version and start <= key <= end:
+                    if expires > now and (row is None or start >= row[0]):
+                        row = (start, handle)
+            if row is None:
+                self.misses += 1
+                metrics.count("cache_requests", cache="rdap-ip", result="miss")
+                return None
+            self.hits += 1
+            metrics.count("cache_requests", cache="rdap-ip", result="hit")
+            return row[1]
+
+    def put(self, start: str, end: str, handle: str, ttl: int = None) -> None:
+        """Grava a faixa retornada pelo RDAP (handle "" é resultado negativo)"""
+        first, last = ipaddress.ip_address(start), ipaddress.ip_address(end)
+        key = (first.version, _ip_key(first), _ip_key(last))
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._pending[key] = (handle, expires)
+            if len(self._pending) >= self.batch:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO ip_blocks VALUES (?, ?, ?, ?, ?)",
+            (
+                (version, start, end, handle, expires)
+                for (version, start, end), (handle, expires) in self._pending.items()
+            ),
+        )
+        self._db.commit()
+        self._pending.clear()
+
+    def flush(self) -> None:
+        """Grava as faixas pendentes em um único commit"""
+        with self._lock:
+            self._flush()
+
+    def report(self) -> None:
+        """Exibe a taxa de acerto do cache na execução atual"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        print(
+            f"[*] Cache RDAP-IP: {self.hits} acertos, {self.misses} falhas "
+            f"({rate:.1f}% de acerto)"
+        )
+
+
+def query_ip(ip: str, target: str) -> Optional[dict]:
+    """Consulta o RDAP de um IP com a ferramenta rdap no pool kali-tools.
+
+    Retorna a resposta do RDAP ({} se ela não for JSON) ou None em falha
+    transitória (timeout, container, código de saída), que não deve ir
+    para o cache.
+    """
+    try:
+        with metrics.timer("rdap", "ip"):
+            result = get_pool(target).run(
+                f"rdap {ip} --json", timeout=TIMEOUT_RDAP, resource="rdap"
+            )
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def rdap_ip(ip: str, target: str, cache: IPBlockCache) -> str:
+    """Retorna o handle do bloco IP, consultando o RDAP só em caso de miss"""
+    try:
+        if ipaddress.ip_address(ip).is_unspecified:
+            return ""
+    except ValueError:
+        return ""
+
+    handle = cache.get(ip)
+    if handle is not None:
+        return handle
+
+    data = query_ip(ip, target)
+    if data is None:
+        return ""
+    try:
+        handle = data["handle"]
+        cache.put(data["startAddress"], data["endAddress"], handle)
+        return handle
+    except (KeyError, ValueError):
+        # RDAP respondeu sem bloco: só este IP vai para o cache negativo
+        handle = data.get("handle", "")
+        cache.put(ip, ip, handle, NEGATIVE_TTL)
+        return handle
+
+
+def registrable_domain(host: str) -> str:
+    """Retorna o domínio registrável de um hostname (www.x.gov.br -> x.gov.br)"""
+    labels = host.strip().rstrip(".").lower().split(".")
+    if len(labels) < 2:
+        return ".".join(labels)
+
+    # Maior sufixo público conhecido que termina o nome
+    for size in range(len(labels) - 1, 0, -1):
+        if ".".join(labels[-size:]) in PUBLIC_SUFFIXES:
+            return ".".join(labels[-size - 1 :])
+
+    if len(labels[-1]) == 2 and labels[-2] in GENERIC_SLDS and len(labels) > 2:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração por registro, seguro entre threads"""
+
+    def __init__(self, name: str, maxsize: int = 4096, ttl: int = 3600) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Retorna o valor ou None se ausente/expirado"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def report(self) -> None:
+        """Exibe a taxa de acerto do cache na execução atual"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        print(
+            f"[*] Cache {self.name}: {self.hits} acertos, {self.misses} falhas "
+            f"({rate:.1f}% de acerto)"
+        )
+
+
+class RateLimiter:
+    """Token bucket simples para limitar requisições por segundo"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.rate)
+
+
+_session = None
+_session_lock = threading.Lock()
+if CACHE_ENABLED:
+    zone_cache = SharedCache("RDAP-domínio", "rdap-domain", RDAP_DOMAIN_TTL)
+else:
+    zone_cache = TTLCache("RDAP-domínio", ttl=RDAP_DOMAIN_TTL)
+rate_limiter = RateLimiter(RDAP_DOMAIN_RATE)
+
+
+def get_session() -> requests.Session:
+    """Sessão HTTP compartilhada com pool de conexões (keep-alive)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def query_domain(zone: str, base_url: str = None) -> Optional[str]:
+    """Consulta os nameservers de um domínio registrável.
+
+    Retorna a lista separada por vírgulas, "" se o domínio não existir no
+    registro, ou None em falha transitória (não deve ir para o cache).
+    """
+    rate_limiter.acquire()
+    try:
+        with slot("rdap"), metrics.timer("rdap", "domain"):
+            response = get_session().get(
+                (base_url or RDAP_DOMAIN_URL) + zone, timeout=TIMEOUT_RDAP_DOMAIN
+            )
+    except requests.RequestException:
+        return None
+
+    if response.status_code == 404:
+        return ""
+    if response.status_code != 200:
+        return None
+
+    try:
+        return ",".join(ns["ldhName"] for ns in response.json()["nameservers"])
+    except (ValueError, KeyError, TypeError):
+        return ""
+
+
+def rdap_domain(host: str, cache=zone_cache, base_url: str = None) -> str:
+    """Retorna os nameservers do domínio registrável que contém o hostname"""
+    zone = registrable_domain(host)
+    nameservers = cache.get(zone)
+    if nameservers is not None:
+        return nameservers
+
+    nameservers = query_domain(zone, base_url)
+    if nameservers is None:
+        return ""
+    cache.set(zone, nameservers)
+    return nameservers
@@ -0,0 +1,375 @@
+# resolver.py
+import asyncio
+import hashlib
+import ipaddress
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Union
+from enrich.cache import CACHE_ENABLED, SharedCache
+from tools import metrics
+
+# Configurações
+DEFAULT_CONCURRENCY = int(os.environ.get("RECON_DNS_CONCURRENCY", 200))
+DEFAULT_TIMEOUT = float(os.environ.get("RECON_DNS_TIMEOUT", 5))
+DNS_TTL = int(os.environ.get("RECON_DNS_CACHE_TTL", 3600))  # 1 hora
+RECORD_FAMILIES = {"A": socket.AF_INET, "AAAA": socket.AF_INET6}
+# Respostas definitivas de "não existe" (NXDOMAIN, nome sem registros do tipo)
+NOT_FOUND_ERRORS = {
+    getattr(socket, name)
+    for name in ("EAI_NONAME", "EAI_NODATA", "EAI_ADDRFAMILY")
+    if hasattr(socket, name)
+}
+
+_END = object()
+
+
+class SystemResolver:
+    """Resolve nomes com o resolvedor do sistema (getaddrinfo) em threads.
+
+    Só NXDOMAIN e nome sem registros do tipo viram lista vazia; as demais
+    falhas (EAI_AGAIN, EAI_FAIL...) são propagadas e não vão para o cache.
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_CONCURRENCY) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_threads, thread_name_prefix="dns"
+        )
+
+    async def query(self, host: str, record: str) -> List[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.run_in_executor(
+                self._executor,
+                socket.getaddrinfo,
+                host,
+                None,
+                RECORD_FAMILIES[record],
+                socket.SOCK_STREAM,
+            )
+        except socket.gaierror as e:
+            if e.errno in NOT_FOUND_ERRORS:
+                return []
+            raise
+        except UnicodeError:
+            return []
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    def uncached(self):
+        """O próprio resolvedor: não tem cache"""
+        return self
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeResolver:
+    """Resolvedor local determinístico para testes e benchmarks offline.
+
+    Cada nome recebe endereços derivados do seu hash, com latência simulada
+    e uma fração configurável de nomes inexistentes (NXDOMAIN).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.02,
+        jitter: float = 0.01,
+        nxdomain_rate: float = 0.1,
+        ipv6_rate: float = 0.3,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.nxdomain_rate = nxdomain_rate
+        self.ipv6_rate = ipv6_rate
+        self.queries = 0
+
+    async def query(self, host: str, record: str) -> List[str]:
+        self.queries += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        digest = hashlib.sha256(host.encode()).digest()
+        if digest[0] / 255 < self.nxdomain_rate:
+            return []
+        if record == "A":
+            return [f"10.{digest[1]}.{digest[2]}.{digest[3] or 1}"]
+        if digest[4] / 255 < self.ipv6_rate:
+            return [f"fd00::{digest[5]:x}:{digest[6]:x}"]
+        return []
+
+    def uncached(self):
+        """O próprio resolvedor: não tem cache"""
+        return self
+
+    def close(self) -> None:
+        pass
+
+
+class CachedResolver:
+    """Envolve outro resolvedor com o cache de enriquecimento compartilhado.
+
+    Respostas vazias (NXDOMAIN) também vão para o cache, com o TTL negativo.
+    Consultas interrompidas pelo timeout não são gravadas.
+
+    O SQLite não é acessado no laço de eventos: leituras e escritas pedidas
+    numa mesma volta do laço vão juntas para a thread do cache, um salto de
+    thread por lote em vez de um por consulta. O que ainda não foi gravado
+    é gravado no ``close()``.
+    """
+
+    def __init__(self, resolver, cache: SharedCache) -> None:
+        self.resolver = resolver
+        self.cache = cache
+        # Uma thread basta: o acesso ao SQLite já é serializado pelo cache
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+        self._reads = []  # (chave, future) do próximo lote
+        self._writes = {}
+        self._scheduled = False
+        self._closed = False
+
+    async def query(self, host: str, record: str) -> List[str]:
+        key = f"{record}:{host}"
+        addresses = await self._read(key)
+        if addresses is None:
+            addresses = await self.resolver.query(host, record)
+            self._writes[key] = addresses
+            self._schedule()
+        return addresses
+
+    def uncached(self):
+        """O resolvedor envolvido, para consultas que não devem ir ao cache"""
+        return self.resolver
+
+    def _read(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._reads.append((key, future))
+        self._schedule()
+        return future
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        if self._closed:
+            return
+        reads, self._reads = self._reads, []
+        writes, self._writes = self._writes, {}
+        batch = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._sync, [key for key, _ in reads], writes
+        )
+        batch.add_done_callback(lambda batch: self._deliver(reads, batch))
+
+    def _sync(self, keys: List[str], writes: Dict) -> List:
+        """Na thread do cache: grava o lote e lê as chaves pedidas"""
+        for key, addresses in writes.items():
+            self.cache.set(key, addresses)
+        return [self.cache.get(key) for key in keys]
+
+    @staticmethod
+    def _deliver(reads: List, batch: asyncio.Future) -> None:
+        for i, (_, future) in enumerate(reads):
+            if future.done():  # Consulta já cancelada (timeout)
+                continue
+            if batch.cancelled():
+                future.cancel()
+            elif batch.exception() is not None:
+                future.set_exception(batch.exception())
+            else:
+                future.set_result(batch.result()[i])
+
+    def close(self) -> None:
+        self._closed = True
+        self.resolver.close()
+        self._executor.shutdown(wait=True)
+        for _, future in self._reads:
+            future.cancel()
+        self._reads = []
+        for key, addresses in self._writes.items():
+            self.cache.set(key, addresses)
+        self._writes = {}
+        self.cache.flush()
+
+
+dns_cache = SharedCache("DNS", "dns", DNS_TTL)
+
+
+def default_resolver(concurrency: int = DEFAULT_CONCURRENCY):
+    """Resolvedor do sistema, com cache compartilhado se habilitado"""
+    resolver = SystemResolver(concurrency)
+    return CachedResolver(resolver, dns_cache) if CACHE_ENABLED else resolver
+
+
+async def _resolve_one(resolver, host: str, timeout: float) -> Dict:
+    """Consulta A e AAAA de um nome em paralelo, cada uma com seu timeout"""
+
+    async def lookup(record: str) -> List[str]:
+        try:
+            return await asyncio.wait_for(resolver.query(host, record), timeout)
+        except (asyncio.TimeoutError, OSError):
+            return []
+
+    start = time.perf_counter()
+    ipv4, ipv6 = await asyncio.gather(lookup("A"), lookup("AAAA"))
+    metrics.observe("dns", time.perf_counter() - start)
+    metrics.count("dns_lookups", result="resolved" if ipv4 or ipv6 else "nxdomain")
+    # Ordem estável: o primeiro IPv4 entra no _id dos documentos
+    return {
+        "host": host,
+        "ipv4": sorted(ipv4, key=ipaddress.ip_address),
+        "ipv6": sorted(ipv6, key=ipaddress.ip_address),
+    }
+
+
+async def _iterate(hosts) -> AsyncIterator[str]:
+    """Aceita tanto iteráveis comuns quanto assíncronos"""
+    if hasattr(hosts, "__aiter__"):
+        async for host in hosts:
+            yield host
+    else:
+        for host in hosts:
+            yield host
+
+
+async def resolve_all(
+    hosts: Union[Iterable[str], AsyncIterable[str]],
+    resolver=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    wildcards=None,
+) -> AsyncIterator[Dict]:
+    """Resolve nomes com até ``concurrency`` consultas em voo.
+
+    A entrada (comum ou assíncrona) é consumida sob demanda e os resultados
+    são entregues na ordem em que ficam prontos, no formato
+    {"host", "ipv4", "ipv6"}. Com ``wildcards`` (enrich.wildcard) cada
+    resultado também traz "wildcard": se o nome só aponta para o curinga
+    da sua zona.
+    """
+    resolver = resolver or default_resolver(concurrency)
+    results = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def resolve(host: str) -> None:
+        try:
+            result = await _resolve_one(resolver, host, timeout)
+            if wildcards is not None:
+                result["wildcard"] = await wildcards.check(resolver, result, timeout)
+            results.put_nowait(result)
+        except Exception as e:
+            results.put_nowait(e)
+        finally:
+            slots.release()
+
+    async def feed() -> None:
+        try:
+            async for host in _iterate(hosts):
+                await slots.acquire()
+                task = asyncio.create_task(resolve(host))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            while tasks:
+                await asyncio.gather(*list(tasks))
+        except Exception as e:
+            results.put_nowait(e)
+        finally:
+            results.put_nowait(_END)
+
+    producer = asyncio.create_task(feed())
+    try:
+        while True:
+            item = await results.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        for task in list(tasks):
+            task.cancel()
+        resolver.close()
+
+
+def resolve_stream(
+    hosts: Iterable[str],
+    resolver=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    wildcards=None,
+) -> Iterator[Dict]:
+    """Versão síncrona de resolve_all para uso nos coletores.
+
+    A entrada é lida em uma thread própria (pode ser a saída de uma
+    ferramenta ainda em execução) e o laço de eventos em outra; os resultados
+    chegam por uma fila à medida que ficam prontos. Nomes vazios ou repetidos
+    são descartados.
+    """
+    results = queue.Queue(maxsize=concurrency * 2)
+
+    def unique(names: Iterable[str]) -> Iterator[str]:
+        seen = set()
+        for name in names:
+            name = name.strip().rstrip(".").lower()
+            if name and name not in seen:
+                seen.add(name)
+                yield name
+
+    async def names_from_thread() -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        incoming = asyncio.Queue()
+
+        def reader() -> None:
+            try:
+                for name in unique(hosts):
+                    loop.call_soon_threadsafe(incoming.put_nowait, name)
+            except Exception as e:
+                loop.call_soon_threadsafe(incoming.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(incoming.put_nowait, _END)
+
+        threading.Thread(target=reader, name="resolver-input", daemon=True).start()
+        while True:
+            name = await incoming.get()
+            if name is _END:
+                break
+            if isinstance(name, Exception):
+                raise name
+            yield name
+
+    async def pump() -> None:
+        loop = asyncio.get_running_loop()
+        async for result in resolve_all(
+            names_from_thread(), resolver, concurrency, timeout, wildcards
+        ):
+            try:
+                results.put_nowait(result)
+            except queue.Full:  # Consumidor atrasado: espera sem travar o laço
+                await loop.run_in_executor(None, results.put, result)
+
+    def worker() -> None:
+        try:
+            asyncio.run(pump())
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(_END)
+
+    thread = threading.Thread(target=worker, name="resolver", daemon=True)
+    thread.start()
+
+    while True:
+        item = results.get()
+        if item is _END:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+    thread.join()
@@ -0,0 +1,123 @@
+# wildcard.py
+import asyncio
+import os
+import uuid
+from typing import Dict, Optional, Set
+from enrich.cache import CACHE_ENABLED, SharedCache
+from tools import metrics
+
+# Configurações
+WILDCARD_MODE = os.environ.get("RECON_WILDCARD", "flag")  # flag | drop | off
+WILDCARD_PROBES = int(os.environ.get("RECON_WILDCARD_PROBES", 3))  # Nomes por zona
+WILDCARD_TTL = int(os.environ.get("RECON_WILDCARD_TTL", 24 * 3600))  # 1 dia
+
+wildcard_cache = SharedCache("Curinga", "wildcard", WILDCARD_TTL)
+
+
+class WildcardDetector:
+    """Detecta DNS curinga (*.zona) nas zonas pai dos nomes descobertos.
+
+    Na primeira vez que uma zona aparece, ``probes`` rótulos aleatórios são
+    resolvidos nela; se todos respondem e compartilham algum endereço, a
+    zona tem curinga e o conjunto das respostas vira sua assinatura. Um nome
+    cujos endereços estão todos nessa assinatura é marcado como curinga: é
+    lixo de enumeração (ou indistinguível dele) e não precisa de RDAP, nmap
+    nem httpx.
+
+    Só zonas dentro de ``domain`` são sondadas. O resultado por zona vai
+    para o cache compartilhado (zona sem curinga é resultado negativo) e
+    nomes da mesma zona resolvidos ao mesmo tempo esperam uma única
+    sondagem. Um detector por laço de eventos.
+    """
+
+    def __init__(
+        self, domain: str, probes: int = WILDCARD_PROBES, cache=wildcard_cache
+    ) -> None:
+        self.domain = domain.lower().rstrip(".")
+        self.probes = max(1, probes)
+        self.cache = cache if CACHE_ENABLED else None
+        self.zones: Dict[str, Set[str]] = {}  # Zonas com curinga -> endereços
+        self.flagged = 0
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def zone(self, host: str) -> str:
+        """Zona pai de ``host`` ou "" se estiver fora do domínio alvo"""
+        parent = host.split(".", 1)[1] if "." in host else ""
+        if parent == self.domain or parent.endswith("." + self.domain):
+            return parent
+        return ""
+
+    async def _probe(self, resolver, zone: str, timeout: float) -> Set[str]:
+        cached = await asyncio.to_thread(self.cache.get, zone) if self.cache else None
+        if cached is not None:
+            answers = set(cached)
+        else:
+            # Nomes aleatórios não passam pelo cache DNS: nunca se repetem
+            resolver = resolver.uncached()
+
+            async def lookup(name: str) -> Set[str]:
+                addresses = set()
+                for record in ("A", "AAAA"):
+                    try:
+                        addresses.update(
+                            await asyncio.wait_for(
+                                resolver.query(name, record), timeout
+                            )
+                        )
+                    except (asyncio.TimeoutError, OSError):
+                        pass
+                return addresses
+
+            names = [f"{uuid.uuid4().hex[:12]}.{zone}" for _ in range(self.probes)]
+            results = await asyncio.gather(*(lookup(name) for name in names))
+            # Curinga responde a qualquer rótulo, com ao menos um endereço comum
+            answers = set()
+            if all(results) and set.intersection(*results):
+                answers = set.union(*results)
+            if self.cache:
+                await asyncio.to_thread(self.cache.set, zone, sorted(answers))
+
+        if answers:
+            self.zones[zone] = answers
+            print(f"[!] DNS curinga em *.{zone}: {', '.join(sorted(answers))}")
+        return answers
+
+    async def check(self, resolver, resolved: Dict, timeout: float) -> bool:
+        """Indica se o nome resolvido só aponta para o curinga da sua zona"""
+        addresses = set(resolved["ipv4"]) | set(resolved["ipv6"])
+        zone = self.zone(resolved["host"])
+        if not addresses or not zone:
+            return False
+
+        if zone not in self._pending:
+            self._pending[zone] = asyncio.ensure_future(
+                self._probe(resolver, zone, timeout)
+            )
+        answers = await self._pending[zone]
+        if answers and addresses <= answers:
+            self.flagged += 1
+            metrics.count("wildcard_hosts", action=WILDCARD_MODE)
+            return True
+        return False
+
+    def report(self) -> None:
+        """Exibe as zonas com curinga e quantos nomes foram marcados"""
+        if not self.zones:
+            return
+        action = "descartados" if WILDCARD_MODE == "drop" else "marcados"
+        print(
+            f"[*] DNS curinga: {len(self.zones)} zonas, "
+            f"{self.flagged} nomes {action} (sem RDAP, nmap e httpx)"
+        )
+
+
+def wildcard_detector(domain: str) -> Optional[WildcardDetector]:
+    """Detector para o domínio alvo, ou None com RECON_WILDCARD=off"""
+    if WILDCARD_MODE == "off":
+        return None
+    return WildcardDetector(domain)
+
+
+def skip(resolved: Dict) -> bool:
+    """Se o nome marcado como curinga deve ser descartado (RECON_WILDCARD=drop)"""
+    return WILDCARD_MODE == "drop" and resolved.get("wildcard", False)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+import argparse
+from conn.database import get_opensearch_client
+from conn.bulk import BulkWriter
+from parsers.registry import get_parser, names
+from tools import metrics
+
+
+def main(tool: str, source: str, index: str, target: str = "") -> None:
+    """Indexa a saída de qualquer ferramenta registrada via bulk"""
+    parse = get_parser(tool)
+    client = get_opensearch_client()
+    metrics.start(target or index, f"ingest-{tool}", client)
+
+    print(f"[*] Indexando saída do {tool} ({source}) em {index}")
+    with BulkWriter(client) as writer:
+        for doc in parse(source, target or index):
+            writer.add(index, doc)
+
+    print(f"[+] {writer.indexed} documentos indexados em {index}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Indexa a saída de uma ferramenta no OpenSearch"
+    )
+    parser.add_argument("tool", choices=names(), help="Ferramenta que gerou a saída")
+    parser.add_argument("arquivo", help="Arquivo de saída ('-' para a entrada padrão)")
+    parser.add_argument("indice", help="Índice de destino")
+    parser.add_argument(
+        "--target", default="", help="Alvo gravado nos documentos (default: o índice)"
+    )
+    args = parser.parse_args()
+
+    main(args.tool, args.arquivo, args.indice, args.target)
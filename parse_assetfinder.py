@@ -1,15 +1,16 @@
-dic_assetfinder = {}
+import sys
+from parsers.registry import get_parser
 
+FILE = "/home/marini/pentest/pm.ro.gov.br/assetfinder.txt"
 
-def parser():
-    with open("/home/marini/pentest/pm.ro.gov.br/assetfinder.txt") as file:
-        for line in file:
-            dic_assetfinder["sub_domain"] = line.rstrip("\n")
-            print(dic_assetfinder)
+
+def parser(path=FILE):
+    for doc in get_parser("assetfinder")(path):
+        print(doc)
 
 
 def main():
-    parser()
+    parser(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
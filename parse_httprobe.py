@@ -1,16 +1,16 @@
-dic_httprobe = {}
+import sys
+from parsers.registry import get_parser
 
+FILE = "/home/marini/pentest/pm.ro.gov.br/httprobe.txt"
 
-def parse():
-    with open("/home/marini/pentest/pm.ro.gov.br/httprobe.txt") as file:
-        for i in file:
-            dic_httprobe["url_original"] = i.rstrip("\n")
-            dic_httprobe["protocolo"] = i.rstrip("\n").split(":")[0]
-            print(dic_httprobe)
+
+def parse(path=FILE):
+    for doc in get_parser("httprobe")(path):
+        print(doc)
 
 
 def main():
-    parse()
+    parse(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
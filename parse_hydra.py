@@ -1,22 +1,16 @@
-import json
+import sys
+from parsers.registry import get_parser
 
-dic_hydra = {}
+FILE = "/home/marini/pentest/pm.ro.gov.br/hydra.json"
 
 
-def parse():
-    with open("/home/marini/pentest/pm.ro.gov.br/hydra.json") as json_file:
-        jsondata = json.load(json_file)
-        for i in jsondata["results"]:
-            dic_hydra["port"] = i["port"]
-            dic_hydra["service"] = i["service"]
-            dic_hydra["host"] = i["host"]
-            dic_hydra["login"] = i["login"]
-            dic_hydra["password"] = i["password"]
-            print(dic_hydra)
+def parse(path=FILE):
+    for doc in get_parser("hydra")(path):
+        print(doc)
 
 
 def main():
-    parse()
+    parse(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,16 @@
-import string
+import sys
+from parsers.registry import get_parser
 
-dic_masscan = {}
+FILE = "/home/marini/pentest/pm.ro.gov.br/masscan.txt"
 
 
-def parse():
-    with open("/home/marini/pentest/pm.ro.gov.br/masscan.txt") as file:
-        for line in file:
-            dic_masscan["address"] = line.rstrip("\n").split(" ")[5]
-            dic_masscan["port"] = line.rstrip("\n").split(" ")[3].split("/")[0]
-            dic_masscan["protocol"] = line.rstrip("\n").split(" ")[3].split("/")[1]
-            dic_masscan["state"] = line.rstrip("\n").split(" ")[1]
-            print(dic_masscan)
+def parse(path=FILE):
+    for doc in get_parser("masscan")(path):
+        print(doc)
 
 
 def main():
-    parse()
+    parse(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
@@ -1,34 +1,16 @@
-import xml.etree.ElementTree as ET
+import sys
+from parsers.registry import get_parser
 
+FILE = "/home/marini/pentest/pm.ro.gov.br/nikto.xml"
 
-dic_nikto = {}
 
-
-tree = ET.parse("/home/marini/pentest/pm.ro.gov.br/nikto.xml")
-root = tree.getroot()
-
-
-def parse_xml():
-    for i in root.iter("scandetails"):
-        dic_nikto["targetip"] = i.attrib["targetip"]
-        dic_nikto["targethostname"] = i.attrib["targethostname"]
-        dic_nikto["url_original"] = i.attrib["sitename"]
-        dic_nikto["targetport"] = i.attrib["targetport"]
-        dic_nikto["protocol"] = i.attrib["sitename"].split(":")[0]
-        for scan in i:
-            if scan.tag == "item":
-                for item in scan:
-                    if item.tag == "description":
-                        dic_nikto["vuln_description"] = item.text
-                    if item.tag == "uri":
-                        dic_nikto["uri"] = item.text
-                    if item.tag == "namelink":
-                        dic_nikto["url_full"] = item.text
-                print(dic_nikto)
+def parse_xml(path=FILE):
+    for doc in get_parser("nikto")(path):
+        print(doc)
 
 
 def main():
-    parse_xml()
+    parse_xml(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
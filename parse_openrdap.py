@@ -1,9 +1,12 @@
+import sys
 import requests
 import json
+from parsers.registry import get_parser
+
+FILE = "/home/marini/pentest/pm.ro.gov.br/openrdap.json"
 
 
 dic_openrdap = {}
-dic_openrdap_ip = {}
 
 
 def parse():
@@ -19,18 +22,14 @@ def parse():
         print(dic_openrdap)
 
 
-def parse_tool():
-    with open("/home/marini/pentest/pm.ro.gov.br/openrdap.json") as json_file:
-        json_rdap_ip = json.load(json_file)
-        dic_openrdap_ip["blocoip"] = json_rdap_ip["handle"]
-        dic_openrdap_ip["startAddress"] = json_rdap_ip["startAddress"]
-        dic_openrdap_ip["endAddress"] = json_rdap_ip["endAddress"]
-        print(dic_openrdap_ip)
+def parse_tool(path=FILE):
+    for doc in get_parser("rdap")(path):
+        print(doc)
 
 
 def main():
     # parse()
-    parse_tool()
+    parse_tool(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,16 @@
-# import sys
-# import string
-import json
+import sys
+from parsers.registry import get_parser
 
-dic_subfinder = {}
+FILE = "/home/marini/pentest/pm.ro.gov.br/subfinder-json.json"
 
 
-def parser():
-    with open("/home/marini/pentest/pm.ro.gov.br/subfinder-json.json") as json_file:
-        for line in json_file:
-            json_line = line.rstrip("\n")
-            json_data = json.loads(json_line)
-            dic_subfinder["sub_domain"] = json_data["host"]
-            dic_subfinder["source"] = json_data["source"]
-            print(dic_subfinder)
+def parser(path=FILE):
+    for doc in get_parser("subfinder")(path):
+        print(doc)
 
 
 def main():
-    parser()
+    parser(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
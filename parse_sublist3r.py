@@ -1,15 +1,16 @@
-dic_sublist3r = {}
+import sys
+from parsers.registry import get_parser
 
+FILE = "/home/marini/pentest/pm.ro.gov.br/sublist3r.txt"
 
-def parser():
-    with open("/home/marini/pentest/pm.ro.gov.br/sublist3r.txt") as file:
-        for line in file:
-            dic_sublist3r["sub_domain"] = line.rstrip("\n")
-            print(dic_sublist3r)
+
+def parser(path=FILE):
+    for doc in get_parser("sublist3r")(path):
+        print(doc)
 
 
 def main():
-    parser()
+    parser(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
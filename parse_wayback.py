@@ -1,16 +1,16 @@
-dic_wayback = {}
+import sys
+from parsers.registry import get_parser
 
+FILE = "/home/marini/pentest/pm.ro.gov.br/wayback.txt"
 
-def parser():
-    with open("/home/marini/pentest/pm.ro.gov.br/wayback.txt") as file:
-        for line in file:
-            dic_wayback["urlfull"] = line.rstrip("\n")
-            dic_wayback["protocol"] = line.rstrip("\n").split(":")[0]
-            print(dic_wayback)
+
+def parser(path=FILE):
+    for doc in get_parser("wayback")(path):
+        print(doc)
 
 
 def main():
-    parser()
+    parser(sys.argv[1] if len(sys.argv) > 1 else FILE)
 
 
 if __name__ == "__main__":
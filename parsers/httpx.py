@@ -0,0 +1,56 @@
+# httpx.py
+import json
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, iter_lines, register
+
+DURATION_UNITS = {"ns": 1e-6, "µs": 1e-3, "us": 1e-3, "ms": 1, "s": 1000}
+
+
+def duration_ms(value: str) -> float:
+    """Converte a duração do Go usada pelo httpx ("123.4ms", "1.2s") em ms"""
+    value = str(value or "").strip()
+    for unit in sorted(DURATION_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            try:
+                return float(value[: -len(unit)]) * DURATION_UNITS[unit]
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def http_document(entry: Dict) -> Dict:
+    """Documento do <alvo>-http a partir de uma linha JSON do httpx"""
+    addresses = entry.get("a") or []
+    try:
+        port = int(entry.get("port") or 0)
+    except ValueError:
+        port = 0
+
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.domain": entry.get("input") or entry.get("host", ""),
+        "server.ip": entry.get("host_ip") or (addresses[0] if addresses else ""),
+        "url.full": entry.get("url", ""),
+        "url.scheme": entry.get("scheme", ""),
+        "url.domain": entry.get("host", ""),
+        "url.port": port,
+        "url.path": entry.get("path", ""),
+        "http.response.status_code": entry.get("status_code", 0),
+        "http.response.body.bytes": entry.get("content_length", 0),
+        "http.response.time_ms": duration_ms(entry.get("time", "")),
+        "http.title": entry.get("title", ""),
+        "http.webserver": entry.get("webserver", ""),
+        "http.technologies": entry.get("tech") or [],
+        "vulnerability.scanner.vendor": "httpx",
+    }
+
+
+@register("httpx")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Saída JSON por linha do httpx (-json)"""
+    for line in iter_lines(source):
+        try:
+            yield http_document(json.loads(line))
+        except (ValueError, AttributeError):
+            continue
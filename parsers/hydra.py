@@ -0,0 +1,27 @@
+# hydra.py
+import json
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, binary, register
+
+
+@register("hydra")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Credenciais encontradas no JSON do hydra (-b json)"""
+    source = binary(source)
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = json.load(f)
+    else:
+        data = json.load(source)
+
+    for result in data.get("results", []):
+        yield {
+            "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+            "server.address": result.get("host", ""),
+            "server.port": result.get("port", ""),
+            "service.name": result.get("service", ""),
+            "user.name": result.get("login", ""),
+            "hydra.password": result.get("password", ""),
+            "vulnerability.scanner.vendor": "hydra",
+        }
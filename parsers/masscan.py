@@ -0,0 +1,43 @@
+# masscan.py
+from time import strftime
+from typing import Dict, Iterator, List, Tuple
+from parsers.registry import Source, iter_lines, register
+
+
+def parse_sweep_line(line: str) -> List[Tuple[str, str, str]]:
+    """Extrai (ip, porta, protocolo) abertos de uma linha da varredura.
+
+    Aceita a saída padrão do masscan e a saída grepable do nmap (-oG).
+    """
+    parts = line.split()
+
+    # Discovered open port 443/tcp on 10.0.0.1
+    if len(parts) >= 6 and parts[0] == "Discovered" and parts[1] == "open":
+        port, protocol = parts[3].split("/")
+        return [(parts[5], port, protocol)]
+
+    # Host: 10.0.0.1 ()\tPorts: 22/open/tcp//ssh///, 80/filtered/tcp//http///
+    if parts[:1] == ["Host:"] and "Ports:" in line:
+        ports = line.split("Ports:", 1)[1].split("\t", 1)[0]
+        found = []
+        for entry in ports.split(","):
+            fields = entry.strip().split("/")
+            if len(fields) >= 3 and fields[1] == "open":
+                found.append((parts[1], fields[0], fields[2]))
+        return found
+
+    return []
+
+
+@register("masscan")
+def parse_masscan(source: Source, target: str = "") -> Iterator[Dict]:
+    """Uma porta aberta por documento"""
+    for line in iter_lines(source):
+        for ip, port, protocol in parse_sweep_line(line):
+            yield {
+                "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+                "server.ip": ip,
+                "server.port": int(port),
+                "network.transport": protocol,
+                "vulnerability.scanner.vendor": "masscan",
+            }
@@ -0,0 +1,53 @@
+# nikto.py
+import xml.etree.ElementTree as ET
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, binary, register
+
+SCANNER = "nikto"
+
+
+def item_document(details: Dict[str, str], item: ET.Element) -> Dict:
+    """Documento de um achado (<item>) com os dados do alvo (<scandetails>)"""
+    sitename = details.get("sitename", "")
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.ip": details.get("targetip", ""),
+        "server.domain": details.get("targethostname", ""),
+        "server.port": details.get("targetport", ""),
+        "url.original": sitename,
+        "url.scheme": sitename.split(":")[0],
+        "url.path": item.findtext("uri", ""),
+        "url.full": item.findtext("namelink", ""),
+        "vulnerability.id": item.get("id", ""),
+        "vulnerability.description": item.findtext("description", ""),
+        "vulnerability.scanner.vendor": SCANNER,
+    }
+
+
+@register("nikto")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Um documento por achado do nikto, sem carregar o XML inteiro.
+
+    Os atributos de <scandetails> são guardados na abertura do elemento e
+    cada <item> é convertido e descartado assim que fecha.
+    """
+    details = {}
+    scan = None
+    try:
+        for event, elem in ET.iterparse(binary(source), events=("start", "end")):
+            if elem.tag == "scandetails":
+                if event == "start":
+                    details = dict(elem.attrib)
+                    scan = elem
+                else:
+                    elem.clear()
+            elif event == "end" and elem.tag == "item":
+                yield item_document(details, elem)
+                # Itens já convertidos saem da árvore (atributos já copiados)
+                if scan is not None:
+                    scan.clear()
+                else:
+                    elem.clear()
+    except ET.ParseError as e:
+        print(f"[!] XML do nikto incompleto: {e}")
@@ -0,0 +1,110 @@
+# nmap.py
+import xml.etree.ElementTree as ET
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, binary, register
+
+SCANNER = "nmap"
+
+
+def iter_hosts(source: Source) -> Iterator[ET.Element]:
+    """Percorre os <host> de um XML do nmap sem carregar o arquivo inteiro.
+
+    Cada host é entregue assim que o elemento fecha e descartado em
+    seguida, então a memória fica constante mesmo em varreduras com
+    centenas de milhares de hosts. Um XML truncado (nmap interrompido)
+    entrega os hosts completos até o ponto do corte.
+    """
+    root = None
+    try:
+        for event, elem in ET.iterparse(binary(source), events=("start", "end")):
+            if root is None:
+                root = elem  # <nmaprun>
+            if event == "end" and elem.tag == "host":
+                yield elem
+                elem.clear()
+                root.clear()  # Solta a referência do nmaprun ao host
+    except ET.ParseError as e:
+        print(f"[!] XML do nmap incompleto: {e}")
+
+
+def service_cpe(service: ET.Element) -> str:
+    """CPE do serviço como no parse_nmap.py original: o atributo cpe ou,
+    no XML do nmap -sV, o primeiro elemento <cpe>"""
+    if service is None:
+        return ""
+    return service.get("cpe") or (service.findtext("cpe") or "").strip()
+
+
+def port_document(port: ET.Element) -> Dict:
+    """Campos de uma porta, com strings vazias quando faltam dados"""
+    state = port.find("state")
+    service = port.find("service")
+    return {
+        "port": port.get("portid", ""),
+        "protocol": port.get("protocol", ""),
+        "state": state.get("state", "") if state is not None else "",
+        "service": service.get("name", "") if service is not None else "",
+        "product": service.get("product", "") if service is not None else "",
+        "version": service.get("version", "") if service is not None else "",
+        "cpe": service_cpe(service),
+    }
+
+
+def host_document(ip: str, target: str, scanner: str = SCANNER) -> Dict:
+    """Documento do <alvo>-portscan de um IPv4, ainda sem portas"""
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.ip": ip,
+        "source_index": target,
+        "scanner": scanner,
+        "ports": [],
+    }
+
+
+def host_documents(
+    hosts: Iterator[ET.Element], target: str, scanner: str = SCANNER
+) -> Iterator[Dict]:
+    """Um documento por host IPv4 (formato do auto_nmap)"""
+    for host in hosts:
+        ip_element = host.find("address[@addrtype='ipv4']")
+        if ip_element is None:
+            continue
+
+        doc = host_document(ip_element.get("addr", ""), target, scanner)
+        doc["ports"] = [port_document(port) for port in host.findall("ports/port")]
+        yield doc
+
+
+def dualstack_documents(
+    hosts: Iterator[ET.Element], target: str, scanner: str = SCANNER
+) -> Iterator[Dict]:
+    """Um documento por host com todos os endereços (formato do scan_dualstack)"""
+    for host in hosts:
+        addresses = {
+            addr.get("addrtype"): addr.get("addr", "")
+            for addr in host.findall("address")
+            if addr.get("addrtype") in ["ipv4", "ipv6", "mac"]
+        }
+        if not addresses:
+            continue
+
+        yield {
+            "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+            "source_index": target,
+            "scanner": scanner,
+            "network": addresses,
+            "ports": [port_document(port) for port in host.findall("ports/port")],
+        }
+
+
+@register("nmap")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Documentos do auto_nmap, host a host, a partir de um caminho ou stream"""
+    return host_documents(iter_hosts(source), target)
+
+
+@register("nmap-dualstack")
+def parse_dualstack(source: Source, target: str = "") -> Iterator[Dict]:
+    """Documentos do scan_dualstack, host a host"""
+    return dualstack_documents(iter_hosts(source), target)
@@ -0,0 +1,31 @@
+# nuclei.py
+import json
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, iter_lines, register
+
+
+@register("nuclei")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Saída JSONL do nuclei (-jsonl), um achado por linha"""
+    for line in iter_lines(source):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"[!] Linha inválida do nuclei: {line[:100]}")
+            continue
+
+        info = entry.get("info", {})
+        yield {
+            "@timestamp": entry.get("timestamp") or strftime("%Y-%m-%dT%H:%M:%S%Z"),
+            "server.address": entry.get("host", ""),
+            "server.ip": entry.get("ip", ""),
+            "url.full": entry.get("matched-at", ""),
+            "network.protocol": entry.get("type", ""),
+            "rule.name": info.get("name", ""),
+            "tags": info.get("tags") or [],
+            "vulnerability.id": entry.get("template-id", ""),
+            "vulnerability.severity": info.get("severity", ""),
+            "vulnerability.scanner.vendor": "nuclei",
+            "nuclei.extracted_results": entry.get("extracted-results") or [],
+        }
@@ -0,0 +1,23 @@
+# rdap.py
+import json
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, binary, register
+
+
+@register("rdap")
+def parse(source: Source, target: str = "") -> Iterator[Dict]:
+    """Bloco IP da resposta JSON do openrdap (rdap <ip> --json)"""
+    source = binary(source)
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = json.load(f)
+    else:
+        data = json.load(source)
+
+    yield {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.ipblock": data.get("handle", ""),
+        "rdap.start_address": data.get("startAddress", ""),
+        "rdap.end_address": data.get("endAddress", ""),
+    }
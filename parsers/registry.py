@@ -0,0 +1,105 @@
+# registry.py
+import functools
+import importlib
+import io
+import sys
+import time
+from typing import Callable, Dict, IO, Iterator, List, Union
+from tools import metrics
+
+Source = Union[str, IO[bytes]]
+Parser = Callable[..., Iterator[Dict]]
+
+# Módulos de parsers carregados sob demanda; cada um se registra ao importar
+MODULES = [
+    "httpx",
+    "hydra",
+    "masscan",
+    "nikto",
+    "nmap",
+    "nuclei",
+    "rdap",
+    "subdomains",
+    "urls",
+]
+
+PARSERS: Dict[str, Parser] = {}
+_loaded = False
+
+
+def register(name: str) -> Callable[[Parser], Parser]:
+    """Registra um parser: gerador ``(source, target="")`` de documentos ECS.
+
+    O parser registrado é instrumentado: o tempo gasto dentro do gerador (sem
+    o do consumidor) vai para a etapa "parse" e os documentos são contados.
+    """
+
+    def decorator(func: Parser) -> Parser:
+        @functools.wraps(func)
+        def measured(*args, **kwargs) -> Iterator[Dict]:
+            docs = func(*args, **kwargs)
+            elapsed = 0.0
+            count = 0
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        doc = next(docs)
+                    except StopIteration:
+                        break
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    count += 1
+                    yield doc
+            finally:
+                docs.close()
+                metrics.observe("parse", elapsed, name)
+                metrics.count("documents", count, stage="parse", tool=name)
+
+        PARSERS[name] = measured
+        return measured
+
+    return decorator
+
+
+def load() -> None:
+    global _loaded
+    if _loaded:
+        return
+    for module in MODULES:
+        importlib.import_module(f"parsers.{module}")
+    _loaded = True
+
+
+def get_parser(name: str) -> Parser:
+    load()
+    if name not in PARSERS:
+        raise KeyError(
+            f"Parser desconhecido: {name} (disponíveis: {', '.join(names())})"
+        )
+    return PARSERS[name]
+
+
+def names() -> List[str]:
+    load()
+    return sorted(PARSERS)
+
+
+def binary(source: Source) -> Source:
+    """Caminho ou stream binário; "-" vira a entrada padrão"""
+    return sys.stdin.buffer if source == "-" else source
+
+
+def iter_lines(source: Source) -> Iterator[str]:
+    """Linhas não vazias de um arquivo ou stream binário, sem carregar tudo"""
+    source = binary(source)
+    if isinstance(source, str):
+        stream = open(source, encoding="utf-8", errors="replace")
+    else:
+        stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
+
+    with stream:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line
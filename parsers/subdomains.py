@@ -0,0 +1,42 @@
+# subdomains.py
+import json
+from time import strftime
+from typing import Dict, Iterator
+from parsers.registry import Source, iter_lines, register
+
+
+def subdomain_document(host: str, tool: str) -> Dict:
+    host = host.rstrip(".").lower()
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "server.address": host,
+        "server.domain": host,
+        "vulnerability.scanner.vendor": tool,
+    }
+
+
+@register("assetfinder")
+def parse_assetfinder(source: Source, target: str = "") -> Iterator[Dict]:
+    for line in iter_lines(source):
+        yield subdomain_document(line, "assetfinder")
+
+
+@register("sublist3r")
+def parse_sublist3r(source: Source, target: str = "") -> Iterator[Dict]:
+    for line in iter_lines(source):
+        # O sublist3r às vezes junta vários nomes na mesma linha com <BR>
+        for host in line.split("<BR>"):
+            yield subdomain_document(host, "sublist3r")
+
+
+@register("subfinder")
+def parse_subfinder(source: Source, target: str = "") -> Iterator[Dict]:
+    """Saída JSON por linha do subfinder (-oJ)"""
+    for line in iter_lines(source):
+        try:
+            entry = json.loads(line)
+            doc = subdomain_document(entry["host"], "subfinder")
+        except (ValueError, KeyError, TypeError):
+            continue
+        doc["labels.source"] = entry.get("source", "")
+        yield doc
@@ -0,0 +1,32 @@
+# urls.py
+from time import strftime
+from typing import Dict, Iterator
+from urllib.parse import urlsplit
+from parsers.registry import Source, iter_lines, register
+
+
+def url_document(url: str, tool: str) -> Dict:
+    parts = urlsplit(url)
+    return {
+        "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+        "url.original": url,
+        "url.full": url,
+        "url.scheme": parts.scheme,
+        "url.domain": parts.hostname or "",
+        "url.path": parts.path,
+        "url.query": parts.query,
+        "vulnerability.scanner.vendor": tool,
+    }
+
+
+@register("httprobe")
+def parse_httprobe(source: Source, target: str = "") -> Iterator[Dict]:
+    for line in iter_lines(source):
+        yield url_document(line, "httprobe")
+
+
+@register("wayback")
+def parse_wayback(source: Source, target: str = "") -> Iterator[Dict]:
+    """Uma URL por linha (waybackurls); arquivos com milhões de linhas"""
+    for line in iter_lines(source):
+        yield url_document(line, "wayback")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Ponto de entrada único do pipeline de recon.
+
+    recon.py discover <target> <domain> [--tools ...]
+    recon.py resolve [arquivo]
+    recon.py portscan <indice> [--batch | --two-phase] [--resume RUN_ID]
+    recon.py http <target> [--incremental] [--resume RUN_ID]
+    recon.py query <indice>
+
+Cada subcomando importa só o módulo do seu estágio, no momento em que é
+chamado: ``--help`` e erros de uso não pagam opensearchpy, requests ou
+tqdm, e os estágios rodam no mesmo processo em vez de um script por
+ferramenta. Os estágios, por sua vez, só carregam o opensearchpy ao criar
+o cliente (conn.database). As opções de cada estágio são as do script original
+(``recon.py portscan --help`` mostra as do auto_nmap.py).
+"""
+
+import argparse
+import sys
+from typing import List
+
+
+def discover(argv: List[str]) -> None:
+    from discover import cli
+
+    cli(argv)
+
+
+def resolve(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        description="Resolve nomes (A/AAAA) e imprime um JSON por linha"
+    )
+    parser.add_argument(
+        "arquivo", nargs="?", default="-", help="Um nome por linha (default: stdin)"
+    )
+    parser.add_argument("--concurrency", type=int, help="Consultas simultâneas")
+    parser.add_argument("--timeout", type=float, help="Segundos por consulta")
+    args = parser.parse_args(argv)
+
+    import json
+    from enrich.resolver import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, resolve_stream
+
+    source = sys.stdin if args.arquivo == "-" else open(args.arquivo)
+    with source:
+        for resolved in resolve_stream(
+            source,
+            concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+            timeout=args.timeout or DEFAULT_TIMEOUT,
+        ):
+            print(json.dumps(resolved), flush=True)
+
+
+def portscan(argv: List[str]) -> None:
+    from auto_nmap import cli
+
+    cli(argv)
+
+
+def http(argv: List[str]) -> None:
+    from auto_httpx import main
+
+    main(argv)
+
+
+def query(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        description="Lista os domínios únicos de um índice"
+    )
+    parser.add_argument("indice", help="Índice a consultar")
+    args = parser.parse_args(argv)
+
+    from consulta_subdomain import consultar_indice_sem_duplicados
+
+    consultar_indice_sem_duplicados(args.indice)
+
+
+COMMANDS = {
+    "discover": (discover, "Descobre, resolve e enriquece subdomínios"),
+    "resolve": (resolve, "Resolve nomes de um arquivo ou da entrada padrão"),
+    "portscan": (portscan, "Port scan dos IPs de um alvo (nmap/masscan)"),
+    "http": (http, "Verifica os serviços HTTP dos domínios de um alvo (httpx)"),
+    "query": (query, "Consulta os domínios únicos de um índice"),
+}
+
+
+def main(argv: List[str] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="recon.py",
+        description="Pipeline de recon",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="subcomandos:\n"
+        + "\n".join(f"  {name:<10} {help}" for name, (_, help) in COMMANDS.items())
+        + "\n\nUse 'recon.py <subcomando> --help' para as opções de cada um.",
+    )
+    parser.add_argument("command", choices=list(COMMANDS), metavar="subcomando")
+
+    # Só o subcomando é lido aqui; o resto vai para o parser do estágio
+    if not argv or argv[0] not in COMMANDS:
+        parser.parse_args(argv[:1])
+    command, handler_args = argv[0], argv[1:]
+    # Parsers dos estágios usam sys.argv[0] no "usage": recon.py <subcomando>
+    sys.argv[0] = f"{parser.prog} {command}"
+    COMMANDS[command][0](handler_args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,57 @@
 #!/usr/bin/env python3
-import sys
 import os
+import argparse
 import subprocess
 import uuid
 from pathlib import Path
-from time import strftime
-import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List
 from conn.database import get_opensearch_client
+from conn.bulk import BulkWriter
+from conn.query import WILDCARD, iter_unique_values, keyword_field
+from conn.templates import install_templates
+from parsers import nmap as nmap_parser
+from tools.batching import AdaptiveBatcher, run_adaptive, run_each
+from tools import metrics
+from tools.pool import get_pool
+from tools.scheduler import LIMITS
 
 # Configurações
-client = get_opensearch_client()
-MAX_WORKERS = min(10, (os.cpu_count() or 1) * 2)  # Limita a 10 threads
+MAX_WORKERS = LIMITS["scan"]  # Threads além das vagas do agendador só esperariam
 TIMEOUT_NMAP = 1800  # 30 minutos em segundos
 SCANNER = "nmap"
 
 
-def get_unique_ips(index: str) -> list:
-    """Versão corrigida da função de busca de IPs"""
+def get_unique_ips(index: str) -> Iterator[str]:
+    """Versão corrigida da função de busca de IPs (paginada)"""
+    client = get_opensearch_client()
     try:
         if not client.indices.exists(index=index):
             print(f"[!] Índice {index} não encontrado")
-            return []
+            return
 
         # Tenta campos alternativos em ordem
-        for field in [
-            "server.ip.keyword",
-            "network.ipv4.keyword",
-            "network.ipv6.keyword",
-        ]:
+        for name in ["server.ip", "network.ipv4", "network.ipv6"]:
+            field = keyword_field(client, index, name)
             query = {
-                "size": 0,
-                "query": {
-                    "bool": {
-                        "must": [{"exists": {"field": field}}],
-                        "must_not": [
-                            {"term": {field: "0.0.0.0"}},
-                            {"term": {field: "::"}},
-                        ],
-                    }
-                },
-                "aggs": {"unique_ips": {"terms": {"field": field, "size": 10000}}},
+                "bool": {
+                    "must": [{"exists": {"field": field}}],
+                    "must_not": [
+                        {"term": {field: "0.0.0.0"}},
+                        {"term": {field: "::"}},
+                        WILDCARD,
+                    ],
+                }
             }
 
-            response = client.search(index=index, body=query)
-            buckets = response["aggregations"]["unique_ips"]["buckets"]
-            if buckets:
-                return [bucket["key"] for bucket in buckets]
-
-        return []
+            values = iter_unique_values(client, index, field, query)
+            first = next(values, None)
+            if first is not None:
+                yield first
+                yield from values
+                return
 
     except Exception as e:
         print(f"[!] Erro na consulta: {str(e)}")
-        return []
 
 
 def criar_diretorios(target: str) -> None:
@@ -61,22 +60,21 @@ def criar_diretorios(target: str) -> None:
 
 
 def run_nmap(target: str, ip: str) -> str:
-    """Executa scan nmap (IPv4/IPv6) via Docker"""
+    """Executa scan nmap (IPv4/IPv6) no pool de containers kali-tools"""
     scan_id = str(uuid.uuid1())[:8]
-    output_file = f"/docker/recon/data/{target}/temp/nmap-{scan_id}.xml"
+    pool = get_pool(target, MAX_WORKERS)
+    output_file = f"{pool.host_dir}/nmap-{scan_id}.xml"
 
     # Detecta automaticamente o tipo de IP
     ip_param = f"-6 {ip}" if ":" in ip else ip
 
     cmd = (
-        f"docker run --rm --name {target}-{scan_id}-nmap "
-        f"-v /docker/recon/data/{target}/temp:/data "
-        f"kali-tools:2.1 nmap -sSV -Pn {ip_param} "
-        f"-oX /data/nmap-{scan_id}.xml --stylesheet=none"
+        f"nmap -sSV -Pn {ip_param} "
+        f"-oX {pool.data_dir}/nmap-{scan_id}.xml --stylesheet=none"
     )
 
     try:
-        subprocess.run(cmd, shell=True, check=True, timeout=TIMEOUT_NMAP)
+        pool.run(cmd, timeout=TIMEOUT_NMAP, check=True, resource="scan")
         return output_file
     except subprocess.TimeoutExpired:
         print(f"[!] Timeout no scan de {ip}")
@@ -86,97 +84,107 @@ def run_nmap(target: str, ip: str) -> str:
         return ""
 
 
-def parse_nmap_results(xml_path: str, target: str) -> list:
-    """Processa XML incluindo IPv4/IPv6 e campos vazios como string"""
-    try:
-        tree = ET.parse(xml_path)
-        docs = []
-
-        for host in tree.findall("host"):
-            # Coleta todos os endereços
-            addresses = {
-                addr.get("addrtype"): addr.get("addr", "")
-                for addr in host.findall("address")
-                if addr.get("addrtype") in ["ipv4", "ipv6", "mac"]
-            }
+def ip_family(ip: str) -> str:
+    return "ipv6" if ":" in ip else "ipv4"
 
-            if not addresses:
-                continue
 
-            doc = {
-                "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
-                "source_index": target,
-                "scanner": SCANNER,
-                "network": addresses,
-                "ports": [],
-            }
+def run_nmap_batch(target: str, ips: List[str]) -> str:
+    """Executa um único nmap para um lote de IPs da mesma família (-iL).
 
-            for port in host.findall("ports/port"):
-                port_data = {
-                    "port": port.get("portid", ""),
-                    "protocol": port.get("protocol", ""),
-                    "state": port.find("state").get("state", "")
-                    if port.find("state") is not None
-                    else "",
-                }
+    O nmap não mistura IPv4 e IPv6 na mesma execução, então os lotes chegam
+    separados por família e os de IPv6 levam -6. Lança TimeoutExpired no
+    timeout para que o lote seja refeito menor.
+    """
+    scan_id = str(uuid.uuid1())[:8]
+    pool = get_pool(target, MAX_WORKERS)
+    list_file = f"{pool.host_dir}/nmap-{scan_id}.lst"
+    output_file = f"{pool.host_dir}/nmap-{scan_id}.xml"
+
+    with open(list_file, "w") as f:
+        f.write("\n".join(ips) + "\n")
 
-                service = port.find("service")
-                port_data.update(
-                    {
-                        "service": service.get("name", "")
-                        if service is not None
-                        else "",
-                        "product": service.get("product", "")
-                        if service is not None
-                        else "",
-                        "version": service.get("version", "")
-                        if service is not None
-                        else "",
-                    }
-                )
-
-                doc["ports"].append(port_data)
-
-            docs.append(doc)
-
-        return docs
+    family = "-6 " if ip_family(ips[0]) == "ipv6" else ""
+    cmd = (
+        f"nmap -sSV -Pn {family}-iL {pool.data_dir}/nmap-{scan_id}.lst "
+        f"-oX {pool.data_dir}/nmap-{scan_id}.xml --stylesheet=none"
+    )
+
+    try:
+        pool.run(cmd, timeout=TIMEOUT_NMAP, check=True, resource="scan")
+        return output_file
+    except subprocess.TimeoutExpired:
+        print(f"[!] Timeout no scan do lote de {len(ips)} IPs")
+        Path(output_file).unlink(missing_ok=True)  # XML parcial do lote morto
+        raise
+    except Exception as e:
+        print(f"[!] Falha no scan do lote de {len(ips)} IPs: {str(e)[:100]}")
+        return ""
+    finally:
+        os.remove(list_file)
+
+
+def parse_nmap_results(xml_path: str, target: str) -> Iterator[dict]:
+    """Entrega os documentos IPv4/IPv6 do XML host a host (iterparse)"""
+    try:
+        yield from nmap_parser.parse_dualstack(xml_path, target)
     except Exception as e:
         print(f"[!] Erro ao processar {xml_path}: {e}")
-        return []
 
 
-def main(target_index: str) -> None:
-    """Execução paralela dos scans"""
+def main(target_index: str, batch: bool = False) -> None:
+    """Execução paralela dos scans (em lotes adaptativos com ``batch``)"""
     output_index = f"{target_index}-portscan"
+    client = get_opensearch_client()
+    install_templates(client, target_index)
+    metrics.start(target_index, "nmap-dualstack", client)
+    # IPs chegam página a página; os scans começam já com a primeira
     ips = get_unique_ips(target_index)
 
-    if not ips:
-        print("[!] Nenhum IP válido encontrado")
-        return
-
-    print(f"[*] Iniciando scan de {len(ips)} IPs (Threads: {MAX_WORKERS})...")
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(run_nmap, target_index, ip): ip for ip in ips}
-
-        for future in as_completed(futures):
-            ip = futures[future]
+    print(f"[*] Iniciando scan (Threads: {MAX_WORKERS})...")
+
+    if batch:
+        batcher = AdaptiveBatcher()
+        results = run_adaptive(
+            ips,
+            lambda chunk: run_nmap_batch(target_index, chunk),
+            MAX_WORKERS,
+            batcher,
+            group=ip_family,
+        )
+    else:
+        results = run_each(ips, lambda ip: run_nmap(target_index, ip), MAX_WORKERS)
+
+    scanned = 0
+    with BulkWriter(client) as writer:
+        for chunk, xml_path in results:
+            scanned += len(chunk)
             try:
-                xml_path = future.result()
                 if not xml_path:
                     continue
 
                 for doc in parse_nmap_results(xml_path, target_index):
-                    client.index(index=output_index, body=doc, refresh=True)
-                    print(f"[+] {ip} → {len(doc['ports'])} portas indexadas")
+                    ip = doc["network"].get("ipv4") or doc["network"].get("ipv6")
+                    writer.add(output_index, doc)
+                    print(f"[+] {ip} → {len(doc['ports'])} portas enfileiradas")
 
             except Exception as e:
-                print(f"[!] Erro no IP {ip}: {e}")
+                print(f"[!] Erro no lote {', '.join(chunk[:3])}: {e}")
+
+    if not scanned:
+        print("[!] Nenhum IP válido encontrado")
+        return
+
+    print(f"[*] {scanned} IPs varridos")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print(f"Uso: {sys.argv[0]} <indice_origem>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Port scan IPv4/IPv6 de um alvo")
+    parser.add_argument("indice_origem", help="Índice com os IPs a varrer")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Agrupa vários IPs por nmap (-iL) com lote de tamanho adaptativo",
+    )
+    args = parser.parse_args()
 
-    main(sys.argv[1])
+    main(args.indice_origem, args.batch)
@@ -1,28 +1,14 @@
 import sys
 import socket
 from time import strftime
-from opensearchpy import OpenSearch
-
-host = "localhost"
-port = 9200
-
-# Create the client with SSL/TLS and hostname verification disabled.
-client = OpenSearch(
-    hosts=[{"host": host, "port": port}],
-    http_compress=True,  # enables gzip compression for request bodies
-    use_ssl=False,
-    verify_certs=False,
-    ssl_assert_hostname=False,
-    ssl_show_warn=False,
-)
-
-target = sys.argv[1]
+from conn.database import get_opensearch_client
+
 scanner = "assetfinder"
 dic_assetfinder = {}
 
 
-def busca_dados():
-    target = sys.argv[1]
+def busca_dados(target: str) -> None:
+    client = get_opensearch_client()
     index_name = f"{target}-subdomain"
 
     # Consulta que retorna todos os documentos
@@ -54,8 +40,8 @@ def busca_dados():
         print(f"Erro na consulta: {e}")
 
 
-def post_dados():
-    target = sys.argv[1]
+def post_dados(target: str) -> None:
+    client = get_opensearch_client()
     index_name = f"{target}-subdomain"
     scanner = "assetfinder"
 
@@ -87,10 +73,14 @@ def post_dados():
             print(response)
 
 
-def main():
-    # post_dados()
-    busca_dados()
+def main(target: str) -> None:
+    # post_dados(target)
+    busca_dados(target)
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) != 2:
+        print(f"Uso: {sys.argv[0]} <target>")
+        sys.exit(1)
+
+    main(sys.argv[1])
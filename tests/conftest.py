@@ -0,0 +1,34 @@
+# conftest.py
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Executa "docker exec <worker> sh -c <cmd>" direto no host
+FAKE_DOCKER = """#!/bin/sh
+case "$1" in
+    run) echo fake-worker ;;
+    exec) shift 2; exec "$@" ;;
+    inspect) echo true ;;
+esac
+"""
+
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    """Docker falso no PATH e pools/agendador isolados em tmp_path"""
+    import tools.pool
+    import tools.scheduler
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    docker = bin_dir / "docker"
+    docker.write_text(FAKE_DOCKER)
+    docker.chmod(0o755)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    monkeypatch.setattr(tools.pool, "DATA_ROOT", str(tmp_path / "data"))
+    monkeypatch.setattr(tools.pool, "_pools", {})
+    monkeypatch.setattr(tools.scheduler, "SCHEDULER_ENABLED", False)
+    return bin_dir
@@ -0,0 +1,79 @@
+# test_batching.py
+import subprocess
+import pytest
+import tools.pool
+from tools.batching import AdaptiveBatcher, BatchTimeout, run_adaptive
+
+# nmap falso: 0.4s por IP da lista -iL, grava um XML mínimo em -oX
+FAKE_NMAP = """#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -iL) list="$2"; shift ;;
+        -oX) xml="$2"; shift ;;
+    esac
+    shift
+done
+hosts=$(wc -l < "$list")
+sleep $(awk "BEGIN { print $hosts * 0.4 }")
+echo '<nmaprun></nmaprun>' > "$xml"
+"""
+
+
+@pytest.fixture
+def fake_nmap(fake_docker, monkeypatch):
+    nmap = fake_docker / "nmap"
+    nmap.write_text(FAKE_NMAP)
+    nmap.chmod(0o755)
+
+    # Sem container, /data não existe: o comando usa o diretório do host
+    pool = tools.pool.ToolPool("alvo", mode="docker")
+    pool.data_dir = pool.host_dir
+    monkeypatch.setitem(tools.pool._pools, "alvo", pool)
+    return pool
+
+
+@pytest.mark.parametrize("module", ["auto_nmap", "scan_dualstack"])
+def test_timed_out_docker_batch_is_split_and_retried(fake_nmap, monkeypatch, module):
+    scanner = pytest.importorskip(module)
+    monkeypatch.setattr(scanner, "TIMEOUT_NMAP", 1)
+    ips = [f"10.0.0.{i}" for i in range(1, 5)]
+    batcher = AdaptiveBatcher(initial=4)
+
+    results = list(
+        run_adaptive(
+            ips, lambda chunk: scanner.run_nmap_batch("alvo", chunk), 1, batcher
+        )
+    )
+
+    scanned = sorted(ip for chunk, xml in results if xml for ip in chunk)
+    assert scanned == ips
+    assert all(len(chunk) < 4 for chunk, _ in results)
+
+
+def test_single_item_timeout_is_yielded_without_result():
+    def scan(chunk):
+        if "lento" in chunk:
+            raise subprocess.TimeoutExpired("nmap", 1)
+        return "ok"
+
+    items = ["a", "lento", "b", "c"]
+    results = list(run_adaptive(items, scan, 1, AdaptiveBatcher(initial=4)))
+
+    assert sorted(item for chunk, _ in results for item in chunk) == sorted(items)
+    assert (["lento"], "") in results
+    assert all(result == "ok" for chunk, result in results if chunk != ["lento"])
+
+
+def test_last_pending_item_is_retried_alone():
+    calls = []
+
+    def probe(chunk):
+        calls.append(list(chunk))
+        if len(chunk) > 1:
+            raise BatchTimeout(chunk[-1:])  # Os demais já responderam
+        return "ok"
+
+    results = list(run_adaptive(["a", "b", "c"], probe, 1, AdaptiveBatcher(initial=3)))
+
+    assert calls == [["a", "b", "c"], ["c"]]
+    assert results == [(["c"], "ok")]
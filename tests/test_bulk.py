@@ -0,0 +1,53 @@
+# test_bulk.py
+import json
+import threading
+import time
+import conn.bulk
+from conn.bulk import BulkWriter
+
+
+class ThrottledClient:
+    """Cliente que rejeita com 429 a primeira requisição _bulk e aceita as demais"""
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.refreshed = []
+        self.indices = self
+
+    def bulk(self, body):
+        lines = body.splitlines()
+        self.requests.append([json.loads(line) for line in lines[1::2]])
+        if len(self.requests) == 1:
+            items = [{"index": {"status": 429, "error": "rejeitado"}}] * (
+                len(lines) // 2
+            )
+            return {"errors": True, "items": items}
+        return {"errors": False, "items": []}
+
+    def refresh(self, index):
+        self.refreshed.append(index)
+
+
+def test_backoff_does_not_block_other_producers(monkeypatch):
+    monkeypatch.setattr(conn.bulk, "BACKOFF_BASE", 0.5)
+    client = ThrottledClient()
+    writer = BulkWriter(client, max_docs=2)
+
+    # Completa um lote que volta com 429 e fica no backoff nesta thread
+    producer = threading.Thread(
+        target=lambda: [writer.add("alvo", {"n": n}) for n in range(2)]
+    )
+    producer.start()
+    while not client.requests:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    writer.add("alvo", {"n": 2})
+    assert time.monotonic() - start < 0.2  # Não esperou o backoff alheio
+
+    writer.close()  # Espera o lote em envio pela outra thread
+    producer.join()
+    assert writer.indexed == 3 and writer.failed == 0
+    sent = sorted(doc["n"] for batch in client.requests[1:] for doc in batch)
+    assert sent == [0, 1, 2]
+    assert client.refreshed == ["alvo"]
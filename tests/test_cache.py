@@ -0,0 +1,64 @@
+# test_cache.py
+import asyncio
+import threading
+from enrich.cache import SharedCache
+from enrich.resolver import CachedResolver
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / "enrich.sqlite")
+    cache = SharedCache("Teste", "teste", 3600, path=path, batch=3)
+    other = SharedCache("Teste", "teste", 3600, path=path)  # Outro processo
+
+    cache.set("a", ["10.0.0.1"])
+    cache.set("b", [])
+    assert cache.get("a") == ["10.0.0.1"]  # Pendente, mas visível aqui
+    assert cache.get("b") == []
+    assert other.get("a") is None
+
+    cache.set("c", ["10.0.0.3"])  # Completa o lote: um commit
+    assert other.get("a") == ["10.0.0.1"]
+
+    cache.set("d", ["10.0.0.4"])
+    cache.flush()
+    assert other.get("d") == ["10.0.0.4"]
+
+
+class RecordingResolver:
+    async def query(self, host, record):
+        return ["10.0.0.1"] if record == "A" else []
+
+    def close(self):
+        pass
+
+
+class ThreadCheckingCache(SharedCache):
+    """Registra em que thread cada acesso ao SQLite acontece"""
+
+    threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.current_thread().name)
+        return super().get(key)
+
+    def set(self, key, value, ttl=None):
+        self.threads.add(threading.current_thread().name)
+        super().set(key, value, ttl)
+
+
+def test_cached_resolver_keeps_sqlite_off_the_event_loop(tmp_path):
+    cache = ThreadCheckingCache("DNS", "dns", 3600, path=str(tmp_path / "e.sqlite"))
+    resolver = CachedResolver(RecordingResolver(), cache)
+
+    async def resolve():
+        first = await resolver.query("www.exemplo.com.br", "A")
+        second = await resolver.query("www.exemplo.com.br", "A")
+        resolver.close()
+        return first, second, threading.current_thread().name
+
+    first, second, loop_thread = asyncio.run(resolve())
+    assert first == second == ["10.0.0.1"]
+    assert cache.threads and loop_thread not in cache.threads
+
+    other = SharedCache("DNS", "dns", 3600, path=str(tmp_path / "e.sqlite"))
+    assert other.get("A:www.exemplo.com.br") == ["10.0.0.1"]  # Gravado no close
@@ -0,0 +1,86 @@
+# test_checkpoint.py
+from pathlib import Path
+import pytest
+import tools.checkpoint
+from tools.checkpoint import RunCheckpoint
+
+
+@pytest.fixture(autouse=True)
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.checkpoint, "DATA_ROOT", str(tmp_path))
+    monkeypatch.setattr(tools.checkpoint, "KEEP_RAW", False)
+    (tmp_path / "alvo" / "temp").mkdir(parents=True)
+    return tmp_path
+
+
+def scan(checkpoint: RunCheckpoint, items, complete: bool = True) -> str:
+    """Job falso: grava nmap-<job>.xml e falha no meio se não ``complete``"""
+
+    def run(job: str) -> str:
+        path = f"{checkpoint.host_dir}/nmap-{job}.xml"
+        Path(path).write_text("<nmaprun>" + ("</nmaprun>" if complete else ""))
+        if not complete:
+            raise KeyboardInterrupt
+        return path
+
+    try:
+        return checkpoint.track(items, run)
+    except KeyboardInterrupt:
+        return ""
+
+
+def interrupted_run() -> tuple:
+    """Execução que para com um lote indexado, um só varrido e um no meio"""
+    checkpoint = RunCheckpoint("alvo", "nmap")
+    indexed = scan(checkpoint, ["10.0.0.1", "10.0.0.2"])
+    checkpoint.done(["10.0.0.1", "10.0.0.2"], indexed)
+    scanned = scan(checkpoint, ["10.0.0.3"])
+    scan(checkpoint, ["10.0.0.4"], complete=False)
+    checkpoint.swept({"10.0.0.5": {"80", "443"}})
+    checkpoint.close()
+    with open(checkpoint.path, "a") as journal:
+        journal.write('{"event": "done", "ite')  # Linha cortada pela queda
+    return checkpoint.run_id, indexed, scanned
+
+
+ITEMS = [f"10.0.0.{n}" for n in range(1, 6)]
+
+
+def test_resume_reruns_only_unfinished_items(data_root):
+    run_id, indexed, scanned = interrupted_run()
+    assert not Path(indexed).exists()  # Indexado: XML já removido
+    assert len(list((data_root / "alvo" / "temp").glob("nmap-*.xml"))) == 2
+
+    checkpoint = RunCheckpoint("alvo", "nmap", run_id)
+
+    assert checkpoint.done_items == {"10.0.0.1", "10.0.0.2"}
+    assert list(checkpoint.pending(ITEMS)) == ["10.0.0.4", "10.0.0.5"]
+    assert checkpoint.leftovers() == [(["10.0.0.3"], scanned)]
+    assert checkpoint.sweep == {"10.0.0.5": {"80", "443"}}
+    # Só o XML completo sobrevive; o truncado do job interrompido foi removido
+    assert list((data_root / "alvo" / "temp").glob("nmap-*.xml")) == [Path(scanned)]
+
+    # Ingerido o que sobrou, a próxima retomada não o vê mais
+    checkpoint.done(["10.0.0.3"], scanned)
+    checkpoint.close()
+    assert not Path(scanned).exists()
+
+    checkpoint = RunCheckpoint("alvo", "nmap", run_id)
+    assert checkpoint.leftovers() == []
+    assert list(checkpoint.pending(ITEMS)) == ["10.0.0.4", "10.0.0.5"]
+    checkpoint.close()
+
+
+def test_missing_output_is_scanned_again():
+    run_id, _, scanned = interrupted_run()
+    Path(scanned).unlink()
+
+    checkpoint = RunCheckpoint("alvo", "nmap", run_id)
+    assert checkpoint.leftovers() == []
+    assert list(checkpoint.pending(ITEMS)) == ["10.0.0.3", "10.0.0.4", "10.0.0.5"]
+    checkpoint.close()
+
+
+def test_unknown_run_id():
+    with pytest.raises(FileNotFoundError):
+        RunCheckpoint("alvo", "nmap", "inexiste")
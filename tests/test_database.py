@@ -0,0 +1,110 @@
+# test_database.py
+import asyncio
+import pytest
+from opensearchpy import Connection, TransportError
+from opensearchpy.exceptions import ConnectionError as NetworkError
+import conn.database
+
+
+def test_async_client_uses_configured_pool_size(monkeypatch):
+    pytest.importorskip("aiohttp")
+    monkeypatch.setattr(conn.database, "POOL_MAXSIZE", 37)
+
+    async def pool_limits():
+        client = conn.database.get_async_opensearch_client()
+        try:
+            await client.transport._async_call()  # Conexões criadas sob demanda
+            return [
+                connection._limit
+                for connection in client.transport.connection_pool.connections
+            ]
+        finally:
+            await client.close()
+
+    assert asyncio.run(pool_limits()) == [37]
+
+
+def test_sync_client_uses_configured_pool_size(monkeypatch):
+    monkeypatch.setattr(conn.database, "POOL_MAXSIZE", 37)
+    monkeypatch.setattr(conn.database, "_client", None)
+
+    client = conn.database.get_opensearch_client()
+    for connection in client.transport.connection_pool.connections:
+        assert connection.pool.pool.maxsize == 37
+
+
+class FailingConnection(Connection):
+    """Conexão que responde com os erros de ``errors``, em ordem, e depois 200"""
+
+    errors = []
+    attempts = 0
+
+    def perform_request(self, *args, **kwargs):
+        FailingConnection.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 200, {}, "{}"
+
+
+def failing_transport():
+    options = conn.database.client_options()
+    return conn.database.throttled_transport()(
+        options.pop("hosts"), connection_class=FailingConnection, **options
+    )
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        TransportError(429, "too_many_requests"),
+        TransportError(503, "unavailable"),
+        NetworkError("N/A", "recusada", None),
+    ],
+    ids=["429", "503", "rede"],
+)
+def test_retries_are_not_multiplied(monkeypatch, error):
+    monkeypatch.setattr(conn.database, "MAX_RETRIES", 3)
+    monkeypatch.setattr(conn.database, "_backoff", lambda attempt: 0)
+    monkeypatch.setattr(FailingConnection, "errors", [error] * 10)
+    monkeypatch.setattr(FailingConnection, "attempts", 0)
+    transport = failing_transport()
+
+    with pytest.raises(type(error)):
+        transport.perform_request("GET", "/")
+    assert FailingConnection.attempts == 4  # MAX_RETRIES + 1
+
+
+def test_network_errors_and_throttling_share_the_budget(monkeypatch):
+    monkeypatch.setattr(conn.database, "MAX_RETRIES", 3)
+    monkeypatch.setattr(conn.database, "_backoff", lambda attempt: 0)
+    network = NetworkError("N/A", "recusada", None)
+    throttled = TransportError(429, "too_many_requests")
+    monkeypatch.setattr(FailingConnection, "errors", [network, throttled] * 10)
+    monkeypatch.setattr(FailingConnection, "attempts", 0)
+    transport = failing_transport()
+
+    with pytest.raises(TransportError):
+        transport.perform_request("GET", "/")
+    assert FailingConnection.attempts == 4
+
+
+def test_recovers_after_throttling(monkeypatch):
+    monkeypatch.setattr(conn.database, "_backoff", lambda attempt: 0)
+    monkeypatch.setattr(
+        FailingConnection, "errors", [TransportError(429, "too_many_requests")] * 2
+    )
+    monkeypatch.setattr(FailingConnection, "attempts", 0)
+    transport = failing_transport()
+
+    assert transport.perform_request("GET", "/") == {}
+    assert FailingConnection.attempts == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    monkeypatch.setattr(FailingConnection, "errors", [TransportError(400, "bad")])
+    monkeypatch.setattr(FailingConnection, "attempts", 0)
+    transport = failing_transport()
+
+    with pytest.raises(TransportError):
+        transport.perform_request("GET", "/")
+    assert FailingConnection.attempts == 1
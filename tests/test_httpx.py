@@ -0,0 +1,40 @@
+# test_httpx.py
+import json
+import subprocess
+import pytest
+from auto_httpx import probe_batch
+from tools.batching import BatchTimeout
+
+
+class StreamingPool:
+    """Pool que entrega as respostas dadas e depois estoura o tempo"""
+
+    def __init__(self, tmp_path, answered) -> None:
+        self.host_dir = self.data_dir = str(tmp_path)
+        self.answered = answered
+
+    def stream(self, command, timeout=None, resource=None):
+        for domain in self.answered:
+            yield json.dumps({"input": domain, "url": f"https://{domain}"})
+        raise subprocess.TimeoutExpired(command, timeout)
+
+
+def test_last_pending_domain_goes_back_to_the_queue(tmp_path):
+    emitted = []
+    pool = StreamingPool(tmp_path, ["a.exemplo.com.br"])
+
+    with pytest.raises(BatchTimeout) as timeout:
+        probe_batch(pool, ["a.exemplo.com.br", "b.exemplo.com.br"], emitted.append)
+
+    assert timeout.value.remaining == ["b.exemplo.com.br"]
+    assert [record["status"] for record in emitted] == ["available"]
+
+
+def test_single_domain_batch_timeout_is_an_error(tmp_path):
+    emitted = []
+    probe_batch(StreamingPool(tmp_path, []), ["b.exemplo.com.br"], emitted.append)
+
+    assert emitted == [
+        {"domain": "b.exemplo.com.br", "status": "error", "details": "Timeout"}
+    ]
+    assert list(tmp_path.iterdir()) == []  # Lista do lote removida
@@ -0,0 +1,33 @@
+# test_nmap.py
+import io
+from parsers import nmap
+
+XML = b"""<?xml version="1.0"?>
+<nmaprun>
+<host>
+<address addr="10.0.0.1" addrtype="ipv4"/>
+<ports>
+<port protocol="tcp" portid="22"><state state="open"/>
+<service name="ssh" product="OpenSSH" version="8.9p1">
+<cpe>cpe:/a:openbsd:openssh:8.9p1</cpe><cpe>cpe:/o:linux:linux_kernel</cpe>
+</service></port>
+<port protocol="tcp" portid="80"><state state="open"/>
+<service name="http" cpe="cpe:/a:apache:http_server"/></port>
+<port protocol="tcp" portid="443"><state state="filtered"/></port>
+</ports>
+</host>
+</nmaprun>
+"""
+
+
+def test_ports_keep_the_service_cpe():
+    (doc,) = nmap.parse(io.BytesIO(XML), "alvo")
+
+    assert doc["server.ip"] == "10.0.0.1"
+    assert [(port["port"], port["cpe"]) for port in doc["ports"]] == [
+        ("22", "cpe:/a:openbsd:openssh:8.9p1"),
+        ("80", "cpe:/a:apache:http_server"),
+        ("443", ""),
+    ]
+    assert doc["ports"][0]["product"] == "OpenSSH"
+    assert doc["ports"][2]["state"] == "filtered"
@@ -0,0 +1,24 @@
+# test_pool.py
+import subprocess
+import pytest
+from tools.pool import ToolPool
+
+
+def test_docker_run_timeout_raises_timeout_expired(fake_docker):
+    pool = ToolPool("alvo", mode="docker")
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run("sleep 5", timeout=1, check=True)
+
+
+def test_docker_run_failure_raises_called_process_error(fake_docker):
+    pool = ToolPool("alvo", mode="docker")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        pool.run("exit 3", timeout=5, check=True)
+    assert error.value.returncode == 3
+
+
+def test_docker_run_returns_output(fake_docker):
+    pool = ToolPool("alvo", mode="docker")
+    result = pool.run("echo ok", timeout=5)
+    assert result.returncode == 0
+    assert result.stdout == "ok\n"
@@ -0,0 +1,70 @@
+# test_rdap.py
+import subprocess
+import enrich.rdap
+
+
+class FakePool:
+    """Pool que devolve uma resposta fixa (ou levanta) para cada comando"""
+
+    def __init__(self, outcome) -> None:
+        self.outcome = outcome
+        self.calls = 0
+
+    def run(self, command, timeout=None, check=False, resource=None):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def rdap_twice(monkeypatch, tmp_path, outcome):
+    pool = FakePool(outcome)
+    monkeypatch.setattr(enrich.rdap, "get_pool", lambda target: pool)
+    cache = enrich.rdap.IPBlockCache(str(tmp_path / "rdap-ip.sqlite"))
+    handles = [enrich.rdap.rdap_ip("192.0.2.10", "alvo", cache) for _ in range(2)]
+    return handles, pool.calls
+
+
+def completed(returncode, stdout):
+    return subprocess.CompletedProcess("rdap", returncode, stdout, "")
+
+
+def test_block_is_cached(monkeypatch, tmp_path):
+    outcome = completed(
+        0,
+        '{"handle": "NET-192-0-2", "startAddress": "192.0.2.0",'
+        ' "endAddress": "192.0.2.255"}',
+    )
+    assert rdap_twice(monkeypatch, tmp_path, outcome) == (["NET-192-0-2"] * 2, 1)
+
+
+def test_answer_without_block_is_cached_negatively(monkeypatch, tmp_path):
+    outcome = completed(0, '{"errorCode": 404}')
+    assert rdap_twice(monkeypatch, tmp_path, outcome) == (["", ""], 1)
+
+
+def test_transient_failures_are_not_cached(monkeypatch, tmp_path):
+    for outcome in (
+        subprocess.TimeoutExpired("rdap", 60),
+        RuntimeError("container indisponível"),
+        completed(1, ""),
+    ):
+        assert rdap_twice(monkeypatch, tmp_path, outcome) == (["", ""], 2)
+
+
+def test_blocks_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / "rdap-ip.sqlite")
+    cache = enrich.rdap.IPBlockCache(path, batch=2)
+    other = enrich.rdap.IPBlockCache(path)  # Outro processo
+
+    cache.put("10.0.0.0", "10.255.255.255", "NET-10")
+    cache.put("10.1.0.0", "10.1.255.255", "NET-10-1")  # Completa o lote
+    cache.put("10.1.2.0", "10.1.2.255", "NET-10-1-2")
+
+    # A faixa pendente é a mais específica e já vale aqui
+    assert cache.get("10.1.2.3") == "NET-10-1-2"
+    assert cache.get("10.1.9.9") == "NET-10-1"
+    assert other.get("10.1.2.3") == "NET-10-1"
+
+    cache.flush()
+    assert other.get("10.1.2.3") == "NET-10-1-2"
@@ -0,0 +1,91 @@
+# test_rdap_domain.py
+import socket
+import time
+import pytest
+import enrich.rdap
+from bench.rdap_stub import start_stub_server
+from enrich.cache import SharedCache
+from enrich.rdap import RateLimiter, TTLCache, rdap_domain, registrable_domain
+
+
+@pytest.fixture
+def stub():
+    server, url = start_stub_server()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(enrich.rdap, "rate_limiter", RateLimiter(1000, burst=100))
+
+
+@pytest.mark.parametrize(
+    "host, zone",
+    [
+        ("www.exemplo.com.br", "exemplo.com.br"),
+        ("exemplo.com.br.", "exemplo.com.br"),
+        ("WWW.Exemplo.COM.BR", "exemplo.com.br"),
+        ("a.b.pm.ro.gov.br", "pm.ro.gov.br"),  # Estado sob gov.br
+        ("portal.camara.sp.leg.br", "camara.sp.leg.br"),  # Estado sob leg.br
+        ("www.tce.gov.br", "tce.gov.br"),
+        ("x.y.blog.br", "y.blog.br"),  # Categoria
+        ("www.bbc.co.uk", "bbc.co.uk"),
+        ("api.exemplo.com", "exemplo.com"),
+        ("localhost", "localhost"),
+    ],
+)
+def test_registrable_domain(host, zone):
+    assert registrable_domain(host) == zone
+
+
+@pytest.mark.parametrize(
+    "cache",
+    [
+        lambda tmp_path: TTLCache("Teste"),
+        lambda tmp_path: SharedCache(
+            "Teste", "rdap-domain", 3600, path=str(tmp_path / "e.sqlite")
+        ),
+    ],
+    ids=["memória", "compartilhado"],
+)
+def test_nameservers_and_404_are_cached(stub, tmp_path, cache):
+    server, url = stub
+    cache = cache(tmp_path)
+
+    for _ in range(3):
+        assert rdap_domain("www.exemplo.com.br", cache, url) == "a.dns.br,b.dns.br"
+        assert rdap_domain("a.pm.ro.gov.br", cache, url) == (
+            "ns1.pm.ro.gov.br,ns2.pm.ro.gov.br"
+        )
+        assert rdap_domain("www.inexistente.com.br", cache, url) == ""
+
+    # Uma consulta por zona registrável; o 404 fica no cache como negativo
+    assert server.requests == {
+        "exemplo.com.br": 1,
+        "pm.ro.gov.br": 1,
+        "inexistente.com.br": 1,
+    }
+    assert cache.get("inexistente.com.br") == ""
+
+
+def test_transient_failure_is_not_cached():
+    with socket.socket() as s:  # Porta livre, sem ninguém escutando
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/domain/"
+    cache = TTLCache("Teste")
+
+    assert enrich.rdap.query_domain("exemplo.com.br", url) is None
+    assert rdap_domain("www.exemplo.com.br", cache, url) == ""
+    assert cache.get("exemplo.com.br") is None
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Duas saem de imediato (burst); as outras quatro a 20/s
+    assert 0.18 <= time.monotonic() - start < 1.0
@@ -0,0 +1,70 @@
+# test_registry.py
+import io
+import sys
+import pytest
+import parsers
+from parsers import registry
+
+XML = b"""<?xml version="1.0"?>
+<nmaprun>
+<host><address addr="10.0.0.1" addrtype="ipv4"/>
+<ports><port protocol="tcp" portid="22"><state state="open"/>
+<service name="ssh"/></port></ports></host>
+<host><address addr="10.0.0.2" addrtype="ipv4"/></host>
+</nmaprun>
+"""
+
+
+@pytest.fixture
+def unloaded(monkeypatch):
+    """Registro vazio, como num processo que ainda não pediu parser algum"""
+    monkeypatch.setattr(registry, "PARSERS", {})
+    monkeypatch.setattr(registry, "_loaded", False)
+    monkeypatch.setattr(registry, "MODULES", ["nmap"])
+    monkeypatch.delitem(sys.modules, "parsers.nmap", raising=False)
+    monkeypatch.delattr(parsers, "nmap", raising=False)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = {"count": [], "observe": []}
+    monkeypatch.setattr(
+        registry.metrics,
+        "count",
+        lambda name, value=1, **labels: calls["count"].append((name, value, labels)),
+    )
+    monkeypatch.setattr(
+        registry.metrics,
+        "observe",
+        lambda stage, seconds, tool="": calls["observe"].append((stage, tool)),
+    )
+    return calls
+
+
+def test_get_parser_loads_modules_on_demand(unloaded):
+    assert "parsers.nmap" not in sys.modules
+
+    parser = registry.get_parser("nmap")
+
+    assert "parsers.nmap" in sys.modules
+    assert registry.names() == ["nmap", "nmap-dualstack"]
+    assert parser is registry.PARSERS["nmap"]
+    with pytest.raises(KeyError):
+        registry.get_parser("inexistente")
+
+
+def test_registered_parser_is_measured(unloaded, recorded):
+    docs = list(registry.get_parser("nmap")(io.BytesIO(XML), "alvo"))
+
+    assert [doc["server.ip"] for doc in docs] == ["10.0.0.1", "10.0.0.2"]
+    assert docs[0]["ports"][0]["service"] == "ssh"
+    assert recorded["count"] == [("documents", 2, {"stage": "parse", "tool": "nmap"})]
+    assert recorded["observe"] == [("parse", "nmap")]
+
+
+def test_metrics_are_recorded_when_the_consumer_stops(unloaded, recorded):
+    docs = registry.get_parser("nmap")(io.BytesIO(XML), "alvo")
+    next(docs)
+    docs.close()
+
+    assert recorded["count"] == [("documents", 1, {"stage": "parse", "tool": "nmap"})]
@@ -0,0 +1,42 @@
+# test_resolver.py
+import asyncio
+import socket
+import pytest
+from enrich.cache import SharedCache
+from enrich.resolver import CachedResolver, SystemResolver, _resolve_one
+
+
+def resolve_twice(monkeypatch, tmp_path, errno):
+    calls = []
+
+    def getaddrinfo(host, port, family, type):
+        calls.append(host)
+        raise socket.gaierror(errno, "falha simulada")
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    cache = SharedCache("DNS", "dns", 3600, path=str(tmp_path / "e.sqlite"))
+
+    async def resolve():
+        results = []
+        for _ in range(2):
+            resolver = CachedResolver(SystemResolver(2), cache)
+            try:
+                results.append(await _resolve_one(resolver, "x.exemplo.com.br", 1))
+            finally:
+                resolver.close()
+        return results
+
+    return asyncio.run(resolve()), len(calls)
+
+
+def test_nxdomain_is_cached(monkeypatch, tmp_path):
+    results, calls = resolve_twice(monkeypatch, tmp_path, socket.EAI_NONAME)
+    assert [r["ipv4"] for r in results] == [[], []]
+    assert calls == 2  # A e AAAA só na primeira vez
+
+
+@pytest.mark.parametrize("errno", [socket.EAI_AGAIN, socket.EAI_FAIL])
+def test_transient_failures_are_not_cached(monkeypatch, tmp_path, errno):
+    results, calls = resolve_twice(monkeypatch, tmp_path, errno)
+    assert [r["ipv4"] for r in results] == [[], []]
+    assert calls == 4
@@ -0,0 +1,108 @@
+# test_scan_state.py
+import time
+import opensearchpy.helpers
+import pytest
+import conn.scan_state
+from conn.scan_state import ScanState, fingerprint, port_signature
+
+HOUR = 3600
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.documents = []
+
+    def add(self, index, document, doc_id=None):
+        self.documents.append((index, doc_id, document))
+
+
+def ports(*entries):
+    fields = ("port", "service", "product", "version")
+    return [
+        port_signature({**dict(zip(fields, entry)), "protocol": "tcp", "state": "open"})
+        for entry in entries
+    ]
+
+
+@pytest.fixture
+def writer():
+    return RecordingWriter()
+
+
+@pytest.fixture
+def state(writer):
+    state = ScanState(None, "alvo", "nmap", freshness=24 * HOUR)
+    state.record(
+        writer,
+        "10.0.0.1",
+        ports(("22", "ssh", "OpenSSH", "8.9"), ("80", "http", "nginx", "1.24")),
+    )
+    return state
+
+
+def test_record_writes_one_document_per_scanner_and_host(state, writer):
+    [(index, doc_id, document)] = writer.documents
+    assert (index, doc_id) == ("alvo-scanstate", "nmap:10.0.0.1")
+    assert document["scanner"] == "nmap" and document["host"] == "10.0.0.1"
+    assert document["items"] == sorted(document["items"])
+
+
+def test_compare_reports_opened_closed_and_changed(state):
+    current = ports(("22", "ssh", "OpenSSH", "9.6"), ("443", "https", "nginx", "1.24"))
+
+    assert state.compare("10.0.0.1", current) == {
+        "opened": ["443/tcp"],
+        "closed": ["80/tcp"],
+        "changed": ["22/tcp"],
+    }
+    assert state.compare("10.0.0.9", current) == {
+        "opened": ["22/tcp", "443/tcp"],
+        "closed": [],
+        "changed": [],
+    }
+
+
+def test_unchanged_ignores_order(state):
+    same = ports(("80", "http", "nginx", "1.24"), ("22", "ssh", "OpenSSH", "8.9"))
+    assert state.unchanged("10.0.0.1", same)
+    assert not state.unchanged("10.0.0.1", same[:1])
+    assert not state.unchanged("10.0.0.9", same)
+    assert fingerprint(same) == fingerprint(list(reversed(same)))
+
+
+def test_freshness_cutoff(state, monkeypatch):
+    recorded = state._state["10.0.0.1"]["last_scan"]
+    hosts = ["10.0.0.1", "10.0.0.9"]
+
+    monkeypatch.setattr(time, "time", lambda: recorded + 24 * HOUR - 1)
+    assert state.is_fresh("10.0.0.1")
+    assert list(state.pending(hosts)) == ["10.0.0.9"]
+
+    monkeypatch.setattr(time, "time", lambda: recorded + 24 * HOUR)
+    assert not state.is_fresh("10.0.0.1")
+    assert list(state.pending(hosts)) == hosts
+
+
+def test_load_keeps_only_this_scanner(monkeypatch):
+    class Indices:
+        def exists(self, index):
+            return index == "alvo-scanstate"
+
+    class Client:
+        indices = Indices()
+
+    queries = []
+
+    def scan(client, index, query):
+        queries.append(query)
+        source = {"host": "10.0.0.1", "last_scan": time.time(), "items": []}
+        yield {"_source": source}
+
+    monkeypatch.setattr(opensearchpy.helpers, "scan", scan)
+    monkeypatch.setattr(conn.scan_state, "keyword_field", lambda c, i, f: f)
+    state = ScanState(Client(), "alvo", "nmap")
+    state.load()
+
+    assert queries == [{"query": {"term": {"scanner": "nmap"}}}]
+    assert state.is_fresh("10.0.0.1")
+    assert not ScanState(Client(), "outro", "nmap").is_fresh("10.0.0.1")
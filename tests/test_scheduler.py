@@ -0,0 +1,125 @@
+# test_scheduler.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import tools.scheduler
+from tools.scheduler import SlotGroup, slot
+
+LIMITS = {"discovery": 2, "scan": 2, "rdap": 1}
+GLOBAL_LIMIT = 3
+
+
+@pytest.fixture
+def groups(tmp_path, monkeypatch):
+    directory = str(tmp_path / "scheduler")
+    groups = {name: SlotGroup(name, limit, directory) for name, limit in LIMITS.items()}
+    monkeypatch.setattr(tools.scheduler, "_groups", groups)
+    monkeypatch.setattr(
+        tools.scheduler, "_global", SlotGroup("global", GLOBAL_LIMIT, directory)
+    )
+    monkeypatch.setattr(tools.scheduler, "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(tools.scheduler, "POLL_INTERVAL", 0.01)
+    return groups
+
+
+class Occupancy:
+    """Conta quantos blocos de cada classe rodam ao mesmo tempo"""
+
+    def __init__(self) -> None:
+        self.current = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def enter(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self.current[name] = self.current.get(name, 0) + 1
+                self.peak[name] = max(self.peak.get(name, 0), self.current[name])
+
+    def leave(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self.current[name] -= 1
+
+
+def test_class_and_global_limits_are_never_exceeded(groups):
+    occupancy = Occupancy()
+
+    def job(resource: str) -> None:
+        names = [resource] if resource == "rdap" else [resource, "global"]
+        with slot(resource):
+            occupancy.enter(*names)
+            time.sleep(0.02)
+            occupancy.leave(*names)
+
+    resources = ["discovery", "scan", "rdap"] * 10
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(job, resources))
+
+    assert occupancy.peak == {"discovery": 2, "scan": 2, "global": 3, "rdap": 1}
+
+
+def test_rdap_does_not_take_a_global_slot(groups):
+    busy = threading.Barrier(GLOBAL_LIMIT + 1)
+    done = threading.Event()
+
+    def hold(resource: str) -> None:
+        with slot(resource):
+            busy.wait()
+            done.wait()
+
+    holders = [
+        threading.Thread(target=hold, args=(resource,))
+        for resource in ["discovery", "discovery", "scan"]
+    ]
+    for thread in holders:
+        thread.start()
+    busy.wait()  # Limite global esgotado
+
+    start = time.monotonic()
+    with slot("rdap"):
+        assert tools.scheduler._global.busy() == GLOBAL_LIMIT
+    assert time.monotonic() - start < 0.5
+
+    done.set()
+    for thread in holders:
+        thread.join()
+
+
+def test_nested_slots_are_reentrant_per_thread(groups, monkeypatch):
+    directory = groups["scan"].directory
+    monkeypatch.setattr(tools.scheduler, "_global", SlotGroup("global", 1, directory))
+    monkeypatch.setitem(groups, "scan", SlotGroup("scan", 1, directory))
+
+    # Com uma vaga global e uma de scan, pedir de novo travaria
+    with slot("scan"):
+        with slot("scan"):
+            with slot("discovery"):
+                assert groups["scan"].busy() == 1
+                assert groups["discovery"].busy() == 1
+                assert tools.scheduler._global.busy() == 1
+            assert groups["discovery"].busy() == 0
+        assert groups["scan"].busy() == 1
+    assert groups["scan"].busy() == 0
+    assert tools.scheduler._global.busy() == 0
+
+
+def test_slots_are_shared_between_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.scheduler, "POLL_INTERVAL", 0.01)
+    directory = str(tmp_path / "scheduler")
+    # Dois SlotGroup no mesmo diretório: semáforos distintos, como dois
+    # processos; só o flock limita
+    first, second = SlotGroup("scan", 1, directory), SlotGroup("scan", 1, directory)
+
+    fd = first.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(
+        target=lambda: (second.release(second.acquire()), acquired.set())
+    )
+    waiter.start()
+    assert not acquired.wait(0.2)
+
+    first.release(fd)
+    assert acquired.wait(2)
+    waiter.join()
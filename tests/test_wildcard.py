@@ -0,0 +1,91 @@
+# test_wildcard.py
+import asyncio
+import sqlite3
+import pytest
+import enrich.wildcard
+from enrich.cache import SharedCache
+from enrich.resolver import CachedResolver, FakeResolver, resolve_all
+from enrich.wildcard import WildcardDetector, skip, wildcard_detector
+
+DOMAIN = "exemplo.com.br"
+WILDCARD_IP = "10.9.9.9"
+
+
+class WildcardResolver(FakeResolver):
+    """FakeResolver com *.curinga.exemplo.com.br respondendo WILDCARD_IP"""
+
+    def __init__(self) -> None:
+        super().__init__(latency=0.001, jitter=0, nxdomain_rate=0, ipv6_rate=0)
+        self.names = []
+
+    async def query(self, host, record):
+        self.names.append(host)
+        if host == f"real.curinga.{DOMAIN}" and record == "A":
+            return ["10.1.1.1"]  # Registro próprio dentro da zona curinga
+        if host.endswith(f".curinga.{DOMAIN}"):
+            return [WILDCARD_IP] if record == "A" else []
+        return await super().query(host, record)
+
+
+NAMES = [
+    f"www.{DOMAIN}",
+    f"mail.{DOMAIN}",
+    f"a.curinga.{DOMAIN}",
+    f"b.curinga.{DOMAIN}",
+    f"real.curinga.{DOMAIN}",
+]
+
+
+def resolve(resolver, wildcards):
+    async def run():
+        return [r async for r in resolve_all(NAMES, resolver, 10, 1, wildcards)]
+
+    return {r["host"]: r for r in asyncio.run(run())}
+
+
+@pytest.fixture(autouse=True)
+def no_shared_cache(monkeypatch):
+    monkeypatch.setattr(enrich.wildcard, "CACHE_ENABLED", False)
+
+
+def test_flags_only_names_that_resolve_to_the_wildcard():
+    wildcards = WildcardDetector(DOMAIN)
+    results = resolve(WildcardResolver(), wildcards)
+
+    flagged = sorted(host for host, r in results.items() if r["wildcard"])
+    assert flagged == [f"a.curinga.{DOMAIN}", f"b.curinga.{DOMAIN}"]
+    assert wildcards.zones == {f"curinga.{DOMAIN}": {WILDCARD_IP}}
+    assert wildcards.flagged == 2
+
+
+@pytest.mark.parametrize(
+    "mode, dropped",
+    [("flag", []), ("drop", [f"a.curinga.{DOMAIN}", f"b.curinga.{DOMAIN}"])],
+)
+def test_modes(monkeypatch, mode, dropped):
+    monkeypatch.setattr(enrich.wildcard, "WILDCARD_MODE", mode)
+    results = resolve(WildcardResolver(), wildcard_detector(DOMAIN))
+
+    assert sorted(host for host, r in results.items() if skip(r)) == dropped
+
+
+def test_off_mode_does_not_probe(monkeypatch):
+    monkeypatch.setattr(enrich.wildcard, "WILDCARD_MODE", "off")
+    resolver = WildcardResolver()
+
+    assert wildcard_detector(DOMAIN) is None
+    results = resolve(resolver, wildcard_detector(DOMAIN))
+    assert all("wildcard" not in r and not skip(r) for r in results.values())
+    assert sorted(set(resolver.names)) == sorted(NAMES)
+
+
+def test_probes_skip_the_dns_cache(tmp_path):
+    path = str(tmp_path / "enrich.sqlite")
+    resolver = CachedResolver(
+        WildcardResolver(), SharedCache("DNS", "dns", 60, path=path)
+    )
+    resolve(resolver, WildcardDetector(DOMAIN))
+
+    with sqlite3.connect(path) as db:
+        keys = {key for (key,) in db.execute("SELECT key FROM entries")}
+    assert keys == {f"{record}:{name}" for name in NAMES for record in ("A", "AAAA")}
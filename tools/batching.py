@@ -0,0 +1,166 @@
+# batching.py
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Callable, Iterable, Iterator, List, Tuple
+from tools import metrics
+
+# Configurações
+TARGET_BATCH_SECONDS = 600  # Duração desejada de cada lote (10 minutos)
+SMOOTHING = 0.3  # Peso da observação mais recente na média móvel
+
+
+class AdaptiveBatcher:
+    """Ajusta o tamanho do lote pelo tempo observado por host.
+
+    Depois de cada lote concluído, estima o tempo por host (média móvel
+    exponencial) e escolhe o tamanho que cabe em ``target_seconds``. O
+    crescimento é limitado a dobrar por vez; timeouts cortam pela metade.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 256,
+        target_seconds: float = TARGET_BATCH_SECONDS,
+    ) -> None:
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.per_host = None
+
+    def observe(self, hosts: int, seconds: float) -> None:
+        per_host = seconds / max(hosts, 1)
+        if self.per_host is None:
+            self.per_host = per_host
+        else:
+            self.per_host = SMOOTHING * per_host + (1 - SMOOTHING) * self.per_host
+
+        ideal = int(self.target_seconds / max(self.per_host, 0.001))
+        self.size = max(self.minimum, min(self.maximum, self.size * 2, ideal))
+
+    def shrink(self) -> None:
+        self.size = max(self.minimum, self.size // 2)
+
+
+class BatchTimeout(Exception):
+    """Timeout de um lote; ``remaining`` são os itens que ficaram sem resultado"""
+
+    def __init__(self, remaining: List[str]) -> None:
+        super().__init__(f"Timeout com {len(remaining)} itens pendentes")
+        self.remaining = remaining
+
+
+def run_each(
+    items: Iterable[str], scan: Callable[[str], str], workers: int
+) -> Iterator[Tuple[List[str], str]]:
+    """Um item por execução; entrega ([item], resultado) conforme terminam"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scan, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield [item], future.result()
+            except Exception as e:
+                print(f"[!] Erro no scan de {item}: {str(e)[:100]}")
+                yield [item], ""
+
+
+def run_adaptive(
+    items: Iterable[str],
+    scan: Callable[[List[str]], str],
+    workers: int,
+    batcher: AdaptiveBatcher,
+    group: Callable[[str], str] = lambda item: "",
+) -> Iterator[Tuple[List[str], str]]:
+    """Executa ``scan`` em lotes de tamanho adaptativo, ``workers`` por vez.
+
+    Os lotes são homogêneos segundo ``group`` (ex.: IPv4 e IPv6 separados) e
+    montados sob demanda, já com o tamanho ajustado pelos lotes anteriores.
+    Se ``scan`` lançar subprocess.TimeoutExpired, o lote é devolvido à fila
+    para ser refeito em lotes menores; com BatchTimeout, só os itens em
+    ``remaining`` voltam à fila. Um lote de um item que estoura o tempo é
+    entregue com resultado vazio, para quem chama registrar a falha.
+    Entrega (itens do lote, resultado) conforme cada lote termina.
+    """
+    items = iter(items)
+    buffers = {}
+    retry = deque()
+    exhausted = False
+
+    def next_batch() -> List[str]:
+        nonlocal exhausted
+        size = batcher.size
+
+        while retry:
+            batch = retry.popleft()
+            if len(batch) > size:
+                retry.appendleft(batch[size:])
+                batch = batch[:size]
+            return batch
+
+        while not exhausted:
+            item = next(items, None)
+            if item is None:
+                exhausted = True
+                break
+            key = group(item)
+            buffer = buffers.setdefault(key, [])
+            buffer.append(item)
+            if len(buffer) >= size:
+                buffers[key] = []
+                return buffer
+
+        for key, buffer in buffers.items():
+            if buffer:
+                buffers[key] = buffer[size:]
+                return buffer[:size]
+        return []
+
+    def timed_scan(batch: List[str]) -> Tuple[float, str]:
+        start = time.monotonic()
+        result = scan(batch)
+        return time.monotonic() - start, result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        while True:
+            while len(in_flight) < workers:
+                batch = next_batch()
+                if not batch:
+                    break
+                in_flight[executor.submit(timed_scan, batch)] = batch
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    elapsed, result = future.result()
+                except (subprocess.TimeoutExpired, BatchTimeout) as e:
+                    batcher.shrink()
+                    remaining = getattr(e, "remaining", batch)
+                    if len(batch) > 1 and remaining:
+                        print(
+                            f"[!] Timeout em lote de {len(batch)}; "
+                            f"refazendo {len(remaining)} em lotes menores"
+                        )
+                        retry.append(remaining)
+                        continue
+                    # Item sozinho que estourou o tempo: entregue sem resultado
+                    metrics.count("batch_timeouts")
+                    print(f"[!] Timeout em {', '.join(remaining)}; sem resultado")
+                    yield remaining, ""
+                    continue
+                except Exception as e:
+                    print(f"[!] Erro em lote de {len(batch)}: {str(e)[:100]}")
+                    yield batch, ""
+                    continue
+
+                batcher.observe(len(batch), elapsed)
+                yield batch, result
@@ -0,0 +1,146 @@
+# checkpoint.py
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from tools.pool import DATA_ROOT, KEEP_RAW
+
+
+class RunCheckpoint:
+    """Diário de uma execução, para retomar com ``--resume <run-id>``.
+
+    Cada evento vira uma linha JSON em {DATA_ROOT}/{alvo}/runs/, gravada
+    assim que acontece:
+
+        start  um job (lote de IPs ou domínios) começou
+        scan   o job terminou e a saída (XML) está completa em disco
+        done   os itens foram indexados (após o flush do BulkWriter)
+        sweep  resultado da varredura rápida do modo em duas fases
+
+    Ao retomar, itens já indexados são pulados, saídas completas que não
+    chegaram a ser indexadas ficam em ``leftovers()`` para serem ingeridas
+    em vez de varridas de novo, e arquivos de jobs interrompidos no meio
+    (XML truncado, listas -iL) são removidos.
+    """
+
+    def __init__(self, target: str, scanner: str, run_id: str = None) -> None:
+        self.run_id = run_id or str(uuid.uuid1())[:8]
+        self.path = f"{DATA_ROOT}/{target}/runs/{scanner}-{self.run_id}.jsonl"
+        self.host_dir = f"{DATA_ROOT}/{target}/temp"
+        self.done_items: Set[str] = set()
+        self.sweep: Dict[str, Set[str]] = None
+        self._started: Dict[str, List[str]] = {}  # job -> itens
+        self._scanned: Dict[str, List[str]] = {}  # arquivo -> itens
+        self._cut = False  # Diário termina em linha cortada pela interrupção
+        self._lock = threading.Lock()
+
+        if run_id:
+            if not Path(self.path).is_file():
+                raise FileNotFoundError(f"Execução {run_id} não encontrada")
+            self._load()
+            self._cleanup()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._journal = open(self.path, "a")
+        if self._cut:
+            self._journal.write("\n")  # Senão o próximo evento emenda nela
+
+    def _load(self) -> None:
+        with open(self.path) as journal:
+            for line in journal:
+                self._cut = not line.endswith("\n")
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Última linha cortada pela interrupção
+
+                kind = event.get("event")
+                if kind == "start":
+                    self._started[event["job"]] = event["items"]
+                elif kind == "scan":
+                    self._started.pop(event["job"], None)
+                    self._scanned[event["file"]] = event["items"]
+                elif kind == "done":
+                    self.done_items.update(event["items"])
+                    self._scanned.pop(event.get("file"), None)
+                elif kind == "sweep":
+                    self.sweep = {
+                        ip: set(ports) for ip, ports in event["ports"].items()
+                    }
+
+        # Saída completa que sumiu do disco: os itens voltam a ser varridos
+        self._scanned = {
+            path: items for path, items in self._scanned.items() if Path(path).is_file()
+        }
+        print(
+            f"[*] Retomando execução {self.run_id}: {len(self.done_items)} itens "
+            f"indexados, {len(self._scanned)} saídas a ingerir"
+        )
+
+    def _cleanup(self) -> None:
+        """Remove os arquivos de jobs que não chegaram ao fim"""
+        removed = 0
+        for job in self._started:
+            for path in Path(self.host_dir).glob(f"*-{job}.*"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        self._started.clear()
+        if removed:
+            print(f"[*] {removed} arquivos de jobs interrompidos removidos")
+
+    def _write(self, event: Dict) -> None:
+        with self._lock:
+            self._journal.write(json.dumps(event) + "\n")
+            self._journal.flush()
+
+    def pending(self, items: Iterable[str]) -> Iterator[str]:
+        """Filtra os itens já indexados ou com saída pronta para ingestão"""
+        skip = set(self.done_items)
+        for leftover in self._scanned.values():
+            skip.update(leftover)
+
+        skipped = 0
+        for item in items:
+            if item in skip:
+                skipped += 1
+                continue
+            yield item
+
+        if skipped:
+            print(f"[*] {skipped} itens já concluídos na execução {self.run_id}")
+
+    def leftovers(self) -> List[Tuple[List[str], str]]:
+        """Saídas completas ainda não indexadas: [(itens, arquivo)]"""
+        return [(items, path) for path, items in self._scanned.items()]
+
+    def track(self, items: List[str], run: Callable[[str], str]) -> str:
+        """Executa ``run(job_id)`` registrando o início e a saída do job.
+
+        ``run`` deve nomear seus arquivos com o job_id (ex.: nmap-<id>.xml)
+        e retornar o caminho da saída completa, ou "" se falhar.
+        """
+        job = str(uuid.uuid1())[:8]
+        self._write({"event": "start", "job": job, "items": items})
+        output = run(job)
+        if output:
+            self._write({"event": "scan", "job": job, "items": items, "file": output})
+        return output
+
+    def done(self, items: List[str], path: str = None) -> None:
+        """Marca os itens como indexados; chamar só depois do flush"""
+        if not items:
+            return
+        self._write({"event": "done", "items": list(items), "file": path})
+        self.done_items.update(items)
+        if path and not KEEP_RAW:
+            Path(path).unlink(missing_ok=True)
+
+    def swept(self, ports: Dict[str, Set[str]]) -> None:
+        """Guarda o resultado da varredura rápida para não refazê-la"""
+        self.sweep = ports
+        event = {ip: sorted(found) for ip, found in ports.items()}
+        self._write({"event": "sweep", "ports": event})
+
+    def close(self) -> None:
+        self._journal.close()
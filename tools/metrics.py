@@ -0,0 +1,284 @@
+# metrics.py
+import atexit
+import bisect
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from time import strftime
+from typing import Dict, Iterator, List, Tuple
+
+# Configurações
+METRICS_DIR = os.environ.get("RECON_METRICS_DIR", "/docker/recon/data/metrics")
+METRICS_ENABLED = os.environ.get("RECON_METRICS", "1") != "0"
+METRICS_PORT = int(os.environ.get("RECON_METRICS_PORT", 0))  # 0 = sem endpoint HTTP
+METRICS_INTERVAL = int(os.environ.get("RECON_METRICS_INTERVAL", 60))  # Segundos
+# Limites (segundos) dos buckets: de consultas DNS a um nmap de 30 minutos
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 1800
+)  # fmt: skip
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # Último bucket: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa por interpolação linear dentro do bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+class Registry:
+    """Contadores e histogramas do processo, com rótulos por alvo e ferramenta.
+
+    Toda etapa usa o mesmo histograma ``recon_stage_seconds`` (rótulos
+    target, stage e tool), então "qual etapa domina" é uma soma por stage.
+    Contadores levam o prefixo recon_ e o sufixo _total na exportação.
+    """
+
+    def __init__(self) -> None:
+        self.target = ""
+        self.scanner = ""
+        self.run_id = ""
+        self.started = time.time()
+        self.client = None
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[Labels, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: str) -> Labels:
+        labels.setdefault("target", self.target)
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        key = self.labels(**labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, stage: str, seconds: float, tool: str = "", **labels) -> None:
+        key = self.labels(stage=stage, tool=tool, **labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+
+    def prometheus(self) -> str:
+        """Exposição em texto (endpoint /metrics ou textfile collector)"""
+        lines = [
+            "# HELP recon_stage_seconds Duração de cada etapa do pipeline",
+            "# TYPE recon_stage_seconds histogram",
+        ]
+        with self._lock:
+            for key, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    bucket = _format(key + (("le", str(bound)),))
+                    lines.append(f"recon_stage_seconds_bucket{bucket} {cumulative}")
+                lines.append(f"recon_stage_seconds_sum{_format(key)} {histogram.sum}")
+                lines.append(
+                    f"recon_stage_seconds_count{_format(key)} {histogram.count}"
+                )
+
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE recon_{name}_total counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"recon_{name}_total{_format(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self) -> str:
+        """Grava o arquivo .prom de forma atômica (renomeando o temporário)"""
+        Path(METRICS_DIR).mkdir(parents=True, exist_ok=True)
+        path = f"{METRICS_DIR}/{self.scanner or 'recon'}-{self.target or 'all'}.prom"
+        with open(f"{path}.tmp", "w") as f:
+            f.write(self.prometheus())
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    def stages(self) -> List[Dict]:
+        """Resumo por etapa e ferramenta, da que mais tempo consumiu"""
+        errors = self.counters.get("stage_errors", {})
+        summary = []
+        with self._lock:
+            for key, histogram in self.histograms.items():
+                labels = dict(key)
+                summary.append(
+                    {
+                        "stage": labels["stage"],
+                        "tool": labels["tool"],
+                        "count": histogram.count,
+                        "errors": int(errors.get(key, 0)),
+                        "seconds": round(histogram.sum, 3),
+                        "p50_seconds": round(histogram.quantile(0.5), 4),
+                        "p99_seconds": round(histogram.quantile(0.99), 4),
+                    }
+                )
+        return sorted(summary, key=lambda stage: stage["seconds"], reverse=True)
+
+    def summary_document(self) -> Dict:
+        """Documento de resumo da execução para o índice <alvo>-runs"""
+        counters = []
+        with self._lock:
+            for name, series in self.counters.items():
+                for key, value in series.items():
+                    counters.append({"name": name, **dict(key), "value": value})
+        return {
+            "@timestamp": strftime("%Y-%m-%dT%H:%M:%S%Z"),
+            "run.id": self.run_id,
+            "run.scanner": self.scanner,
+            "run.target": self.target,
+            "run.duration_seconds": round(time.time() - self.started, 3),
+            "stages": self.stages(),
+            "counters": counters,
+        }
+
+
+def _format(labels: Labels) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+
+registry = Registry()
+_exporter = None
+
+
+def count(name: str, value: float = 1, **labels: str) -> None:
+    if METRICS_ENABLED:
+        registry.count(name, value, **labels)
+
+
+def observe(stage: str, seconds: float, tool: str = "", **labels: str) -> None:
+    if METRICS_ENABLED:
+        registry.observe(stage, seconds, tool, **labels)
+
+
+@contextmanager
+def timer(stage: str, tool: str = "", **labels: str) -> Iterator[None]:
+    """Mede o bloco em ``recon_stage_seconds``; exceções contam como erro"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        count("stage_errors", stage=stage, tool=tool, **labels)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start, tool, **labels)
+
+
+def _serve(port: int) -> None:
+    """Endpoint /metrics em uma thread (http.server só é importado aqui)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Sem log por requisição
+
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    except OSError as e:
+        print(f"[!] Endpoint de métricas indisponível: {e}")
+
+
+def _export_periodically() -> None:
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        try:
+            registry.write_file()
+        except OSError as e:
+            print(f"[!] Falha ao gravar métricas: {e}")
+
+
+def start(target: str, scanner: str, client=None, run_id: str = None) -> None:
+    """Inicia a coleta de uma execução (chamar no início do main).
+
+    O arquivo .prom em METRICS_DIR é regravado a cada METRICS_INTERVAL e no
+    fim da execução; com RECON_METRICS_PORT as métricas também ficam em
+    http://<host>:<porta>/metrics. Ao sair, o resumo por etapa é exibido e,
+    se houver ``client``, indexado em <alvo>-runs.
+    """
+    global _exporter
+    if not METRICS_ENABLED or _exporter is not None:
+        return
+
+    registry.target = target
+    registry.scanner = scanner
+    registry.run_id = run_id or str(uuid.uuid1())[:8]
+    registry.started = time.time()
+    registry.client = client
+
+    _exporter = threading.Thread(target=_export_periodically, daemon=True)
+    _exporter.start()
+    if METRICS_PORT:
+        _serve(METRICS_PORT)
+    atexit.register(finish)
+
+
+def finish() -> None:
+    """Exporta o arquivo final, exibe o resumo e indexa o documento da execução"""
+    try:
+        path = registry.write_file()
+    except OSError as e:
+        print(f"[!] Falha ao gravar métricas: {e}")
+        path = None
+
+    stages = registry.stages()
+    if stages:
+        print("[*] Tempo por etapa (total, p50, p99):")
+        for stage in stages[:10]:
+            tool = f"/{stage['tool']}" if stage["tool"] else ""
+            print(
+                f"[=] {stage['stage'] + tool:<24} {stage['seconds']:>10.1f}s "
+                f"{stage['p50_seconds']:>8.3f}s {stage['p99_seconds']:>8.3f}s "
+                f"({stage['count']} chamadas, {stage['errors']} erros)"
+            )
+    if path:
+        print(f"[*] Métricas em {path}")
+
+    if registry.client is not None and registry.target:
+        try:
+            registry.client.index(
+                index=f"{registry.target}-runs",
+                id=f"{registry.scanner}-{registry.run_id}",
+                body=registry.summary_document(),
+            )
+        except Exception as e:
+            print(f"[!] Falha ao indexar o resumo da execução: {str(e)[:100]}")
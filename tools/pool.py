@@ -0,0 +1,288 @@
+# pool.py
+import atexit
+import math
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Optional
+from tools import metrics
+from tools.scheduler import slot
+
+# Configurações
+IMAGE = os.environ.get("RECON_TOOLS_IMAGE", "kali-tools:2.1")
+EXEC_MODE = os.environ.get("RECON_EXEC_MODE", "docker")  # docker | local
+POOL_SIZE = int(os.environ.get("RECON_POOL_SIZE", 4))
+KEEP_RAW = os.environ.get("RECON_KEEP_RAW", "1") != "0"  # Cópia bruta para auditoria
+HEALTH_INTERVAL = 30  # Segundos entre verificações de um mesmo worker
+DATA_ROOT = os.environ.get("RECON_DATA_ROOT", "/docker/recon/data")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def tool_name(command: str) -> str:
+    """Nome da ferramenta para as métricas (/scripts/x/sublist3r.py -> sublist3r)"""
+    words = command.split()
+    return words[0].rsplit("/", 1)[-1].removesuffix(".py") if words else ""
+
+
+class _Worker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.checked = time.monotonic()
+
+
+class ToolPool:
+    """Pool de containers kali-tools aquecidos para um alvo.
+
+    Em vez de pagar ``docker run --rm`` a cada ferramenta, mantém até
+    ``size`` containers vivos (``sleep infinity``) com o diretório temp do
+    alvo montado em /data e executa os comandos com ``docker exec``. Workers
+    ociosos há mais de HEALTH_INTERVAL são verificados antes do uso e
+    substituídos se tiverem morrido.
+
+    No modo ``local`` os comandos rodam direto no host via ``sh -c``, com
+    ``data_dir`` apontando para o diretório temp; útil para testes sem Docker.
+    Os comandos devem usar ``pool.data_dir`` em vez de /data fixo.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        size: int = POOL_SIZE,
+        mode: str = EXEC_MODE,
+        image: str = IMAGE,
+    ) -> None:
+        self.target = target
+        self.size = max(1, size)
+        self.mode = mode
+        self.image = image
+        self.host_dir = f"{DATA_ROOT}/{target}/temp"
+        self.data_dir = "/data" if mode == "docker" else self.host_dir
+        self._idle = queue.LifoQueue()  # Reaproveita o worker mais quente
+        self._started = 0
+        self._lock = threading.Lock()
+        self._workers = []
+        self._closed = False
+
+        Path(self.host_dir).mkdir(parents=True, exist_ok=True)
+
+    def run(
+        self,
+        command: str,
+        timeout: float = None,
+        check: bool = False,
+        resource: str = None,
+    ) -> subprocess.CompletedProcess:
+        """Executa um comando de shell em um worker livre e captura a saída.
+
+        Segue a semântica de subprocess.run: lança TimeoutExpired no timeout
+        e CalledProcessError se ``check`` e o código de saída não for zero.
+        Em caso de timeout o processo também é encerrado dentro do container.
+        Com ``resource``, o comando espera uma vaga dessa classe no agendador
+        global (tools.scheduler) antes de ocupar um worker.
+        """
+        with slot(resource), metrics.timer("tool", tool_name(command)):
+            return self._run(command, timeout, check)
+
+    def _run(
+        self, command: str, timeout: float, check: bool
+    ) -> subprocess.CompletedProcess:
+        options = {"capture_output": True, "text": True, "errors": "replace"}
+
+        if self.mode != "docker":
+            return subprocess.run(
+                ["sh", "-c", command],
+                cwd=self.host_dir,
+                timeout=timeout,
+                check=check,
+                **options,
+            )
+
+        wrapped = command
+        if timeout:
+            wrapped = (
+                f"timeout -s KILL {math.ceil(timeout)} sh -c {shlex.quote(command)}"
+            )
+
+        worker = self._acquire()
+        start = time.monotonic()
+        try:
+            result = subprocess.run(
+                ["docker", "exec", worker.name, "sh", "-c", wrapped],
+                timeout=timeout + 10 if timeout else None,
+                **options,
+            )
+        finally:
+            self._idle.put(worker)
+
+        # O timeout de dentro do container mata com SIGKILL (código 137)
+        # antes do de fora: mesma semântica do modo local
+        if timeout and result.returncode and time.monotonic() - start >= timeout:
+            raise subprocess.TimeoutExpired(
+                command, timeout, result.stdout, result.stderr
+            )
+        if check:
+            result.check_returncode()
+        return result
+
+    def stream(
+        self,
+        command: str,
+        tee: str = None,
+        timeout: float = None,
+        resource: str = None,
+    ) -> Iterator[str]:
+        """Executa um comando e entrega as linhas do stdout à medida que saem.
+
+        Se ``tee`` for informado (caminho no host), cada linha também é
+        gravada nesse arquivo. O worker (e a vaga de ``resource`` no
+        agendador) fica reservado até o fim da leitura; interromper a
+        iteração encerra o processo. Se o processo for morto pelo timeout,
+        lança TimeoutExpired depois das linhas já entregues.
+        """
+        with slot(resource), metrics.timer("tool", tool_name(command)):
+            yield from self._stream(command, tee, timeout)
+
+    def _stream(self, command: str, tee: str, timeout: float) -> Iterator[str]:
+        worker = None
+        if self.mode == "docker":
+            if timeout:
+                command = (
+                    f"timeout -s KILL {math.ceil(timeout)} sh -c {shlex.quote(command)}"
+                )
+            worker = self._acquire()
+            argv = ["docker", "exec", worker.name, "sh", "-c", command]
+        else:
+            argv = ["sh", "-c", command]
+
+        proc = subprocess.Popen(
+            argv,
+            cwd=self.host_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout + 10, proc.kill)
+            timer.start()
+        raw = open(tee, "a") if tee else None
+        start = time.monotonic()
+
+        try:
+            for line in proc.stdout:
+                if raw:
+                    raw.write(line)
+                yield line.rstrip("\n")
+            proc.wait()
+            if timeout and proc.returncode and time.monotonic() - start >= timeout:
+                raise subprocess.TimeoutExpired(command, timeout)
+        finally:
+            if timer:
+                timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if raw:
+                raw.close()
+            if worker:
+                self._idle.put(worker)
+
+    def raw_output(self, filename: str) -> Optional[str]:
+        """Caminho no host para a cópia bruta da saída, se habilitada"""
+        return f"{self.host_dir}/{filename}" if KEEP_RAW else None
+
+    def close(self) -> None:
+        """Remove todos os containers do pool"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            names = [worker.name for worker in self._workers]
+        if names:
+            subprocess.run(["docker", "rm", "-f", *names], capture_output=True)
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                start_new = True
+            else:
+                start_new = False
+
+        if start_new:
+            return self._start_worker()
+
+        worker = self._idle.get()
+        if time.monotonic() - worker.checked > HEALTH_INTERVAL:
+            if not self._healthy(worker):
+                print(f"[!] Worker {worker.name} inativo, substituindo")
+                self._discard(worker)  # A vaga é reaproveitada pelo substituto
+                return self._start_worker()
+            worker.checked = time.monotonic()
+        return worker
+
+    def _start_worker(self) -> _Worker:
+        name = f"{self.target}-{str(uuid.uuid1())[:8]}-worker"
+        cmd = [
+            "docker",
+            "run",
+            "-d",
+            "--rm",
+            "--name",
+            name,
+            "-v",
+            f"{self.host_dir}:/data",
+            self.image,
+            "sleep",
+            "infinity",
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, timeout=120)
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+
+        worker = _Worker(name)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _healthy(self, worker: _Worker) -> bool:
+        result = subprocess.run(
+            ["docker", "inspect", "-f", "{{.State.Running}}", worker.name],
+            capture_output=True,
+            text=True,
+        )
+        return result.returncode == 0 and result.stdout.strip() == "true"
+
+    def _discard(self, worker: _Worker) -> None:
+        subprocess.run(["docker", "rm", "-f", worker.name], capture_output=True)
+        with self._lock:
+            self._workers.remove(worker)
+
+
+def get_pool(target: str, size: int = POOL_SIZE) -> ToolPool:
+    """Retorna o pool compartilhado do alvo, criando-o na primeira chamada"""
+    with _pools_lock:
+        if target not in _pools:
+            _pools[target] = ToolPool(target, size)
+        return _pools[target]
+
+
+@atexit.register
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
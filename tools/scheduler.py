@@ -0,0 +1,151 @@
+# scheduler.py
+import fcntl
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+from tools import metrics
+
+# Configurações
+SCHEDULER_DIR = os.environ.get("RECON_SCHEDULER_DIR", "/docker/recon/data/scheduler")
+SCHEDULER_ENABLED = os.environ.get("RECON_SCHEDULER", "1") != "0"
+GLOBAL_LIMIT = int(os.environ.get("RECON_MAX_JOBS", max(4, (os.cpu_count() or 1) * 2)))
+LIMITS = {
+    # Ferramentas de rede: assetfinder/subfinder/sublist3r, httpx, varredura SYN
+    "discovery": int(os.environ.get("RECON_LIMIT_DISCOVERY", 8)),
+    # nmap -sV, pesado em CPU e memória
+    "scan": int(os.environ.get("RECON_LIMIT_SCAN", min(10, (os.cpu_count() or 1) * 2))),
+    # Consultas RDAP, limitadas pelos servidores de registro
+    "rdap": int(os.environ.get("RECON_LIMIT_RDAP", 4)),
+}
+OUTSIDE_GLOBAL = {"rdap"}  # Consultas curtas, não disputam vaga com as ferramentas
+POLL_INTERVAL = 0.2  # Segundos entre tentativas quando não há vaga livre
+
+
+class SlotGroup:
+    """Vagas de uma classe de recurso compartilhadas entre processos.
+
+    Cada vaga é um arquivo {directory}/{name}.{n}.lock e ocupá-la é obter
+    flock exclusivo nele. O kernel libera o lock se o processo morrer, então
+    uma execução interrompida nunca deixa vaga presa. Dentro do processo um
+    semáforo enfileira as threads antes de disputarem os arquivos.
+    """
+
+    def __init__(self, name: str, limit: int, directory: str = None) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.directory = directory or SCHEDULER_DIR
+        self._queue = threading.BoundedSemaphore(self.limit)
+
+    def _path(self, n: int) -> str:
+        return f"{self.directory}/{self.name}.{n}.lock"
+
+    def _try_lock(self, n: int) -> int:
+        """Retorna o descritor com o lock da vaga ``n``, ou -1 se ocupada"""
+        fd = os.open(self._path(n), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            os.close(fd)
+            return -1
+
+    def acquire(self) -> int:
+        """Espera uma vaga livre e retorna o descritor que a mantém"""
+        self._queue.acquire()
+        try:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            while True:
+                for n in range(self.limit):
+                    fd = self._try_lock(n)
+                    if fd >= 0:
+                        return fd
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            self._queue.release()
+            raise
+
+    def release(self, fd: int) -> None:
+        os.close(fd)  # Fechar o descritor libera o flock
+        self._queue.release()
+
+    def busy(self) -> int:
+        """Quantas vagas estão ocupadas agora, por qualquer processo"""
+        if not Path(self.directory).is_dir():
+            return 0
+        busy = 0
+        for n in range(self.limit):
+            fd = self._try_lock(n)
+            if fd < 0:
+                busy += 1
+            else:
+                os.close(fd)
+        return busy
+
+
+_groups = {name: SlotGroup(name, limit) for name, limit in LIMITS.items()}
+_global = SlotGroup("global", GLOBAL_LIMIT)
+_held = threading.local()
+
+
+def _holding() -> Dict[str, int]:
+    """Vagas já ocupadas pela thread atual (classe -> profundidade)"""
+    if not hasattr(_held, "counts"):
+        _held.counts = {}
+    return _held.counts
+
+
+@contextmanager
+def slot(resource: str) -> Iterator[None]:
+    """Ocupa uma vaga de ``resource`` e uma do limite global durante o bloco.
+
+    A vaga da classe é obtida antes da global, para que quem espera por
+    uma classe lotada não segure vaga global. É reentrante por thread: um
+    bloco aninhado da mesma classe não pede outra vaga, e quem já tem vaga
+    global não pede a segunda (evita travar com o limite global esgotado).
+    ``resource`` None executa sem agendamento.
+    """
+    if resource is None or not SCHEDULER_ENABLED:
+        yield
+        return
+    if resource not in _groups:
+        raise ValueError(f"Classe de recurso desconhecida: {resource}")
+
+    names = [resource] if resource in OUTSIDE_GLOBAL else [resource, "global"]
+    # Guardado aqui: o bloco pode terminar em outra thread (geradores)
+    counts = _holding()
+    entered = []
+    taken = []
+    start = time.perf_counter()
+    try:
+        for name in names:
+            if not counts.get(name):
+                group = _groups.get(name, _global)
+                taken.append((group, group.acquire()))
+            counts[name] = counts.get(name, 0) + 1
+            entered.append(name)
+        metrics.observe("scheduler_wait", time.perf_counter() - start, resource)
+        yield
+    finally:
+        for name in entered:
+            counts[name] -= 1
+        for group, fd in reversed(taken):
+            group.release(fd)
+
+
+def status() -> Dict[str, Tuple[int, int]]:
+    """Ocupação atual de cada classe: {classe: (ocupadas, limite)}"""
+    groups = {**_groups, "global": _global}
+    return {name: (group.busy(), group.limit) for name, group in groups.items()}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(f"Uso: {sys.argv[0]}")
+        sys.exit(1)
+
+    for name, (busy, limit) in status().items():
+        print(f"[=] {name:<10} {busy}/{limit}")